@@ -0,0 +1,80 @@
+"""add event archive table
+
+Revision ID: add_event_archive
+Revises: add_event_filter_indexes
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_archive'
+down_revision = 'add_event_filter_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_archive',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('city', sa.String(), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('geohash', sa.String(), nullable=True),
+        sa.Column('event_date', sa.DateTime(), nullable=True),
+        sa.Column('event_type', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column(
+            'status',
+            postgresql.ENUM(
+                'PENDING', 'APPROVED', 'REJECTED',
+                name='eventstatus',
+                create_type=False
+            ),
+            nullable=True
+        ),
+        sa.Column('is_sponsored', sa.Boolean(), nullable=True),
+        sa.Column('organizer_id', sa.String(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['organizer_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_event_archive_event_date_id',
+        'event_archive',
+        ['event_date', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_event_archive_city_date',
+        'event_archive',
+        ['city', 'event_date', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_event_archive_type_date',
+        'event_archive',
+        ['event_type', 'event_date', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_event_archive_organizer_date',
+        'event_archive',
+        ['organizer_id', 'event_date', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_archive_organizer_date', table_name='event_archive')
+    op.drop_index('ix_event_archive_type_date', table_name='event_archive')
+    op.drop_index('ix_event_archive_city_date', table_name='event_archive')
+    op.drop_index('ix_event_archive_event_date_id', table_name='event_archive')
+    op.drop_table('event_archive')
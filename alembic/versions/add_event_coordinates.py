@@ -0,0 +1,35 @@
+"""add event coordinates and geohash
+
+Revision ID: add_event_coordinates
+Revises: add_event_search_index
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_coordinates'
+down_revision = 'add_event_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('event', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('event', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('event', sa.Column('geohash', sa.String(), nullable=True))
+    op.create_index(
+        op.f('ix_event_geohash'),
+        'event',
+        ['geohash'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_event_geohash'), table_name='event')
+    op.drop_column('event', 'geohash')
+    op.drop_column('event', 'longitude')
+    op.drop_column('event', 'latitude')
@@ -0,0 +1,56 @@
+"""add event daily rollup table
+
+Revision ID: add_event_daily_rollup
+Revises: add_event_coordinates
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_daily_rollup'
+down_revision = 'add_event_coordinates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_daily_rollup',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('city', sa.String(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column(
+            'status',
+            postgresql.ENUM(
+                'PENDING', 'APPROVED', 'REJECTED',
+                name='eventstatus',
+                create_type=False
+            ),
+            nullable=False
+        ),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'day', 'city', 'event_type', 'status',
+            name='uq_event_daily_rollup_key'
+        )
+    )
+    # Backfill from existing events
+    op.execute(
+        "INSERT INTO event_daily_rollup "
+        "(day, city, event_type, status, count) "
+        "SELECT date(event_date), coalesce(city, ''), "
+        "coalesce(event_type, ''), coalesce(status, 'PENDING'), count(*) "
+        "FROM event WHERE event_date IS NOT NULL "
+        "GROUP BY date(event_date), coalesce(city, ''), "
+        "coalesce(event_type, ''), coalesce(status, 'PENDING')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('event_daily_rollup')
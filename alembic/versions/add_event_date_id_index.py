@@ -0,0 +1,28 @@
+"""add event (event_date, id) index for keyset pagination
+
+Revision ID: add_event_date_id_index
+Revises: fix_admin_permissions_values
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_date_id_index'
+down_revision = 'fix_admin_permissions_values'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_event_event_date_id',
+        'event',
+        ['event_date', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_event_date_id', table_name='event')
@@ -0,0 +1,30 @@
+"""add event duplicate_of
+
+Revision ID: add_event_duplicate_of
+Revises: add_event_series
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_duplicate_of'
+down_revision = 'add_event_series'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'event', sa.Column('duplicate_of', sa.String(), nullable=True)
+    )
+    op.add_column(
+        'event_archive', sa.Column('duplicate_of', sa.String(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('event_archive', 'duplicate_of')
+    op.drop_column('event', 'duplicate_of')
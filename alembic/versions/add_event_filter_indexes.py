@@ -0,0 +1,43 @@
+"""add composite indexes for event listing filters
+
+Revision ID: add_event_filter_indexes
+Revises: add_event_daily_rollup
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_filter_indexes'
+down_revision = 'add_event_daily_rollup'
+branch_labels = None
+depends_on = None
+
+
+# Equality-filtered columns first, then the (event_date, id) pagination key
+FILTER_INDEXES = {
+    'ix_event_city_date': ['city', 'event_date', 'id'],
+    'ix_event_type_date': ['event_type', 'event_date', 'id'],
+    'ix_event_status_date': ['status', 'event_date', 'id'],
+    'ix_event_sponsored_date': ['is_sponsored', 'event_date', 'id'],
+    'ix_event_organizer_date': ['organizer_id', 'event_date', 'id'],
+    'ix_event_city_type_date': ['city', 'event_type', 'event_date', 'id'],
+    'ix_event_status_city_date': ['status', 'city', 'event_date', 'id'],
+    'ix_event_status_type_date': ['status', 'event_type', 'event_date', 'id'],
+}
+
+
+def upgrade() -> None:
+    for name, columns in FILTER_INDEXES.items():
+        op.create_index(name, 'event', columns, unique=False)
+    # Superseded by the composites leading with the same column
+    op.drop_index('ix_event_city', table_name='event')
+    op.drop_index('ix_event_event_type', table_name='event')
+
+
+def downgrade() -> None:
+    op.create_index('ix_event_event_type', 'event', ['event_type'], unique=False)
+    op.create_index('ix_event_city', 'event', ['city'], unique=False)
+    for name in reversed(list(FILTER_INDEXES)):
+        op.drop_index(name, table_name='event')
@@ -0,0 +1,48 @@
+"""add event moderation lease table
+
+Revision ID: add_event_moderation_lease
+Revises: add_event_duplicate_of
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_moderation_lease'
+down_revision = 'add_event_duplicate_of'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_moderation_lease',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('event_id', sa.String(), nullable=False),
+        sa.Column('moderator_id', sa.String(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['event_id'], ['event.id'], ondelete='CASCADE'
+        ),
+        sa.ForeignKeyConstraint(['moderator_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'event_id', name='uq_event_moderation_lease_event'
+        )
+    )
+    op.create_index(
+        'ix_event_moderation_lease_expires_at',
+        'event_moderation_lease',
+        ['expires_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_event_moderation_lease_expires_at',
+        table_name='event_moderation_lease'
+    )
+    op.drop_table('event_moderation_lease')
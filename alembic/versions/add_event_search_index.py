@@ -0,0 +1,55 @@
+"""add event full-text search index
+
+Revision ID: add_event_search_index
+Revises: add_event_date_id_index
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_search_index'
+down_revision = 'add_event_date_id_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5("
+            "title, description, location, city, "
+            "content='event', content_rowid='rowid', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute("INSERT INTO event_fts (event_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS event_search ("
+            "event_id VARCHAR PRIMARY KEY "
+            "REFERENCES event (id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS ix_event_search_document "
+            "ON event_search USING GIN (document)"
+        )
+        op.execute(
+            "INSERT INTO event_search (event_id, document) "
+            "SELECT id, "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', "
+            "coalesce(city, '') || ' ' || coalesce(location, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'D') "
+            "FROM event"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS event_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP TABLE IF EXISTS event_search")
@@ -0,0 +1,101 @@
+"""add recurring event series
+
+Revision ID: add_event_series
+Revises: add_event_archive
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_series'
+down_revision = 'add_event_archive'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_series',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('city', sa.String(), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('event_type', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column(
+            'status',
+            postgresql.ENUM(
+                'PENDING', 'APPROVED', 'REJECTED',
+                name='eventstatus',
+                create_type=False
+            ),
+            nullable=True
+        ),
+        sa.Column('is_sponsored', sa.Boolean(), nullable=True),
+        sa.Column('organizer_id', sa.String(), nullable=True),
+        sa.Column('dtstart', sa.DateTime(), nullable=False),
+        sa.Column('rrule', sa.String(), nullable=False),
+        sa.Column('ends_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['organizer_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_event_series_dtstart', 'event_series', ['dtstart'], unique=False
+    )
+    op.create_index(
+        'ix_event_series_city_dtstart',
+        'event_series',
+        ['city', 'dtstart'],
+        unique=False
+    )
+    op.create_index(
+        'ix_event_series_organizer',
+        'event_series',
+        ['organizer_id'],
+        unique=False
+    )
+    op.create_table(
+        'event_series_override',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('series_id', sa.String(), nullable=False),
+        sa.Column('occurrence_date', sa.DateTime(), nullable=False),
+        sa.Column('cancelled', sa.Boolean(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('location', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('event_date', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['series_id'], ['event_series.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'series_id', 'occurrence_date',
+            name='uq_event_series_override_occurrence'
+        )
+    )
+    op.create_index(
+        'ix_event_series_override_event_date',
+        'event_series_override',
+        ['series_id', 'event_date'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_event_series_override_event_date',
+        table_name='event_series_override'
+    )
+    op.drop_table('event_series_override')
+    op.drop_index('ix_event_series_organizer', table_name='event_series')
+    op.drop_index('ix_event_series_city_dtstart', table_name='event_series')
+    op.drop_index('ix_event_series_dtstart', table_name='event_series')
+    op.drop_table('event_series')
@@ -0,0 +1,43 @@
+"""add refresh token family table
+
+Revision ID: add_refresh_token_family
+Revises: rekey_event_search_index
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_refresh_token_family'
+down_revision = 'rekey_event_search_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'refresh_token_family',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('secret_hash', sa.String(), nullable=False),
+        sa.Column('claims', sa.JSON(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_refresh_token_family_expires_at'),
+        'refresh_token_family',
+        ['expires_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_refresh_token_family_expires_at'),
+        table_name='refresh_token_family'
+    )
+    op.drop_table('refresh_token_family')
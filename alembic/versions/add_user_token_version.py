@@ -0,0 +1,29 @@
+"""add user token_version
+
+Revision ID: add_user_token_version
+Revises: add_event_moderation_lease
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_token_version'
+down_revision = 'add_event_moderation_lease'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'user',
+        sa.Column(
+            'token_version', sa.Integer(), nullable=False, server_default='0'
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('user', 'token_version')
@@ -0,0 +1,52 @@
+"""key the SQLite event search index on a stable integer id
+
+Revision ID: rekey_event_search_index
+Revises: add_user_token_version
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'rekey_event_search_index'
+down_revision = 'add_user_token_version'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "title, description, location, city"
+EVENT_COLUMNS = "event.title, event.description, event.location, event.city"
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS event_fts")
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS event_search_key ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "event_id VARCHAR NOT NULL UNIQUE)"
+    )
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5("
+        f"{COLUMNS}, tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute("INSERT INTO event_search_key (event_id) SELECT id FROM event")
+    op.execute(
+        f"INSERT INTO event_fts (rowid, {COLUMNS}) "
+        f"SELECT event_search_key.id, {EVENT_COLUMNS} FROM event "
+        "JOIN event_search_key ON event_search_key.event_id = event.id"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS event_fts")
+    op.execute("DROP TABLE IF EXISTS event_search_key")
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5("
+        f"{COLUMNS}, content='event', content_rowid='rowid', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute("INSERT INTO event_fts (event_fts) VALUES ('rebuild')")
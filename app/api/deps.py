@@ -1,5 +1,8 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status, Request
+import hashlib
+import time
+from typing import Callable, Generator, Optional
+from urllib.parse import urlencode
+from fastapi import Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -7,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.core import security
+from app.core.cache import ResourceVersion
 from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.user import AdminPermission
@@ -24,11 +28,16 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
+def get_current_principal(
     db: Session = Depends(get_db),
     token: str = Depends(reusable_oauth2)
-) -> models.User:
-    """Get current user from token."""
+) -> schemas.Principal:
+    """
+    Who is calling. Claims-bearing tokens are answered from their claims
+    once their `ver` matches the user's cached token_version; older
+    tokens go through the principal cache. Only a cache miss touches
+    the database.
+    """
     try:
         payload = jwt.decode(
             token,
@@ -46,24 +55,57 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid token subject",
         )
-    user = crud.user.get(db, id=str(token_data.sub))
-    if not user:
+    if token_data.ver is not None:
+        version = crud.user.get_token_version(db, id=str(token_data.sub))
+        if version is None:
+            raise HTTPException(
+                status_code=404,
+                detail="User not found"
+            )
+        if version != token_data.ver:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Token has been revoked",
+            )
+        return schemas.Principal(
+            id=str(token_data.sub),
+            role=token_data.role,
+            admin_level=token_data.lvl,
+            permissions=security.decode_permissions(token_data.perms),
+            is_superuser=token_data.su,
+        )
+    principal = crud.user.get_principal(db, id=str(token_data.sub))
+    if not principal:
         raise HTTPException(
             status_code=404,
             detail="User not found"
         )
-    if not crud.user.is_active(user):
+    if not principal.is_active:
         raise HTTPException(
             status_code=400,
             detail="Inactive user"
         )
+    return principal
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    principal: schemas.Principal = Depends(get_current_principal),
+) -> models.User:
+    """The caller's full user row, for endpoints that need more than identity"""
+    user = crud.user.get(db, id=principal.id)
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail="User not found"
+        )
     return user
 
 
 def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
-    if not crud.user.is_active(current_user):
+    current_user: schemas.Principal = Depends(get_current_principal),
+) -> schemas.Principal:
+    if not current_user.is_active:
         raise HTTPException(
             status_code=400,
             detail="Inactive user"
@@ -72,8 +114,8 @@ def get_current_active_user(
 
 
 def get_current_admin_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.Principal = Depends(get_current_principal),
+) -> schemas.Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=403,
@@ -83,8 +125,8 @@ def get_current_admin_user(
 
 
 def get_current_super_admin(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.Principal = Depends(get_current_principal),
+) -> schemas.Principal:
     if not current_user.is_super_admin:
         raise HTTPException(
             status_code=403,
@@ -95,8 +137,8 @@ def get_current_super_admin(
 
 def check_permission(permission: AdminPermission):
     def permission_checker(
-        current_user: models.User = Depends(get_current_admin_user)
-    ) -> models.User:
+        current_user: schemas.Principal = Depends(get_current_admin_user)
+    ) -> schemas.Principal:
         if not current_user.has_permission(permission):
             raise HTTPException(
                 status_code=403,
@@ -107,10 +149,10 @@ def check_permission(permission: AdminPermission):
 
 
 def get_current_sponsor_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.Principal = Depends(get_current_principal),
+) -> schemas.Principal:
     """Check if user is a sponsor."""
-    if current_user.role != models.user.UserRole.SPONSOR:
+    if not current_user.is_sponsor:
         raise HTTPException(
             status_code=403,
             detail="User is not a sponsor"
@@ -120,9 +162,46 @@ def get_current_sponsor_user(
 
 def update_user_activity(
     db: Session = Depends(get_db),
-    current_user: Optional[models.User] = Depends(get_current_user),
+    current_user: Optional[schemas.Principal] = Depends(get_current_principal),
     request: Optional[Request] = None
 ) -> None:
     """Update user's last active timestamp."""
     if current_user and current_user.id:
         crud.user.update_login_stats(db, user_id=str(current_user.id))
+
+
+def not_modified(
+    *versions: ResourceVersion, bucket_seconds: Optional[int] = None
+) -> Callable[[Request, Response], None]:
+    """
+    Conditional GET for a view over one or more versioned resources.
+
+    The weak ETag combines the resource versions with the normalized query
+    string and, for time-dependent views, a time bucket. A matching
+    `If-None-Match` answers 304 before the endpoint runs, so neither the
+    listing query nor serialization happens.
+    """
+    def checker(request: Request, response: Response) -> None:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        parts = []
+        for version in versions:
+            parts.extend([version.resource, version.current()])
+        if bucket_seconds:
+            parts.append(str(int(time.time() // bucket_seconds)))
+        parts.append(
+            hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()[:16]
+        )
+        opaque_tag = '"' + "-".join(parts) + '"'
+        etag = f"W/{opaque_tag}"
+        # If-None-Match uses weak comparison, so ignore any W/ prefix
+        candidates = {
+            tag.strip().removeprefix("W/")
+            for tag in request.headers.get("if-none-match", "").split(",")
+        }
+        if opaque_tag in candidates or "*" in candidates:
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag}
+            )
+        response.headers["ETag"] = etag
+    return checker
@@ -1,8 +1,10 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import crud, models
+from app import crud, schemas
 from app.api import deps
+from app.core.hashing import password_hasher
+from app.crud.event import event_detail_cache, facets_cache
 from datetime import datetime, timedelta
 
 
@@ -12,7 +14,7 @@ router = APIRouter()
 @router.get("/metrics")
 async def get_metrics(
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_admin_user),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Get admin dashboard metrics
@@ -116,7 +118,7 @@ async def get_metrics(
 @router.get("/trends")
 async def get_trends(
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_admin_user),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Get event trends data for the dashboard charts
@@ -152,6 +154,29 @@ async def get_trends(
         )
 
 
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Hit and miss counters for the in-process and shared caches
+    """
+    return {
+        "event_detail": event_detail_cache.stats(),
+        "event_facets": facets_cache.stats(),
+    }
+
+
+@router.get("/hashing-stats")
+def get_hashing_stats(
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Queue depth, rejections and latency of the password hashing executor
+    """
+    return password_hasher.stats()
+
+
 def calculate_percentage_change(old_value: float, new_value: float) -> float:
     """Calculate percentage change between two values"""
     if old_value == 0:
@@ -1,29 +1,84 @@
+from contextlib import contextmanager
 from datetime import timedelta
-from typing import Any
+from typing import Any, Dict, Iterator
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app import crud, schemas
 from app.api import deps
 from app.core import security
 from app.core.config import settings
+from app.core.hashing import HasherBusy, password_hasher
+from app.core.security import RefreshTokenReused
+from app.crud.refresh_token import RefreshTokenStoreError
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+@contextmanager
+def hashing_backpressure() -> Iterator[None]:
+    """Turn a saturated password hasher into 503 with Retry-After"""
+    try:
+        yield
+    except HasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+def create_access_token(user_id: str, claims: Dict[str, Any]) -> str:
+    return security.create_access_token(
+        user_id,
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        claims=claims,
+    )
+
+
+def issue_tokens(
+    db: Session, user_id: str, claims: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    A short-lived access token, and a refresh token starting a new
+    refresh token family
+    """
+    refresh_token, family, secret_hash = security.create_refresh_token()
+    try:
+        crud.refresh_token.create_family(
+            db,
+            family=family,
+            secret_hash=secret_hash,
+            user_id=user_id,
+            claims=claims,
+            expires_in=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        )
+    except RefreshTokenStoreError as e:
+        # Sign-in still works; the client logs in again on expiry
+        logger.warning(f"Failed to store refresh token: {str(e)}")
+        refresh_token = None
+    return {
+        "access_token": create_access_token(user_id, claims),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
+
 @router.post("/login", response_model=schemas.TokenWithUser)
-def login(
+async def login(
     db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.user.authenticate(
-        db, username=form_data.username, password=form_data.password
-    )
+    with hashing_backpressure():
+        user = await crud.user.authenticate(
+            db, username=form_data.username, password=form_data.password
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -34,21 +89,100 @@ def login(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    
-    access_token_expires = timedelta(
-        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+
+    # Serialized before issuing tokens, whose commit expires the row
+    user_out = schemas.User.model_validate(user)
+    tokens = await run_in_threadpool(
+        issue_tokens, db, str(user.id), security.token_claims(user)
     )
+    return {**tokens, "user": user_out}
+
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh(
+    *,
+    db: Session = Depends(deps.get_db),
+    token_in: schemas.RefreshTokenRequest,
+) -> Any:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+    Each refresh token works once; presenting one again revokes its
+    whole family, so a stolen token is only good until either party
+    uses it.
+    """
+    parsed = security.parse_refresh_token(token_in.refresh_token)
+    if parsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    family, secret_hash = parsed
+    refresh_token, _, new_secret_hash = security.create_refresh_token(family)
+    try:
+        issued = crud.refresh_token.rotate(
+            db,
+            family=family,
+            secret_hash=secret_hash,
+            new_secret_hash=new_secret_hash,
+            expires_in=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        )
+    except RefreshTokenReused:
+        logger.warning(f"Refresh token reuse detected, family {family} revoked")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected, please sign in again",
+        )
+    except RefreshTokenStoreError as e:
+        logger.warning(f"Refresh token rotation failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token refresh is temporarily unavailable",
+        )
+    if issued is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    user_id, claims = issued
+    # Role, permission, status and password changes bump the version
+    # and end the family along with the access tokens
+    if crud.user.get_token_version(db, id=user_id) != claims.get("ver"):
+        try:
+            crud.refresh_token.revoke(db, family=family)
+        except RefreshTokenStoreError as e:
+            # Every later refresh of this family fails the check again
+            logger.warning(f"Failed to revoke refresh token: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+        )
     return {
-        "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
-        ),
+        "access_token": create_access_token(user_id, claims),
+        "refresh_token": refresh_token,
         "token_type": "bearer",
-        "user": user
     }
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    *,
+    db: Session = Depends(deps.get_db),
+    token_in: schemas.RefreshTokenRequest,
+) -> None:
+    """
+    Revoke a refresh token and every token rotated from it.
+    """
+    parsed = security.parse_refresh_token(token_in.refresh_token)
+    if parsed is None:
+        return
+    try:
+        crud.refresh_token.revoke(db, family=parsed[0])
+    except RefreshTokenStoreError as e:
+        logger.warning(f"Failed to revoke refresh token: {str(e)}")
+
+
 @router.post("/register", response_model=schemas.User)
-def register(
+async def register(
     *,
     db: Session = Depends(deps.get_db),
     user_in: schemas.UserCreate,
@@ -58,14 +192,22 @@ def register(
     """
     try:
         logger.info(f"Attempting to register user with data: {user_in}")
-        user = crud.user.get_by_email(db, email=user_in.email)
+        user = await run_in_threadpool(
+            crud.user.get_by_email, db, email=user_in.email
+        )
         if user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
-        user = crud.user.create(db, obj_in=user_in)
+        with hashing_backpressure():
+            hashed_password = await password_hasher.hash(user_in.password)
+        user = await run_in_threadpool(
+            crud.user.create, db, obj_in=user_in, hashed_password=hashed_password
+        )
         return user
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Registration failed with error: {str(e)}")
         logger.exception(e)
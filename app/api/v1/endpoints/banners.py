@@ -2,18 +2,24 @@ from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.crud.banner import banner_version
 
 router = APIRouter()
 
+# Active banners depend on the clock as well as on banner writes
+active_banners_not_modified = deps.not_modified(
+    banner_version, bucket_seconds=60
+)
+
 
 @router.post("/", response_model=schemas.Banner)
 def create_banner(
     *,
     db: Session = Depends(deps.get_db),
     banner_in: schemas.BannerCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new banner. Only sponsors can create banners.
@@ -37,7 +43,11 @@ def create_banner(
     return banner
 
 
-@router.get("/active/", response_model=List[schemas.Banner])
+@router.get(
+    "/active/",
+    response_model=List[schemas.Banner],
+    dependencies=[Depends(active_banners_not_modified)]
+)
 def list_active_banners(
     *,
     db: Session = Depends(deps.get_db),
@@ -54,7 +64,7 @@ def list_active_banners(
 def list_sponsor_banners(
     sponsor_id: str,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get all banners for a specific sponsor.
@@ -82,7 +92,7 @@ def update_banner(
     db: Session = Depends(deps.get_db),
     banner_id: str,
     banner_in: schemas.BannerUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update banner. Only the owner sponsor or admin can update.
@@ -1,29 +1,671 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterator, List, Optional, Tuple
+from fastapi import (
+    APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps
+from app.core.config import settings
+from app.crud.event import event_version
+from app.crud.event_series import series_version
 
 router = APIRouter()
 
+# Listings include occurrences of recurring series
+events_not_modified = deps.not_modified(event_version, series_version)
+upcoming_not_modified = deps.not_modified(
+    event_version, series_version, bucket_seconds=60
+)
+
+MODERATION_STATUS = {
+    schemas.EventModerationAction.APPROVE: models.EventStatus.APPROVED,
+    schemas.EventModerationAction.REJECT: models.EventStatus.REJECTED,
+}
+
+
+def _event_page(fetch, **kwargs: Any) -> schemas.EventList:
+    """Run a cursor-paginated CRUD call and wrap it as an `EventList`."""
+    try:
+        events, next_cursor = fetch(**kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schemas.EventList(items=events, next_cursor=next_cursor)
+
 
 @router.get(
     "/pending",
-    response_model=List[schemas.Event],
+    response_model=schemas.EventList,
     dependencies=[Depends(deps.get_current_admin_user)]
 )
 def list_pending_events(
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
 ) -> Any:
     """
     Retrieve pending events. Admin only.
     """
-    events = crud.event.get_multi_by_status(
-        db, status=models.EventStatus.PENDING, skip=skip, limit=limit
+    return _event_page(
+        crud.event.get_multi_by_status,
+        db=db,
+        status=models.EventStatus.PENDING,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+@router.get(
+    "/duplicates",
+    response_model=List[schemas.EventDuplicateCluster],
+    dependencies=[Depends(deps.get_current_admin_user)]
+)
+def list_duplicate_events(
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Any:
+    """
+    Groups of upcoming events that look like resubmissions of each other,
+    largest first. Admin only.
+    """
+    return [
+        schemas.EventDuplicateCluster(events=events)
+        for events in crud.event.get_duplicate_clusters(db, limit=limit)
+    ]
+
+
+@router.get("/search", response_model=List[schemas.EventSearchResult])
+def search_events(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Full-text search over event title, description, location and city,
+    best match first.
+    """
+    return [
+        schemas.EventSearchResult(
+            **schemas.Event.model_validate(event).model_dump(),
+            score=score,
+            snippet=snippet,
+        )
+        for event, score, snippet in crud.event.search(db, q=q, limit=limit)
+    ]
+
+
+@router.get("/facets", response_model=schemas.EventFacets)
+def get_event_facets(
+    db: Session = Depends(deps.get_db),
+    city: Optional[str] = None,
+    event_type: Optional[str] = None,
+    status: Optional[models.EventStatus] = None,
+    is_sponsored: Optional[bool] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Event counts per city, type, status, month and sponsorship for the
+    given filter.
+    """
+    return crud.event.get_facets(
+        db,
+        city=city,
+        event_type=event_type,
+        status=status,
+        is_sponsored=is_sponsored,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@router.get("/suggest", response_model=List[schemas.EventSuggestion])
+def suggest_events(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+) -> Any:
+    """
+    Typeahead for event titles, cities and venues. Served from memory.
+    """
+    return [
+        schemas.EventSuggestion(text=text, kind=kind, weight=weight)
+        for kind, text, weight in crud.event.suggest(
+            prefix=prefix, limit=limit
+        )
+    ]
+
+
+@router.get("/nearby", response_model=List[schemas.EventNearby])
+def list_nearby_events(
+    db: Session = Depends(deps.get_db),
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=500),
+    event_type: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Retrieve events within `radius_km` of a point, nearest first.
+    """
+    return [
+        schemas.EventNearby(
+            **schemas.Event.model_validate(event).model_dump(),
+            distance_km=round(distance, 3),
+        )
+        for event, distance in crud.event.get_nearby(
+            db,
+            latitude=lat,
+            longitude=lon,
+            radius_km=radius_km,
+            event_type=event_type,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+        )
+    ]
+
+
+@router.get("/trending", response_model=List[schemas.EventTrending])
+def list_trending_events(
+    city: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Upcoming events ranked by recent views, decayed over time. Served
+    from the periodically refreshed ranking.
+    """
+    return crud.event_trending.get_trending(city=city, limit=limit)
+
+
+@router.get("/trending/cities", response_model=List[schemas.TrendingCity])
+def list_trending_cities(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Cities ranked by the trending score of their upcoming events.
+    """
+    return [
+        {"city": city, "score": score}
+        for city, score in crud.event_trending.get_trending_cities(limit=limit)
+    ]
+
+
+@router.get("/promoted", response_model=List[schemas.EventPromoted])
+def list_promoted_events(
+    city: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+) -> Any:
+    """
+    Sponsored upcoming events interleaved with active banners, for a city
+    or overall. Served from the periodically rebuilt feed without
+    touching the database.
+    """
+    return Response(
+        content=crud.event_promoted.get_feed_json(city=city, limit=limit),
+        media_type="application/json",
+    )
+
+
+@router.get("/recommended", response_model=List[schemas.EventRecommendation])
+def list_recommended_events(
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Upcoming events picked for the current user from the events they
+    organized and viewed. Users without any history get trending events.
+    """
+    return (
+        crud.event_recommendation.get_recommended(
+            db, user_id=str(current_user.id), limit=limit
+        )
+        or crud.event_trending.get_trending(limit=limit)
+    )
+
+
+@router.get("/calendar", response_model=List[schemas.EventDayCount])
+def get_event_calendar(
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(deps.get_db),
+    city: Optional[str] = None,
+    event_type: Optional[str] = None,
+    status: Optional[models.EventStatus] = None,
+) -> Any:
+    """
+    Event counts per day for the calendar view, from the daily rollup and
+    recurring series.
+    """
+    if end_date < start_date or (end_date - start_date).days > 366:
+        raise HTTPException(
+            status_code=400,
+            detail="Date range must be ascending and at most a year"
+        )
+    counts = crud.event.get_daily_counts(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        city=city,
+        event_type=event_type,
+        status=status,
+    )
+    return [
+        schemas.EventDayCount(day=day, count=count)
+        for day, count in sorted(counts.items())
+    ]
+
+
+def _import_rows(file: UploadFile, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Stream `(line number, row)` pairs from an uploaded CSV or NDJSON file.
+    Unparseable NDJSON lines are yielded as the `ValueError` they raised.
+    """
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # Empty cells mean "not provided" for optional fields
+            yield reader.line_num, {
+                key: value for key, value in row.items() if value != ""
+            }
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+
+@router.post("/import", response_model=schemas.EventImportResult)
+def import_events(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bulk-create events from a CSV or NDJSON upload, organized by the
+    current user.
+
+    The file is streamed and rows are validated and inserted in batches,
+    so memory stays flat whatever the file size. Invalid rows are skipped
+    and reported by line number.
+    """
+    if fmt is None:
+        filename = (file.filename or "").lower()
+        fmt = "csv" if filename.endswith(".csv") else "ndjson"
+
+    imported = 0
+    failed = 0
+    errors: List[schemas.EventImportError] = []
+    batch: List[schemas.EventCreate] = []
+
+    def record_error(row: int, messages: List[str]) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.EVENT_IMPORT_MAX_ERRORS:
+            errors.append(schemas.EventImportError(row=row, errors=messages))
+
+    try:
+        for row_number, raw in _import_rows(file, fmt):
+            if isinstance(raw, ValueError):
+                record_error(row_number, [f"Invalid JSON: {str(raw)}"])
+                continue
+            try:
+                batch.append(schemas.EventCreate.model_validate(raw))
+            except ValidationError as e:
+                record_error(row_number, [
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                ])
+                continue
+            if len(batch) >= settings.EVENT_IMPORT_BATCH_SIZE:
+                imported += len(crud.event.create_many_with_organizer(
+                    db, objs_in=batch, organizer_id=str(current_user.id)
+                ))
+                batch = []
+        imported += len(crud.event.create_many_with_organizer(
+            db, objs_in=batch, organizer_id=str(current_user.id)
+        ))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unreadable {fmt} file after {imported} rows: {str(e)}"
+        )
+    return schemas.EventImportResult(
+        imported=imported, failed=failed, errors=errors
+    )
+
+
+EXPORT_FIELDS = list(schemas.Event.model_fields)
+
+
+def _export_chunks(db: Session, fmt: str) -> Iterator[str]:
+    """
+    Render every event as CSV or NDJSON, one chunk per fetched batch.
+
+    Runs in its own session on the request's bind, since the request
+    session is released as soon as the endpoint returns.
+    """
+    with Session(bind=db.get_bind()) as export_db:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        if fmt == "csv":
+            writer.writeheader()
+            # Flush the header straight away so clients see the first byte
+            yield buffer.getvalue()
+        for batch in crud.event.iter_batches(
+            export_db, batch_size=settings.EVENT_EXPORT_BATCH_SIZE
+        ):
+            buffer.seek(0)
+            buffer.truncate()
+            for obj in batch:
+                row = schemas.Event.model_validate(obj).model_dump(mode="json")
+                if fmt == "csv":
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(row))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(deps.get_current_admin_user)]
+)
+def export_events(
+    *,
+    db: Session = Depends(deps.get_db),
+    fmt: str = Query("ndjson", alias="format", pattern="^(csv|ndjson)$"),
+) -> Any:
+    """
+    Stream a full dump of all events as NDJSON or CSV. Admin only.
+
+    Rows are read in `EVENT_EXPORT_BATCH_SIZE` batches through a
+    server-side cursor and written out batch by batch, so memory stays
+    bounded and a slow client simply pauses the fetch.
+    """
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_chunks(db, fmt),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="events.{fmt}"'
+        }
+    )
+
+
+def _get_own_series(
+    db: Session, series_id: str, current_user: schemas.Principal
+) -> models.EventSeries:
+    series = crud.event_series.get(db=db, id=series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Event series not found")
+    if (series.organizer_id != str(current_user.id) and
+            not current_user.is_superuser):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return series
+
+
+@router.post("/series", response_model=schemas.EventSeries)
+def create_event_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_in: schemas.EventSeriesCreate,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create a recurring event from an RFC 5545 recurrence rule.
+    """
+    try:
+        return crud.event_series.create_with_organizer(
+            db=db, obj_in=series_in, organizer_id=str(current_user.id)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/series/{series_id}", response_model=schemas.EventSeries)
+def read_event_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get a recurring event by ID.
+    """
+    series = crud.event_series.get(db=db, id=series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Event series not found")
+    return series
+
+
+@router.put("/series/{series_id}", response_model=schemas.EventSeries)
+def update_event_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    series_in: schemas.EventSeriesUpdate,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Update a recurring event. Changing its schedule drops all per-
+    occurrence changes.
+    """
+    series = _get_own_series(db, series_id, current_user)
+    try:
+        return crud.event_series.update(db=db, db_obj=series, obj_in=series_in)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/series/{series_id}", response_model=schemas.EventSeries)
+def delete_event_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Delete a recurring event and all its occurrences.
+    """
+    _get_own_series(db, series_id, current_user)
+    return crud.event_series.remove(db=db, id=series_id)
+
+
+def _moderate_series(
+    db: Session, series_id: str, status: models.EventStatus
+) -> models.EventSeries:
+    series = crud.event_series.get(db=db, id=series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Event series not found")
+    moderated = crud.event_series.moderate(db, db_obj=series, status=status)
+    if moderated is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Event series is already {series.status}"
+        )
+    return moderated
+
+
+@router.post("/series/{series_id}/approve", response_model=schemas.EventSeries)
+def approve_event_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Approve a recurring event and so all its occurrences. Admin only.
+    """
+    return _moderate_series(db, series_id, models.EventStatus.APPROVED)
+
+
+@router.post("/series/{series_id}/reject", response_model=schemas.EventSeries)
+def reject_event_series(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Reject a recurring event and so all its occurrences. Admin only.
+    """
+    return _moderate_series(db, series_id, models.EventStatus.REJECTED)
+
+
+@router.get(
+    "/series/{series_id}/occurrences", response_model=List[schemas.Event]
+)
+def list_event_series_occurrences(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+    _: None = Depends(events_not_modified),
+) -> Any:
+    """
+    Occurrences of a recurring event between two dates, at most a year
+    apart.
+    """
+    if end_date < start_date or (end_date - start_date).days > 366:
+        raise HTTPException(
+            status_code=400,
+            detail="Date range must be ascending and at most a year"
+        )
+    series = crud.event_series.get(db=db, id=series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Event series not found")
+    return crud.event_series.get_occurrences(
+        db, series=series, start_date=start_date, end_date=end_date
+    )
+
+
+@router.put(
+    "/series/{series_id}/occurrences/{occurrence_date}",
+    response_model=schemas.EventOccurrenceOverride
+)
+def update_event_series_occurrence(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    occurrence_date: datetime,
+    occurrence_in: schemas.EventOccurrenceUpdate,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Cancel, move or edit one occurrence of a recurring event, identified
+    by the date it was originally due.
+    """
+    series = _get_own_series(db, series_id, current_user)
+    try:
+        return crud.event_series.set_override(
+            db,
+            series=series,
+            occurrence_date=occurrence_date,
+            obj_in=occurrence_in,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete(
+    "/series/{series_id}/occurrences/{occurrence_date}",
+    response_model=schemas.EventOccurrenceOverride
+)
+def reset_event_series_occurrence(
+    *,
+    db: Session = Depends(deps.get_db),
+    series_id: str,
+    occurrence_date: datetime,
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Undo changes to one occurrence of a recurring event.
+    """
+    series = _get_own_series(db, series_id, current_user)
+    override = crud.event_series.remove_override(
+        db, series=series, occurrence_date=occurrence_date
+    )
+    if override is None:
+        raise HTTPException(status_code=404, detail="Occurrence not changed")
+    return override
+
+
+@router.post(
+    "/moderate",
+    response_model=schemas.EventModerationResult,
+    dependencies=[Depends(deps.get_current_admin_user)]
+)
+def moderate_events(
+    *,
+    db: Session = Depends(deps.get_db),
+    moderation_in: schemas.EventModeration,
+) -> Any:
+    """
+    Approve or reject a batch of pending events in one statement. Ids
+    that are missing or no longer pending are reported as skipped. Admin
+    only.
+    """
+    status = MODERATION_STATUS[moderation_in.action]
+    events = crud.event.moderate(db, ids=moderation_in.ids, status=status)
+    updated = {event.id for event in events}
+    return schemas.EventModerationResult(
+        updated=events,
+        skipped=[i for i in dict.fromkeys(moderation_in.ids) if i not in updated],
+    )
+
+
+@router.post("/pending/claim", response_model=List[schemas.Event])
+def claim_pending_events(
+    *,
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Reserve the next pending events for the current moderator, so other
+    moderators are handed different ones. Claims expire after
+    `EVENT_MODERATION_LEASE_SECONDS`. Admin only.
+    """
+    return crud.event.claim_pending(
+        db, moderator_id=str(current_user.id), limit=limit
+    )
+
+
+def _moderate_event(
+    db: Session, event_id: str, status: models.EventStatus
+) -> models.Event:
+    events = crud.event.moderate(db, ids=[event_id], status=status)
+    if events:
+        return events[0]
+    event = crud.event.get(db=db, id=event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    raise HTTPException(
+        status_code=400,
+        detail=f"Event is already {event.status}"
     )
-    return events
 
 
 @router.post("/{event_id}/approve", response_model=schemas.Event)
@@ -31,23 +673,12 @@ def approve_event(
     *,
     db: Session = Depends(deps.get_db),
     event_id: str,
-    current_user: models.User = Depends(deps.get_current_admin_user),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Approve an event. Admin only.
     """
-    event = crud.event.get(db=db, id=event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if event.status != models.EventStatus.PENDING:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Event is already {event.status}"
-        )
-    
-    event_in = schemas.EventUpdate(status=models.EventStatus.APPROVED)
-    event = crud.event.update(db=db, db_obj=event, obj_in=event_in)
-    return event
+    return _moderate_event(db, event_id, models.EventStatus.APPROVED)
 
 
 @router.post("/{event_id}/reject", response_model=schemas.Event)
@@ -55,37 +686,51 @@ def reject_event(
     *,
     db: Session = Depends(deps.get_db),
     event_id: str,
-    current_user: models.User = Depends(deps.get_current_admin_user),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Reject an event. Admin only.
     """
-    event = crud.event.get(db=db, id=event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if event.status != models.EventStatus.PENDING:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Event is already {event.status}"
-        )
-    
-    event_in = schemas.EventUpdate(status=models.EventStatus.REJECTED)
-    event = crud.event.update(db=db, db_obj=event, obj_in=event_in)
-    return event
+    return _moderate_event(db, event_id, models.EventStatus.REJECTED)
 
 
-@router.get("/", response_model=List[schemas.Event])
+@router.get("/", response_model=schemas.EventList)
 def list_events(
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    city: Optional[str] = None,
+    event_type: Optional[str] = None,
+    status: Optional[models.EventStatus] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    is_sponsored: Optional[bool] = None,
+    organizer_id: Optional[str] = None,
+    sort: schemas.EventSort = schemas.EventSort.DATE_ASC,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+    _: None = Depends(events_not_modified),
 ) -> Any:
     """
-    Retrieve events.
+    Retrieve events, optionally filtered, by date (`sort=-event_date` for
+    newest first). Pass `next_cursor` back as `cursor` for the next page.
     """
-    events = crud.event.get_multi(db, skip=skip, limit=limit)
-    return events
+    filters = schemas.EventFilter(
+        city=city,
+        event_type=event_type,
+        status=status,
+        start_date=start_date,
+        end_date=end_date,
+        is_sponsored=is_sponsored,
+        organizer_id=organizer_id,
+        sort=sort,
+    )
+    return _event_page(
+        crud.event.get_multi_filtered,
+        db=db,
+        filters=filters,
+        cursor=cursor,
+        limit=limit,
+    )
 
 
 @router.post("/", response_model=schemas.Event)
@@ -93,7 +738,7 @@ def create_event(
     *,
     db: Session = Depends(deps.get_db),
     event_in: schemas.EventCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new event.
@@ -110,7 +755,7 @@ def update_event(
     db: Session = Depends(deps.get_db),
     event_id: str,
     event_in: schemas.EventUpdate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update an event.
@@ -130,15 +775,22 @@ def read_event(
     *,
     db: Session = Depends(deps.get_db),
     event_id: str,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get event by ID.
+    Get event, or an occurrence of a recurring event, by ID.
     """
-    event = crud.event.get(db=db, id=event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    payload = crud.event.get_detail_json(db=db, id=event_id)
+    if payload is None:
+        occurrence = crud.event_series.get_occurrence(db, id=event_id)
+        if occurrence is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        return occurrence
+    crud.event_trending.record_view(event_id)
+    crud.event_recommendation.record_interaction(
+        str(current_user.id), event_id, "viewed"
+    )
+    return Response(content=payload, media_type="application/json")
 
 
 @router.delete("/{event_id}", response_model=schemas.Event)
@@ -146,7 +798,7 @@ def delete_event(
     *,
     db: Session = Depends(deps.get_db),
     event_id: str,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete an event.
@@ -161,32 +813,37 @@ def delete_event(
     return event
 
 
-@router.get("/type/{event_type}", response_model=List[schemas.Event])
+@router.get("/type/{event_type}", response_model=schemas.EventList)
 def list_events_by_type(
     event_type: str,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve events by type.
     """
-    events = crud.event.get_multi_by_type(
-        db=db, event_type=event_type, skip=skip, limit=limit
+    return _event_page(
+        crud.event.get_multi_by_type,
+        db=db,
+        event_type=event_type,
+        cursor=cursor,
+        limit=limit,
     )
-    return events
 
 
-@router.get("/upcoming/", response_model=List[schemas.Event])
+@router.get("/upcoming/", response_model=schemas.EventList)
 def list_upcoming_events(
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
+    _: None = Depends(upcoming_not_modified),
 ) -> Any:
     """
     Retrieve upcoming events.
     """
-    events = crud.event.get_upcoming_events(db=db, skip=skip, limit=limit)
-    return events
+    return _event_page(
+        crud.event.get_upcoming_events, db=db, cursor=cursor, limit=limit
+    )
@@ -1,7 +1,7 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
 from app.models.user import AdminPermission
 
@@ -11,8 +11,8 @@ router = APIRouter()
 @router.get("/", response_model=schemas.MarketingCampaignList)
 def list_campaigns(
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(
-        deps.get_current_user
+    current_user: schemas.Principal = Depends(
+        deps.get_current_principal
     ),
     skip: int = 0,
     limit: int = 100,
@@ -41,7 +41,7 @@ def create_campaign(
     *,
     db: Session = Depends(deps.get_db),
     campaign_in: schemas.MarketingCampaignCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """Create new marketing campaign."""
     if not (current_user.is_admin or current_user.is_sponsor):
@@ -69,7 +69,7 @@ def create_campaign(
 def get_campaign(
     campaign_id: str,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """Get specific marketing campaign."""
     campaign = crud.marketing_campaign.get(db, id=campaign_id)
@@ -91,7 +91,7 @@ def update_campaign(
     campaign_id: str,
     campaign_in: schemas.MarketingCampaignUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """Update marketing campaign."""
     campaign = crud.marketing_campaign.get(db, id=campaign_id)
@@ -117,7 +117,7 @@ def update_campaign(
 def delete_campaign(
     campaign_id: str,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """Delete marketing campaign."""
     campaign = crud.marketing_campaign.get(db, id=campaign_id)
@@ -138,7 +138,7 @@ def delete_campaign(
 @router.get("/stats/overview", response_model=dict)
 def get_campaign_stats(
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_admin_user),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """Get marketing campaign statistics."""
     if not current_user.has_permission(AdminPermission.VIEW_ANALYTICS):
@@ -155,7 +155,7 @@ def update_campaign_metrics(
     campaign_id: str,
     metrics: schemas.MarketingCampaignMetrics,
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(deps.get_current_admin_user),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """Update campaign metrics."""
     if not current_user.has_permission(AdminPermission.MANAGE_MARKETING):
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app import crud
-from app.models.user import User
+from app.schemas.user import Principal
 from app.schemas.sponsor import (
     Sponsor, SponsorCreate, SponsorUpdate, SponsorAnalytics
 )
@@ -17,7 +17,7 @@ def create_sponsor(
     *,
     db: Session = Depends(deps.get_db),
     sponsor_in: SponsorCreate,
-    current_user: User = Depends(deps.get_current_sponsor_user)
+    current_user: Principal = Depends(deps.get_current_sponsor_user)
 ) -> Any:
     """
     Create new sponsor profile.
@@ -39,7 +39,7 @@ def create_sponsor(
 @router.get("/me", response_model=Sponsor)
 def get_sponsor_me(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_sponsor_user)
+    current_user: Principal = Depends(deps.get_current_sponsor_user)
 ) -> Any:
     """
     Get current sponsor profile.
@@ -58,7 +58,7 @@ def update_sponsor_me(
     *,
     db: Session = Depends(deps.get_db),
     sponsor_in: SponsorUpdate,
-    current_user: User = Depends(deps.get_current_sponsor_user)
+    current_user: Principal = Depends(deps.get_current_sponsor_user)
 ) -> Any:
     """
     Update current sponsor profile.
@@ -76,7 +76,7 @@ def update_sponsor_me(
 @router.get("/analytics/me", response_model=SponsorAnalytics)
 def get_sponsor_analytics(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_sponsor_user)
+    current_user: Principal = Depends(deps.get_current_sponsor_user)
 ) -> Any:
     """
     Get current sponsor analytics.
@@ -115,7 +115,7 @@ def get_sponsors(
 def get_sponsor(
     sponsor_id: str,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user)
+    current_user: Principal = Depends(deps.get_current_active_user)
 ) -> Any:
     """
     Get sponsor by ID.
@@ -1,6 +1,6 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from app import models
+from app import schemas
 from app.api import deps
 import os
 from pathlib import Path
@@ -60,7 +60,7 @@ def optimize_image(
 async def upload_image(
     category: str,
     file: UploadFile = File(...),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Upload an image file.
@@ -128,7 +128,7 @@ async def upload_image(
 async def delete_image(
     category: str,
     filename: str,
-    current_user: models.User = Depends(deps.get_current_admin_user),
+    current_user: schemas.Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Delete an uploaded image. Admin only.
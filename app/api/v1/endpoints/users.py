@@ -19,7 +19,7 @@ def read_users(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(require_user_management),
+    current_user: schemas.Principal = Depends(require_user_management),
 ) -> Any:
     """
     Retrieve users.
@@ -33,7 +33,7 @@ def create_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: schemas.UserCreate,
-    current_user: models.User = Depends(require_user_management),
+    current_user: schemas.Principal = Depends(require_user_management),
 ) -> Any:
     """
     Create new user.
@@ -54,7 +54,7 @@ def update_user_role(
     db: Session = Depends(deps.get_db),
     user_id: str,
     role: UserRole = Body(..., embed=True),
-    current_user: models.User = Depends(require_user_management),
+    current_user: schemas.Principal = Depends(require_user_management),
 ) -> Any:
     """
     Update user role.
@@ -77,7 +77,7 @@ def update_user_status(
     db: Session = Depends(deps.get_db),
     user_id: str,
     is_active: bool = Body(..., embed=True),
-    current_user: models.User = Depends(require_user_management),
+    current_user: schemas.Principal = Depends(require_user_management),
 ) -> Any:
     """
     Activate or deactivate user.
@@ -97,7 +97,7 @@ def update_user_status(
 @router.get("/stats/overview", response_model=Dict)
 def get_user_stats(
     db: Session = Depends(deps.get_db),
-    current_user: models.User = Depends(require_user_management),
+    current_user: schemas.Principal = Depends(require_user_management),
 ) -> Any:
     """
     Get user statistics.
@@ -124,7 +124,7 @@ def update_user_me(
     password: str = Body(None),
     full_name: str = Body(None),
     email: EmailStr = Body(None),
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Update own user.
@@ -143,7 +143,7 @@ def update_user_me(
 
 @router.get("/me", response_model=schemas.User)
 def read_user_me(
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     """
     Get current user.
@@ -154,14 +154,14 @@ def read_user_me(
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user_by_id(
     user_id: str,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.Principal = Depends(deps.get_current_active_user),
     db: Session = Depends(deps.get_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
     user = crud.user.get(db, id=user_id)
-    if user == current_user:
+    if user is not None and user.id == current_user.id:
         return user
     if not current_user.has_permission(AdminPermission.MANAGE_USERS):
         raise HTTPException(
@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from redis import RedisError
+from app.core.redis import PROCESS_ID, publish, redis_client, subscribe
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU mapping with an optional per-entry TTL.
+
+    Keeps `hits` and `misses` counters so callers can expose cache
+    effectiveness.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+# Fill the shared tier only if nobody invalidated the key since the
+# reader sampled its version. KEYS: value, version. ARGV: version, payload,
+# ttl.
+_FILL_SCRIPT = """
+local version = redis.call('GET', KEYS[2]) or '0'
+if version ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# Bump the key's version and drop its value. KEYS: value, version.
+# ARGV: version ttl.
+_INVALIDATE_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+
+class ReadThroughCache:
+    """
+    Two-tier read-through cache of serialized payloads: an in-process
+    LRU in front of Redis (when `REDIS_ENABLED`).
+
+    Writers call `invalidate` after committing. Readers never fill a
+    tier with a payload loaded before the latest invalidation of that
+    key: locally via an invalidation epoch, in Redis via a per-key
+    version that the fill script compares atomically. Invalidations are
+    broadcast so other workers drop their local copies too.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int = 1024,
+        ttl: int = 300,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared_hits = 0
+        self._epoch = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._invalidated_floor = 0
+        self._max_invalidated = maxsize * 4
+        self._lock = threading.Lock()
+        self._channel = f"cache:{namespace}"
+        subscribe(
+            self._channel, lambda message: self._drop_local(message["key"])
+        )
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Optional[str]]
+    ) -> Optional[str]:
+        payload = self.local.get(key)
+        if payload is not None:
+            return payload
+        with self._lock:
+            started = self._epoch
+
+        version = None
+        if settings.REDIS_ENABLED:
+            try:
+                payload, version = redis_client.mget(
+                    self._value_key(key), self._version_key(key)
+                )
+            except RedisError as e:
+                logger.warning(f"Shared cache read failed: {str(e)}")
+        if payload is not None:
+            self.shared_hits += 1
+        else:
+            payload = loader()
+            if payload is None:
+                return None
+            self._fill_shared(key, payload, version or "0")
+        self._fill_local(key, payload, started)
+        return payload
+
+    def invalidate(self, key: str) -> None:
+        self._drop_local(key)
+        if settings.REDIS_ENABLED:
+            try:
+                redis_client.eval(
+                    _INVALIDATE_SCRIPT,
+                    2,
+                    self._value_key(key),
+                    self._version_key(key),
+                    self.ttl * 10,
+                )
+            except RedisError as e:
+                logger.warning(f"Shared cache invalidation failed: {str(e)}")
+        publish(self._channel, {"key": key})
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "local_hits": self.local.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.local.misses - self.shared_hits,
+            "size": len(self.local),
+        }
+
+    def _value_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _version_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}:version"
+
+    def _drop_local(self, key: Hashable) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._invalidated[key] = self._epoch
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self._max_invalidated:
+                _, epoch = self._invalidated.popitem(last=False)
+                self._invalidated_floor = max(self._invalidated_floor, epoch)
+            self.local.delete(key)
+
+    def _fill_local(self, key: Hashable, payload: str, started: int) -> None:
+        with self._lock:
+            invalidated = self._invalidated.get(key, self._invalidated_floor)
+            if invalidated <= started:
+                self.local.set(key, payload)
+
+    def _fill_shared(self, key: str, payload: str, version: str) -> None:
+        if not settings.REDIS_ENABLED:
+            return
+        try:
+            redis_client.eval(
+                _FILL_SCRIPT,
+                2,
+                self._value_key(key),
+                self._version_key(key),
+                version,
+                payload,
+                self.ttl,
+            )
+        except RedisError as e:
+            logger.warning(f"Shared cache fill failed: {str(e)}")
+
+
+class ResourceVersion:
+    """
+    Change counter for a resource, bumped by every CRUD write to it.
+
+    Shared through Redis when `REDIS_ENABLED`, so all workers agree on
+    it without touching the database. Otherwise, or if Redis fails, the
+    version is scoped to this process so it can never match a version
+    issued by another worker.
+    """
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        self._key = f"version:{resource}"
+        self._local = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> str:
+        if settings.REDIS_ENABLED:
+            try:
+                return redis_client.get(self._key) or "0"
+            except RedisError as e:
+                logger.warning(f"Version read failed: {str(e)}")
+        return f"{PROCESS_ID[:12]}.{self._local}"
+
+    def bump(self) -> None:
+        with self._lock:
+            self._local += 1
+        if settings.REDIS_ENABLED:
+            try:
+                redis_client.incr(self._key)
+            except RedisError as e:
+                logger.warning(f"Version bump failed: {str(e)}")
@@ -6,9 +6,16 @@ from decouple import config, Csv  # type: ignore
 class Settings:
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = config("SECRET_KEY", default=secrets.token_urlsafe(32))
+    # Access tokens are short-lived; clients renew them at /auth/refresh
     ACCESS_TOKEN_EXPIRE_MINUTES: int = config(
         "ACCESS_TOKEN_EXPIRE_MINUTES",
-        default=60 * 24 * 8,
+        default=15,
+        cast=int
+    )
+    # Refresh tokens expire after this long unused
+    REFRESH_TOKEN_EXPIRE_DAYS: int = config(
+        "REFRESH_TOKEN_EXPIRE_DAYS",
+        default=30,
         cast=int
     )
     BACKEND_CORS_ORIGINS: List[str] = config(
@@ -29,6 +36,256 @@ class Settings:
     # Database
     DATABASE_URL: str = config("DATABASE_URL", default="sqlite:///:memory:")
 
+    # Redis
+    REDIS_ENABLED: bool = config("REDIS_ENABLED", default=False, cast=bool)
+    REDIS_HOST: str = config("REDIS_HOST", default="localhost")
+    REDIS_PORT: int = config("REDIS_PORT", default=6379, cast=int)
+
+    # Rate limiting
+    # Limits are "<requests>/<seconds>"; an empty value disables a policy.
+    # See app/core/ratelimit.py.
+    RATE_LIMIT_ENABLED: bool = config(
+        "RATE_LIMIT_ENABLED",
+        default=True,
+        cast=bool
+    )
+    # Sign-in endpoints, per client IP
+    RATE_LIMIT_AUTH: str = config("RATE_LIMIT_AUTH", default="20/60")
+    # Banner and sponsor view/click tracking, per client IP
+    RATE_LIMIT_TRACKING: str = config("RATE_LIMIT_TRACKING", default="120/60")
+    # Every API route, per user (per client IP when anonymous)
+    RATE_LIMIT_API: str = config("RATE_LIMIT_API", default="3000/60")
+    # Reverse proxies in front of the app. Client IPs are then read that
+    # many entries from the right of X-Forwarded-For, which is as far as
+    # the proxies vouch for; 0 uses the connection's address.
+    RATE_LIMIT_PROXY_HOPS: int = config(
+        "RATE_LIMIT_PROXY_HOPS",
+        default=0,
+        cast=int
+    )
+    # Entries kept by the in-process limiter used without Redis
+    RATE_LIMIT_LOCAL_SIZE: int = config(
+        "RATE_LIMIT_LOCAL_SIZE",
+        default=100000,
+        cast=int
+    )
+
+    # Caching
+    EVENT_FACETS_CACHE_TTL: int = config(
+        "EVENT_FACETS_CACHE_TTL",
+        default=60,
+        cast=int
+    )
+    EVENT_DETAIL_CACHE_SIZE: int = config(
+        "EVENT_DETAIL_CACHE_SIZE",
+        default=10000,
+        cast=int
+    )
+    EVENT_DETAIL_CACHE_TTL: int = config(
+        "EVENT_DETAIL_CACHE_TTL",
+        default=300,
+        cast=int
+    )
+    # Principals behind bearer tokens, see CRUDUser.get_principal
+    PRINCIPAL_CACHE_SIZE: int = config(
+        "PRINCIPAL_CACHE_SIZE",
+        default=10000,
+        cast=int
+    )
+    PRINCIPAL_CACHE_TTL: int = config(
+        "PRINCIPAL_CACHE_TTL",
+        default=60,
+        cast=int
+    )
+
+    # Bulk import / export
+    EVENT_IMPORT_BATCH_SIZE: int = config(
+        "EVENT_IMPORT_BATCH_SIZE",
+        default=1000,
+        cast=int
+    )
+    EVENT_IMPORT_MAX_ERRORS: int = config(
+        "EVENT_IMPORT_MAX_ERRORS",
+        default=1000,
+        cast=int
+    )
+    EVENT_EXPORT_BATCH_SIZE: int = config(
+        "EVENT_EXPORT_BATCH_SIZE",
+        default=1000,
+        cast=int
+    )
+
+    # Archive
+    EVENT_ARCHIVE_AFTER_DAYS: int = config(
+        "EVENT_ARCHIVE_AFTER_DAYS",
+        default=365,
+        cast=int
+    )
+    EVENT_ARCHIVE_BATCH_SIZE: int = config(
+        "EVENT_ARCHIVE_BATCH_SIZE",
+        default=500,
+        cast=int
+    )
+    EVENT_ARCHIVE_INTERVAL_SECONDS: int = config(
+        "EVENT_ARCHIVE_INTERVAL_SECONDS",
+        default=3600,
+        cast=int
+    )
+
+    # Moderation
+    # How long a claimed pending event stays reserved for its moderator
+    EVENT_MODERATION_LEASE_SECONDS: int = config(
+        "EVENT_MODERATION_LEASE_SECONDS",
+        default=300,
+        cast=int
+    )
+    EVENT_MODERATION_MAX_BATCH: int = config(
+        "EVENT_MODERATION_MAX_BATCH",
+        default=500,
+        cast=int
+    )
+
+    # Recurring events
+    # How far ahead newest-first listings start expanding endless series
+    EVENT_SERIES_HORIZON_DAYS: int = config(
+        "EVENT_SERIES_HORIZON_DAYS",
+        default=365,
+        cast=int
+    )
+    # Largest RRULE COUNT accepted; COUNT rules are expanded in full once
+    # to find their last occurrence
+    EVENT_SERIES_MAX_COUNT: int = config(
+        "EVENT_SERIES_MAX_COUNT",
+        default=1000,
+        cast=int
+    )
+
+    # Trending
+    TRENDING_BUCKET_SECONDS: int = config(
+        "TRENDING_BUCKET_SECONDS",
+        default=3600,
+        cast=int
+    )
+    TRENDING_WINDOW_HOURS: int = config(
+        "TRENDING_WINDOW_HOURS",
+        default=48,
+        cast=int
+    )
+    TRENDING_HALF_LIFE_HOURS: float = config(
+        "TRENDING_HALF_LIFE_HOURS",
+        default=6.0,
+        cast=float
+    )
+    TRENDING_REFRESH_SECONDS: int = config(
+        "TRENDING_REFRESH_SECONDS",
+        default=30,
+        cast=int
+    )
+    TRENDING_SIZE: int = config(
+        "TRENDING_SIZE",
+        default=100,
+        cast=int
+    )
+
+    # Promoted feed
+    # How often workers check whether the feed needs rebuilding
+    PROMOTED_REFRESH_SECONDS: int = config(
+        "PROMOTED_REFRESH_SECONDS",
+        default=10,
+        cast=int
+    )
+    # Rebuilt at least this often, as banners start and end with the
+    # clock and their view and click counts don't bump banner versions
+    PROMOTED_MAX_AGE_SECONDS: int = config(
+        "PROMOTED_MAX_AGE_SECONDS",
+        default=60,
+        cast=int
+    )
+    PROMOTED_FEED_SIZE: int = config(
+        "PROMOTED_FEED_SIZE",
+        default=100,
+        cast=int
+    )
+
+    # Recommendations
+    RECOMMEND_HISTORY_SIZE: int = config(
+        "RECOMMEND_HISTORY_SIZE",
+        default=200,
+        cast=int
+    )
+    RECOMMEND_HISTORY_TTL: int = config(
+        "RECOMMEND_HISTORY_TTL",
+        default=90 * 24 * 3600,
+        cast=int
+    )
+    RECOMMEND_HISTORY_USERS: int = config(
+        "RECOMMEND_HISTORY_USERS",
+        default=10000,
+        cast=int
+    )
+
+    # Duplicate detection
+    # MinHash signature length and LSH bands; pairs above roughly
+    # (1 / bands) ** (bands / num_perm) similarity become candidates
+    EVENT_DEDUP_NUM_PERM: int = config(
+        "EVENT_DEDUP_NUM_PERM",
+        default=64,
+        cast=int
+    )
+    EVENT_DEDUP_BANDS: int = config(
+        "EVENT_DEDUP_BANDS",
+        default=16,
+        cast=int
+    )
+    # Estimated Jaccard similarity at which events count as duplicates
+    EVENT_DEDUP_THRESHOLD: float = config(
+        "EVENT_DEDUP_THRESHOLD",
+        default=0.6,
+        cast=float
+    )
+
+    # Password hashing
+    # bcrypt runs on its own executor, see app/core/hashing.py
+    PASSWORD_HASH_WORKERS: int = config(
+        "PASSWORD_HASH_WORKERS",
+        default=2,
+        cast=int
+    )
+    # Hashes allowed to wait for a worker before requests get a 503
+    PASSWORD_HASH_MAX_QUEUE: int = config(
+        "PASSWORD_HASH_MAX_QUEUE",
+        default=32,
+        cast=int
+    )
+    PASSWORD_HASH_USE_PROCESSES: bool = config(
+        "PASSWORD_HASH_USE_PROCESSES",
+        default=False,
+        cast=bool
+    )
+    # bcrypt cost for new hashes; 0 calibrates it at startup to
+    # PASSWORD_HASH_TARGET_MS, within the min/max bounds. Stored hashes
+    # outside the bounds are rehashed at that cost as their users sign in.
+    PASSWORD_HASH_ROUNDS: int = config(
+        "PASSWORD_HASH_ROUNDS",
+        default=0,
+        cast=int
+    )
+    PASSWORD_HASH_TARGET_MS: int = config(
+        "PASSWORD_HASH_TARGET_MS",
+        default=250,
+        cast=int
+    )
+    PASSWORD_HASH_MIN_ROUNDS: int = config(
+        "PASSWORD_HASH_MIN_ROUNDS",
+        default=10,
+        cast=int
+    )
+    PASSWORD_HASH_MAX_ROUNDS: int = config(
+        "PASSWORD_HASH_MAX_ROUNDS",
+        default=15,
+        cast=int
+    )
+
     # Email
     SMTP_TLS: bool = config("SMTP_TLS", default=True, cast=bool)
     SMTP_PORT: Optional[int] = config(
@@ -0,0 +1,230 @@
+import re
+import threading
+import unicodedata
+from itertools import islice
+from typing import (
+    Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+)
+import numpy as np
+
+SHINGLE_SIZE = 5
+SHINGLE_SHIFTS = np.arange(SHINGLE_SIZE, dtype=np.uint64) * np.uint64(8)
+# Folds the rows of a signature band into one integer bucket key
+BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+# Signatures are computed for this many texts at a time when rebuilding
+SIGNATURE_BATCH = 32
+
+_non_word = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_text(*parts: Optional[str]) -> str:
+    """Lowercase, accent-free, punctuation-free text with single spaces"""
+    text = " ".join(part for part in parts if part)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _non_word.sub(" ", text.lower()).strip()
+
+
+class MinHashLSH:
+    """
+    Near-duplicate index over short texts: MinHash signatures bucketed by
+    locality-sensitive hashing.
+
+    Each signature is cut into `bands` bands; texts sharing any band land
+    in the same bucket, so a lookup reads `bands` buckets whatever the
+    index size, and only those candidates are compared. With `r` rows per
+    band, a pair with Jaccard similarity `s` shares a bucket with
+    probability `1 - (1 - s**r)**bands`; candidates below `threshold`
+    (estimated from the full signatures) are dropped.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.6,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        # Odd multipliers, as multiply-shift hashing requires
+        self._a = rng.randint(
+            0, 1 << 63, size=num_perm, dtype=np.uint64
+        ) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._signatures: Dict[str, np.ndarray] = {}
+        # Per band, band key -> the key, or set of keys, in that bucket
+        self._buckets: List[Dict[int, Union[str, Set[str]]]] = [
+            {} for _ in range(bands)
+        ]
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        `(len(texts), num_perm)` MinHash signatures, in one vectorized
+        pass over a batch of texts.
+
+        Shingles are the `SHINGLE_SIZE`-byte windows of each text's UTF-8
+        encoding, packed into one integer each. They are permuted with
+        multiply-shift hashing, `(a * x + b) >> 32` in wrapping 64-bit
+        arithmetic, and reduced to a minimum per text with
+        `minimum.reduceat`.
+        """
+        encoded = [text.encode().ljust(SHINGLE_SIZE, b"\0") for text in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        windows = np.lib.stride_tricks.sliding_window_view(blob, SHINGLE_SIZE)
+        packed = (windows.astype(np.uint64) << SHINGLE_SHIFTS).sum(axis=1)
+        # Keep only windows that lie within a single text
+        counts = lengths - SHINGLE_SIZE + 1
+        offsets = np.cumsum(counts) - counts
+        starts = np.cumsum(lengths) - lengths
+        positions = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+        # In place, to keep to one (num_perm, shingles) buffer
+        permuted = self._a[:, None] * packed[positions]
+        permuted += self._b[:, None]
+        permuted >>= np.uint64(32)
+        return np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+
+    def signature(self, text: str) -> np.ndarray:
+        return self.signatures([text])[0]
+
+    def _band_keys(self, signatures: np.ndarray) -> List[List[int]]:
+        """One integer per band of each signature in `signatures`"""
+        bands = signatures.reshape(
+            len(signatures), self.bands, self.rows
+        ).astype(np.uint64)
+        keys = bands[:, :, 0]
+        for row in range(1, self.rows):
+            keys = keys * BAND_MULTIPLIER + bands[:, :, row]
+        return keys.tolist()
+
+    def _insert(self, key: str, signature: np.ndarray, band_keys: List[int]) -> None:
+        self._remove(key)
+        self._signatures[key] = signature
+        for table, band_key in zip(self._buckets, band_keys):
+            # Most buckets hold one key; store it bare rather than in a set
+            bucket = table.get(band_key)
+            if bucket is None:
+                table[band_key] = key
+            elif isinstance(bucket, str):
+                table[band_key] = {bucket, key}
+            else:
+                bucket.add(key)
+
+    def _remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for table, band_key in zip(self._buckets, self._band_keys(signature[None])[0]):
+            bucket = table.get(band_key)
+            if bucket == key:
+                del table[band_key]
+            elif isinstance(bucket, set):
+                bucket.discard(key)
+                if len(bucket) == 1:
+                    table[band_key] = bucket.pop()
+
+    def upsert(self, key: str, text: str) -> None:
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature[None])[0]
+        with self._lock:
+            self._insert(key, signature, band_keys)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def replace_all(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Replace the contents with `(key, text)` items"""
+        fresh = MinHashLSH(self.num_perm, self.bands, self.threshold)
+        fresh._a, fresh._b = self._a, self._b
+        items = iter(items)
+        while True:
+            batch = list(islice(items, SIGNATURE_BATCH))
+            if not batch:
+                break
+            keys, texts = zip(*batch)
+            signatures = fresh.signatures(texts)
+            for key, signature, band_keys in zip(
+                keys, signatures, fresh._band_keys(signatures)
+            ):
+                fresh._insert(key, signature, band_keys)
+        with self._lock:
+            self._signatures = fresh._signatures
+            self._buckets = fresh._buckets
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.count_nonzero(first == second)) / first.size
+
+    def query(
+        self, text: str, *, exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Keys of texts similar to `text`, most similar first"""
+        signature = self.signature(text)
+        with self._lock:
+            candidates: Set[str] = set()
+            band_keys = self._band_keys(signature[None])[0]
+            for table, band_key in zip(self._buckets, band_keys):
+                bucket = table.get(band_key)
+                if isinstance(bucket, str):
+                    candidates.add(bucket)
+                elif bucket is not None:
+                    candidates.update(bucket)
+            candidates.discard(exclude)
+            matches = [
+                (key, self.similarity(signature, self._signatures[key]))
+                for key in candidates
+            ]
+        matches = [match for match in matches if match[1] >= self.threshold]
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches
+
+    def clusters(self) -> List[List[str]]:
+        """
+        Groups of keys linked by above-threshold similarity, largest
+        first. Only pairs sharing a bucket are compared.
+        """
+        parent: Dict[str, str] = {}
+
+        def find(key: str) -> str:
+            parent.setdefault(key, key)
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        with self._lock:
+            compared: Set[Tuple[str, str]] = set()
+            for table in self._buckets:
+                for bucket in table.values():
+                    if isinstance(bucket, str):
+                        continue
+                    keys = sorted(bucket)
+                    for i, first in enumerate(keys):
+                        for second in keys[i + 1:]:
+                            if (first, second) in compared:
+                                continue
+                            compared.add((first, second))
+                            if self.similarity(
+                                self._signatures[first],
+                                self._signatures[second],
+                            ) >= self.threshold:
+                                parent[find(first)] = find(second)
+        groups: Dict[str, List[str]] = {}
+        for key in parent:
+            groups.setdefault(find(key), []).append(key)
+        return sorted(
+            (sorted(group) for group in groups.values() if len(group) > 1),
+            key=lambda group: (-len(group), group[0]),
+        )
@@ -0,0 +1,105 @@
+import math
+from typing import List, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+
+def geohash_encode(
+    lat: float, lon: float, precision: int = GEOHASH_PRECISION
+) -> str:
+    """Encode a coordinate as a geohash of `precision` characters."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bit, ch, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch <<= 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """Cell `(height, width)` in degrees at the given precision."""
+    bits = precision * 5
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def geohash_decode(geohash: str) -> Tuple[float, float]:
+    """Center `(lat, lon)` of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for c in geohash:
+        value = _DECODE[c]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (
+        (lat_range[0] + lat_range[1]) / 2,
+        (lon_range[0] + lon_range[1]) / 2,
+    )
+
+
+def geohash_precision_for_radius(lat: float, radius_km: float) -> int:
+    """
+    Longest geohash precision whose cells are at least `radius_km` on
+    both sides at this latitude, so the 3x3 block of cells around a point
+    covers the whole search circle.
+    """
+    km_per_degree = math.pi * EARTH_RADIUS_KM / 180
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size(precision)
+        width_km = width * km_per_degree * math.cos(math.radians(lat))
+        if height * km_per_degree >= radius_km and width_km >= radius_km:
+            return precision
+    return 1
+
+
+def geohash_neighborhood(geohash: str) -> List[str]:
+    """The cell itself plus its (up to) eight neighbours."""
+    lat, lon = geohash_decode(geohash)
+    height, width = geohash_cell_size(len(geohash))
+    cells = []
+    for dlat in (-height, 0.0, height):
+        for dlon in (-width, 0.0, width):
+            n_lat = lat + dlat
+            if not -90.0 < n_lat < 90.0:
+                continue
+            n_lon = (lon + dlon + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(n_lat, n_lon, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import (
+    get_password_hash, verify_and_update, verify_password
+)
+
+logger = logging.getLogger(__name__)
+
+# Recent hash and queue-wait timings kept for the stats
+LATENCY_SAMPLES = 1000
+# Assumed cost of one hash before any has been timed
+DEFAULT_HASH_SECONDS = 0.25
+
+
+def _timed(func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    """Run `func` and return its result with its duration in seconds"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def _summary(samples: Deque[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"mean": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p95": round(ordered[int(len(ordered) * 0.95)] * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+class HasherBusy(Exception):
+    """Raised when the password hasher's queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            f"Password hashing is saturated, retry after {retry_after}s"
+        )
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on its own bounded executor, so slow hashes never hold
+    the threadpool that serves sync endpoints.
+
+    At most `workers` hashes run at once (threads, or processes with
+    `use_processes`) and at most `max_queue` more wait for a worker.
+    Submissions beyond that raise HasherBusy straight away instead of
+    queueing without bound; its `retry_after` estimates how long the
+    backlog takes to drain.
+    """
+
+    def __init__(
+        self, workers: int, max_queue: int, use_processes: bool = False
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self.completed = 0
+        self.rejected = 0
+        self._pending = 0
+        self._executor: Optional[Executor] = None
+        self._hash_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._wait_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hash",
+                )
+        return self._executor
+
+    def _retry_after(self) -> int:
+        hash_seconds = (
+            sum(self._hash_times) / len(self._hash_times)
+            if self._hash_times else DEFAULT_HASH_SECONDS
+        )
+        return max(1, math.ceil(self._pending / self.workers * hash_seconds))
+
+    def _release(self, submitted: float, future: Any) -> None:
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            self.completed += 1
+            elapsed = future.result()[1]
+            self._hash_times.append(elapsed)
+            self._wait_times.append(
+                max(time.perf_counter() - submitted - elapsed, 0.0)
+            )
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusy(self._retry_after())
+            self._pending += 1
+            executor = self._get_executor()
+        submitted = time.perf_counter()
+        # Released when the hash finishes, not when the caller stops
+        # waiting, so abandoned requests still count against the queue
+        future = executor.submit(_timed, func, *args)
+        future.add_done_callback(lambda f: self._release(submitted, f))
+        result, _ = await asyncio.wrap_future(future)
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executor": "process" if self.use_processes else "thread",
+                "bcrypt_rounds": security.bcrypt_rounds,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": min(self._pending, self.workers),
+                "queued": max(self._pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "hash_ms": _summary(self._hash_times),
+                "wait_ms": _summary(self._wait_times),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def calibrate_password_hashing() -> int:
+    """
+    Set the bcrypt cost for this process: PASSWORD_HASH_ROUNDS if set,
+    else the costliest that verifies within PASSWORD_HASH_TARGET_MS here.
+    Existing hashes within PASSWORD_HASH_MIN_ROUNDS..MAX_ROUNDS are kept
+    whatever cost this node picks. Run before the hasher's executor
+    starts, so process pool workers inherit it.
+    """
+    rounds = settings.PASSWORD_HASH_ROUNDS or security.calibrate_bcrypt_rounds(
+        settings.PASSWORD_HASH_TARGET_MS,
+        settings.PASSWORD_HASH_MIN_ROUNDS,
+        settings.PASSWORD_HASH_MAX_ROUNDS,
+    )
+    security.configure_password_hashing(
+        rounds,
+        settings.PASSWORD_HASH_MIN_ROUNDS,
+        settings.PASSWORD_HASH_MAX_ROUNDS,
+    )
+    logger.info(f"Hashing passwords with bcrypt cost {rounds}")
+    return rounds
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
@@ -0,0 +1,82 @@
+import logging
+import threading
+from typing import Any, Callable, Optional
+from redis import RedisError
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    Run `func` every `interval` seconds on a daemon thread.
+
+    Exceptions are logged and the job carries on with the next run, so a
+    transient database or Redis failure never kills the loop.
+
+    An `exclusive` job runs on one worker at a time: each run first takes
+    a Redis lock, held for at most one interval, and is skipped if
+    another worker holds it. Without Redis every worker runs the job, so
+    it must still tolerate concurrent runs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], None],
+        exclusive: bool = False
+    ):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.exclusive = exclusive
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> None:
+        lock = None
+        if self.exclusive and settings.REDIS_ENABLED:
+            lock = redis_client.lock(
+                f"job:{self.name}", timeout=self.interval, blocking=False
+            )
+            try:
+                if not lock.acquire():
+                    return
+            except RedisError as e:
+                logger.warning(f"Job lock for {self.name} failed: {str(e)}")
+                lock = None
+        try:
+            self.func()
+        except Exception as e:
+            logger.exception(f"Periodic job {self.name} failed: {str(e)}")
+        finally:
+            if lock is not None:
+                self._release(lock)
+
+    def _release(self, lock: Any) -> None:
+        try:
+            lock.release()
+        except RedisError as e:
+            # Expired mid-run; another worker may hold it by now
+            logger.warning(f"Job lock for {self.name} lost: {str(e)}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=self.name, daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,300 @@
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, NamedTuple, Optional, Pattern, Tuple
+from fastapi.concurrency import run_in_threadpool
+from jose import jwt
+from redis import RedisError
+from app.core import security
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+# GCRA over one key, on the Redis clock so every worker agrees.
+# KEYS: key. ARGV: emission interval, period (seconds).
+# Returns {allowed, retry after or remaining}; numbers as strings, as
+# Lua numbers are truncated to integers on the way out.
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+if new_tat - now > period then
+    return {0, tostring(new_tat - period - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, tostring(math.floor((period - (new_tat - now)) / interval + 1e-6))}
+"""
+# Loaded once per connection and run by SHA
+_gcra = redis_client.register_script(_GCRA_SCRIPT)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    # Requests left in the current window, when allowed
+    remaining: int
+    # Seconds until the next request would be allowed, when rejected
+    retry_after: float
+
+
+def parse_rate(rate: str) -> Optional[Tuple[int, int]]:
+    """`"<requests>/<seconds>"` as a tuple, None for an empty rate"""
+    if not rate:
+        return None
+    requests, _, seconds = rate.partition("/")
+    return int(requests), int(seconds or 1)
+
+
+class RateLimiter:
+    """
+    Generic cell rate algorithm (GCRA) limiter: `limit` requests per
+    `period` seconds per key, bursts of up to `limit` included.
+
+    Each key holds a single timestamp, the theoretical arrival time of
+    the next request, so a check is one atomic script call in Redis with
+    no per-request log to trim. Without Redis, or while it is
+    unreachable, keys are tracked in a bounded in-process LRU, which
+    limits each worker separately.
+    """
+
+    def __init__(self, namespace: str = "ratelimit", local_size: int = 100000):
+        self.namespace = namespace
+        self.local_size = local_size
+        self._local: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, period: int) -> RateLimitResult:
+        """Count one request against `key` if the limit allows it"""
+        interval = period / limit
+        if settings.REDIS_ENABLED:
+            try:
+                allowed, value = _gcra(
+                    keys=[f"{self.namespace}:{key}"], args=[interval, period]
+                )
+                if int(allowed):
+                    return RateLimitResult(True, int(float(value)), 0.0)
+                return RateLimitResult(False, 0, float(value))
+            except RedisError as e:
+                logger.warning(f"Redis rate limit check failed: {str(e)}")
+        return self._hit_local(key, interval, period)
+
+    async def hit_async(
+        self, key: str, limit: int, period: int
+    ) -> RateLimitResult:
+        """`hit`, in the threadpool when it waits on Redis"""
+        if settings.REDIS_ENABLED:
+            return await run_in_threadpool(self.hit, key, limit, period)
+        return self.hit(key, limit, period)
+
+    def _hit_local(
+        self, key: str, interval: float, period: int
+    ) -> RateLimitResult:
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._local.get(key, now), now)
+            new_tat = tat + interval
+            if new_tat - now > period:
+                return RateLimitResult(False, 0, new_tat - period - now)
+            self._local[key] = new_tat
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+        # The epsilon absorbs float error in the large clock values, which
+        # would otherwise turn an exact count like 1.0 into 0.999...
+        return RateLimitResult(
+            True, math.floor((period - (new_tat - now)) / interval + 1e-6), 0.0
+        )
+
+    def reset(self) -> None:
+        """Forget the in-process state"""
+        with self._lock:
+            self._local.clear()
+
+
+class RatePolicy(NamedTuple):
+    name: str
+    # Matched against the request path
+    pattern: Pattern
+    limit: int
+    period: int
+    # "ip" or "user"; user policies count anonymous callers by IP
+    per: str = "ip"
+    # Empty for every method
+    methods: Tuple[str, ...] = ()
+
+    def matches(self, method: str, path: str) -> bool:
+        return (
+            (not self.methods or method in self.methods)
+            and self.pattern.match(path) is not None
+        )
+
+
+def policy(
+    name: str,
+    path: str,
+    rate: str,
+    *,
+    per: str = "ip",
+    methods: Tuple[str, ...] = ()
+) -> List[RatePolicy]:
+    """A policy for paths matching the regex `path`, none if `rate` is empty"""
+    parsed = parse_rate(rate)
+    if parsed is None:
+        return []
+    limit, period = parsed
+    return [RatePolicy(name, re.compile(path), limit, period, per, methods)]
+
+
+def default_policies() -> List[RatePolicy]:
+    api = re.escape(settings.API_V1_STR)
+    return [
+        *policy(
+            "auth",
+            rf"^{api}/auth/(login|register|refresh)/?$",
+            settings.RATE_LIMIT_AUTH,
+            methods=("POST",),
+        ),
+        *policy(
+            "tracking",
+            rf"^{api}/(banners/[^/]+/(view|click)|sponsors/[^/]+/track/(view|click))/?$",
+            settings.RATE_LIMIT_TRACKING,
+            methods=("POST",),
+        ),
+        *policy("api", rf"^{api}/", settings.RATE_LIMIT_API, per="user"),
+    ]
+
+
+def _client_ip(scope: dict, proxy_hops: int = 0) -> str:
+    """
+    The caller's address. Behind `proxy_hops` proxies it is the entry
+    the outermost one appended to X-Forwarded-For; anything further left
+    was sent by the client and could be forged.
+    """
+    if proxy_hops:
+        forwarded = [
+            value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+            if name == b"x-forwarded-for"
+        ]
+        hosts = [
+            host.strip() for host in ",".join(forwarded).split(",")
+            if host.strip()
+        ]
+        if hosts:
+            return hosts[-min(proxy_hops, len(hosts))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _user_id(scope: dict) -> Optional[str]:
+    """Subject of a valid bearer token; never touches the database"""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                payload = jwt.decode(
+                    token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+                )
+            except jwt.JWTError:
+                return None
+            return payload.get("sub")
+    return None
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying every matching policy to each HTTP request
+    before it is routed, so rejected requests never reach password
+    hashing or the database. Rejections are 429 with Retry-After; other
+    responses carry RateLimit-Limit and RateLimit-Remaining for the
+    matching policy closest to its limit.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        limiter: RateLimiter,
+        policies: Callable[[], List[RatePolicy]] = default_policies,
+        proxy_hops: Optional[int] = None,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.policies = policies()
+        self.proxy_hops = (
+            settings.RATE_LIMIT_PROXY_HOPS if proxy_hops is None else proxy_hops
+        )
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> Any:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method, path = scope["method"], scope["path"]
+        client_ip = _client_ip(scope, self.proxy_hops)
+        user_id: Optional[str] = None
+        user_resolved = False
+        tightest: Optional[Tuple[int, int]] = None
+        for rate_policy in self.policies:
+            if not rate_policy.matches(method, path):
+                continue
+            if rate_policy.per == "user":
+                if not user_resolved:
+                    user_id, user_resolved = _user_id(scope), True
+                subject = f"user:{user_id}" if user_id else f"ip:{client_ip}"
+            else:
+                subject = f"ip:{client_ip}"
+            result = await self.limiter.hit_async(
+                f"{rate_policy.name}:{subject}",
+                rate_policy.limit,
+                rate_policy.period,
+            )
+            if not result.allowed:
+                return await self._reject(send, result.retry_after)
+            if tightest is None or result.remaining < tightest[1]:
+                tightest = (rate_policy.limit, result.remaining)
+        if tightest is None:
+            return await self.app(scope, receive, send)
+
+        limit, remaining = tightest
+
+        async def send_with_headers(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"ratelimit-limit", str(limit).encode()),
+                        (b"ratelimit-remaining", str(remaining).encode()),
+                    ],
+                }
+            await send(message)
+
+        return await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    async def _reject(send: Callable, retry_after: float) -> None:
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                (b"ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+rate_limiter = RateLimiter(local_size=settings.RATE_LIMIT_LOCAL_SIZE)
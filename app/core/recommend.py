@@ -0,0 +1,220 @@
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Feature fields, in column order of EventFeatureMatrix codes
+FIELDS = ("event_type", "city", "weekday", "time_of_day", "organizer")
+# How much a matching field counts towards an event's score
+FIELD_WEIGHTS = {
+    "event_type": 1.0,
+    "city": 1.0,
+    "weekday": 0.25,
+    "time_of_day": 0.25,
+    "organizer": 0.5,
+}
+TIME_OF_DAY_BUCKETS = 6  # four-hour blocks
+
+Features = List[int]
+
+
+class EventFeatureMatrix:
+    """
+    One-hot feature matrix of upcoming events over event_type, city,
+    weekday, time-of-day and organizer.
+
+    Each row has exactly one active column per field, so the matrix is
+    stored as the `(rows, 5)` array of those column indexes. A product with
+    dense per-user weight vectors `P @ X.T` is then the gather-and-sum
+    `P[:, codes].sum(axis=2)`, computed for every row in one vectorized
+    step. Rows are written in place by `upsert`/`remove` (freed rows are
+    reused), so the matrix never has to be rebuilt after startup.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        # Weekday and time-of-day columns are fixed; the rest are assigned
+        # as new values are seen
+        self._columns: Dict[Tuple[str, str], int] = {}
+        self._column_field: List[int] = []
+        for day in range(7):
+            self._column("weekday", str(day))
+        for bucket in range(TIME_OF_DAY_BUCKETS):
+            self._column("time_of_day", str(bucket))
+        self._codes = np.zeros((capacity, len(FIELDS)), dtype=np.int32)
+        self._starts = np.zeros(capacity, dtype=np.float64)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def n_columns(self) -> int:
+        return len(self._column_field)
+
+    def _column(self, field: str, value: str) -> int:
+        key = (field, value)
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = len(self._column_field)
+            self._column_field.append(FIELDS.index(field))
+        return column
+
+    def features(
+        self,
+        *,
+        event_type: Optional[str],
+        city: Optional[str],
+        organizer_id: Optional[str],
+        event_date: datetime
+    ) -> Features:
+        """Active column per field for an event with these attributes"""
+        with self._lock:
+            return [
+                self._column("event_type", event_type or ""),
+                self._column("city", city or ""),
+                self._column("weekday", str(event_date.weekday())),
+                self._column(
+                    "time_of_day",
+                    str(event_date.hour * TIME_OF_DAY_BUCKETS // 24)
+                ),
+                self._column("organizer", organizer_id or ""),
+            ]
+
+    def _grow(self) -> None:
+        capacity = len(self._ids)
+        self._codes = np.concatenate([self._codes, np.zeros_like(self._codes)])
+        self._starts = np.concatenate([self._starts, np.zeros_like(self._starts)])
+        self._active = np.concatenate([self._active, np.zeros_like(self._active)])
+        self._ids.extend([None] * capacity)
+        self._free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def upsert(
+        self,
+        event_id: str,
+        *,
+        event_type: Optional[str],
+        city: Optional[str],
+        organizer_id: Optional[str],
+        event_date: datetime
+    ) -> None:
+        features = self.features(
+            event_type=event_type,
+            city=city,
+            organizer_id=organizer_id,
+            event_date=event_date,
+        )
+        with self._lock:
+            row = self._rows.get(event_id)
+            if row is None:
+                if not self._free:
+                    self._grow()
+                row = self._rows[event_id] = self._free.pop()
+                self._ids[row] = event_id
+            self._codes[row] = features
+            self._starts[row] = event_date.timestamp()
+            self._active[row] = True
+
+    def remove(self, event_id: str) -> None:
+        with self._lock:
+            row = self._rows.pop(event_id, None)
+            if row is None:
+                return
+            self._active[row] = False
+            self._ids[row] = None
+            self._free.append(row)
+
+    def replace_all(
+        self,
+        rows: Iterable[
+            Tuple[str, Optional[str], Optional[str], Optional[str], datetime]
+        ]
+    ) -> None:
+        """Replace the contents with `(id, type, city, organizer, date)` rows"""
+        fresh = EventFeatureMatrix()
+        for event_id, event_type, city, organizer_id, event_date in rows:
+            fresh.upsert(
+                event_id,
+                event_type=event_type,
+                city=city,
+                organizer_id=organizer_id,
+                event_date=event_date,
+            )
+        with self._lock:
+            self._columns = fresh._columns
+            self._column_field = fresh._column_field
+            self._codes = fresh._codes
+            self._starts = fresh._starts
+            self._active = fresh._active
+            self._ids = fresh._ids
+            self._rows = fresh._rows
+            self._free = fresh._free
+
+    def profile(self, interactions: Iterable[Tuple[Features, float]]) -> np.ndarray:
+        """
+        Weight vector for a user from `(features, weight)` interactions.
+
+        Each field's block is the weighted share of interactions with each
+        value, scaled by `FIELD_WEIGHTS`, so a score is a weighted sum of
+        "how often does this user pick this kind of event".
+        """
+        with self._lock:
+            vector = np.zeros(self.n_columns, dtype=np.float32)
+            field_scale = np.array(
+                [FIELD_WEIGHTS[field] for field in FIELDS], dtype=np.float32
+            )[self._column_field]
+        total = 0.0
+        for features, weight in interactions:
+            vector[features] += weight
+            total += weight
+        if total:
+            vector *= field_scale / total
+        return vector
+
+    def top_k(
+        self,
+        profiles: np.ndarray,
+        k: int,
+        *,
+        now: float,
+        exclude: Sequence[Sequence[str]] = ()
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Best `k` events still to start after `now` for each row of
+        `profiles` (one weight vector per user), skipping the ids in the
+        matching entry of `exclude`.
+        """
+        profiles = np.atleast_2d(profiles)
+        with self._lock:
+            n_columns = self.n_columns
+            if profiles.shape[1] < n_columns:
+                # Columns added since the profiles were built score zero
+                profiles = np.pad(
+                    profiles, ((0, 0), (0, n_columns - profiles.shape[1]))
+                )
+            # One gather per field rather than a (users, rows, 5) temporary
+            scores = profiles[:, self._codes[:, 0]]
+            for field in range(1, len(FIELDS)):
+                scores += profiles[:, self._codes[:, field]]
+            scores[:, ~(self._active & (self._starts >= now))] = -np.inf
+            for i, ids in enumerate(exclude):
+                rows = [self._rows[e] for e in ids if e in self._rows]
+                scores[i, rows] = -np.inf
+
+            results = []
+            for row_scores in scores:
+                k_eff = min(k, row_scores.size)
+                if k_eff == 0:
+                    results.append([])
+                    continue
+                candidates = np.argpartition(-row_scores, k_eff - 1)[:k_eff]
+                candidates = candidates[np.argsort(-row_scores[candidates])]
+                results.append([
+                    (self._ids[row], float(row_scores[row]))
+                    for row in candidates
+                    if np.isfinite(row_scores[row])
+                ])
+        return results
@@ -0,0 +1,168 @@
+from datetime import datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+from dateutil.relativedelta import relativedelta
+from dateutil.rrule import rrule, rrulestr
+from app.core.config import settings
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+UNTIL_FORMAT = "%Y%m%dT%H%M%S"
+# Rough period length in days, used to size backward expansion windows
+PERIOD_DAYS = {"DAILY": 1, "WEEKLY": 7, "MONTHLY": 31, "YEARLY": 366}
+
+
+def _parse(rule: str) -> Dict[str, str]:
+    body = rule.strip()
+    if body.upper().startswith("RRULE:"):
+        body = body[len("RRULE:"):]
+    parts: Dict[str, str] = {}
+    for part in body.split(";"):
+        if not part.strip():
+            continue
+        key, sep, value = part.partition("=")
+        if not sep or not value.strip():
+            raise ValueError(f"Invalid RRULE part: {part}")
+        parts[key.strip().upper()] = value.strip().upper()
+    return parts
+
+
+def _format(parts: Dict[str, str]) -> str:
+    ordered = {"FREQ": parts["FREQ"], **parts}
+    return ";".join(f"{key}={value}" for key, value in ordered.items())
+
+
+def _until(value: str) -> datetime:
+    value = value.rstrip("Z")
+    if "T" in value:
+        return datetime.strptime(value, UNTIL_FORMAT)
+    return datetime.combine(datetime.strptime(value, "%Y%m%d").date(), time.max)
+
+
+def normalize_rrule(rule: str, dtstart: datetime) -> Tuple[str, Optional[datetime]]:
+    """
+    Validate an RRULE and rewrite it so it can be expanded starting from
+    any period boundary, not just `dtstart`.
+
+    Defaults that dateutil would take from `dtstart` (weekday, day of
+    month, month, time of day) are spelled out, and COUNT is replaced by
+    the UNTIL of the last occurrence, which expands the rule in full, so
+    COUNT is capped at `EVENT_SERIES_MAX_COUNT`. Returns the rule and the
+    latest time an occurrence can fall on, or None if it never ends.
+    Raises `ValueError` if the rule is invalid.
+    """
+    parts = _parse(rule)
+    freq = parts.get("FREQ")
+    if freq not in FREQUENCIES:
+        raise ValueError(f"RRULE FREQ must be one of {', '.join(FREQUENCIES)}")
+    if "COUNT" in parts and "UNTIL" in parts:
+        raise ValueError("RRULE cannot have both COUNT and UNTIL")
+    count = parts.get("COUNT", "")
+    if count.isdigit() and int(count) > settings.EVENT_SERIES_MAX_COUNT:
+        raise ValueError(
+            f"RRULE COUNT must be at most {settings.EVENT_SERIES_MAX_COUNT}"
+        )
+
+    if not any(k in parts for k in ("BYWEEKNO", "BYYEARDAY", "BYMONTHDAY", "BYDAY")):
+        if freq == "YEARLY":
+            parts.setdefault("BYMONTH", str(dtstart.month))
+            parts["BYMONTHDAY"] = str(dtstart.day)
+        elif freq == "MONTHLY":
+            parts["BYMONTHDAY"] = str(dtstart.day)
+        elif freq == "WEEKLY":
+            parts["BYDAY"] = WEEKDAY_CODES[dtstart.weekday()]
+    parts.setdefault("BYHOUR", str(dtstart.hour))
+    parts.setdefault("BYMINUTE", str(dtstart.minute))
+    parts.setdefault("BYSECOND", str(dtstart.second))
+
+    try:
+        parsed = rrulestr(_format(parts), dtstart=dtstart)
+        if "COUNT" in parts:
+            last = None
+            for last in parsed:
+                pass
+            if last is None:
+                raise ValueError("rule has no occurrences")
+            del parts["COUNT"]
+            parts["UNTIL"] = last.strftime(UNTIL_FORMAT)
+            return _format(parts), last
+        if "UNTIL" in parts:
+            until = _until(parts["UNTIL"])
+            parts["UNTIL"] = until.strftime(UNTIL_FORMAT)
+            return _format(parts), until
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid RRULE: {str(e)}")
+    return _format(parts), None
+
+
+def _rebase(rule: str, dtstart: datetime, after: datetime) -> rrule:
+    """
+    The rule expanded from the start of the whole-interval period that
+    contains `after` instead of from `dtstart`.
+
+    For a normalized rule both produce the same occurrences from that
+    period on, so reaching `after` costs at most one period of expansion
+    however long the series has been running.
+    """
+    parts = _parse(rule)
+    freq = parts["FREQ"]
+    interval = int(parts.get("INTERVAL", "1"))
+    start = dtstart
+    if after > dtstart:
+        if freq in ("DAILY", "WEEKLY"):
+            first = datetime.combine(dtstart.date(), time())
+            if freq == "WEEKLY":
+                wkst = WEEKDAY_CODES.index(parts.get("WKST", "MO"))
+                first -= timedelta(days=(dtstart.weekday() - wkst) % 7)
+                step = timedelta(weeks=interval)
+            else:
+                step = timedelta(days=interval)
+            start = first + (after - first) // step * step
+        elif freq == "MONTHLY":
+            months = (after.year - dtstart.year) * 12 + after.month - dtstart.month
+            start = datetime(dtstart.year, dtstart.month, 1) + relativedelta(
+                months=months // interval * interval
+            )
+        else:
+            years = after.year - dtstart.year
+            start = datetime(dtstart.year + years // interval * interval, 1, 1)
+        start = max(start, dtstart)
+    return rrulestr(rule, dtstart=start)
+
+
+def iter_occurrences(
+    rule: str, dtstart: datetime, after: datetime, *, inc: bool = True
+) -> Iterator[datetime]:
+    """Occurrences from `after` onwards, in order, expanded lazily"""
+    return _rebase(rule, dtstart, after).xafter(after, inc=inc)
+
+
+def occurrences_between(
+    rule: str, dtstart: datetime, start: datetime, end: datetime
+) -> List[datetime]:
+    """Occurrences in `[start, end]`"""
+    return _rebase(rule, dtstart, start).between(start, end, inc=True)
+
+
+def iter_occurrences_before(
+    rule: str, dtstart: datetime, before: datetime, stop: Optional[datetime] = None
+) -> Iterator[datetime]:
+    """
+    Occurrences at or before `before` and not earlier than `stop` (or
+    `dtstart`), latest first. Expanded in backward windows that double in
+    size, so the first few are cheap however far back the series goes.
+    """
+    stop = max(stop or dtstart, dtstart)
+    span = timedelta(days=8 * PERIOD_DAYS[_parse(rule)["FREQ"]])
+    end = before
+    while end >= stop:
+        start = max(end - span, stop)
+        window = occurrences_between(rule, dtstart, start, end)
+        for occurrence in reversed(window):
+            if occurrence <= end:
+                yield occurrence
+        end = start - timedelta(microseconds=1)
+        span *= 2
+
+
+def is_occurrence(rule: str, dtstart: datetime, when: datetime) -> bool:
+    return next(iter_occurrences(rule, dtstart, when), None) == when
@@ -1,6 +1,15 @@
-from typing import Optional
+import json
+import logging
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import redis
 from app.core.config import settings
+from app.core.security import RefreshTokenReused
+
+logger = logging.getLogger(__name__)
+
+# Identifies this worker process on the pub/sub channels
+PROCESS_ID = uuid.uuid4().hex
 
 # Redis client for session management
 redis_client = redis.Redis(
@@ -10,46 +19,245 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# Sessions. Each session is a `session:<id>` key holding its user id;
+# every user also has a sorted set of their session ids scored by expiry
+# time, so their sessions are found without scanning the keyspace. Index
+# members outlive expired sessions until the next write or listing for
+# that user prunes them. Scores come from the Redis clock.
+#
+# Every operation is one script, so a session key and its user's index
+# always change together in one round trip. The scripts look up the
+# owning user and build that user's index key themselves, which needs a
+# single Redis instance rather than Redis Cluster.
+
+# Key names, matching _session_key and _user_sessions_key, and adding or
+# refreshing a session in its user's index, pruning expired ones
+_SESSION_LUA = """
+local function session_key(session_id)
+    return 'session:' .. session_id
+end
+local function index_key(user_id)
+    return 'user_sessions:' .. user_id
+end
+local function index_session(user_id, session_id, ttl)
+    local key = index_key(user_id)
+    local now = tonumber(redis.call('TIME')[1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now)
+    redis.call('ZADD', key, now + ttl, session_id)
+    if redis.call('TTL', key) < ttl then
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+"""
+
+# KEYS: session. ARGV: session id, user id, ttl.
+_SET_SESSION_SCRIPT = _SESSION_LUA + """
+local previous = redis.call('GET', KEYS[1])
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+if previous and previous ~= ARGV[2] then
+    -- The id was another user's session
+    redis.call('ZREM', index_key(previous), ARGV[1])
+end
+index_session(ARGV[2], ARGV[1], tonumber(ARGV[3]))
+"""
+
+# KEYS: session. ARGV: session id.
+_DELETE_SESSION_SCRIPT = _SESSION_LUA + """
+local user_id = redis.call('GET', KEYS[1])
+if user_id then
+    redis.call('DEL', KEYS[1])
+    redis.call('ZREM', index_key(user_id), ARGV[1])
+end
+"""
+
+# KEYS: session. ARGV: session id, ttl.
+_EXTEND_SESSION_SCRIPT = _SESSION_LUA + """
+local user_id = redis.call('GET', KEYS[1])
+if user_id then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    index_session(user_id, ARGV[1], tonumber(ARGV[2]))
+end
+"""
+
+# KEYS: index. Returns the ids of the user's unexpired sessions.
+_ACTIVE_SESSIONS_SCRIPT = """
+local now = tonumber(redis.call('TIME')[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+return redis.call('ZRANGE', KEYS[1], 0, -1)
+"""
+
+# Delete the user's sessions and index. KEYS: index. Returns how many
+# sessions were still live.
+_CLEAR_SESSIONS_SCRIPT = _SESSION_LUA + """
+local count = 0
+for _, session_id in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    count = count + redis.call('DEL', session_key(session_id))
+end
+redis.call('DEL', KEYS[1])
+return count
+"""
+
+# Loaded once per connection and run by SHA
+_set_session = redis_client.register_script(_SET_SESSION_SCRIPT)
+_delete_session = redis_client.register_script(_DELETE_SESSION_SCRIPT)
+_extend_session = redis_client.register_script(_EXTEND_SESSION_SCRIPT)
+_active_sessions = redis_client.register_script(_ACTIVE_SESSIONS_SCRIPT)
+_clear_sessions = redis_client.register_script(_CLEAR_SESSIONS_SCRIPT)
+
+
+def _session_key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def _user_sessions_key(user_id: str) -> str:
+    return f"user_sessions:{user_id}"
+
+
 def set_session(session_id: str, user_id: str, expires_in: int = 7200) -> None:
     """Set session with expiration (default 2 hours)"""
-    redis_client.setex(f"session:{session_id}", expires_in, user_id)
+    _set_session(
+        keys=[_session_key(session_id)], args=[session_id, user_id, expires_in]
+    )
 
 def get_session(session_id: str) -> Optional[str]:
     """Get user_id from session"""
-    return redis_client.get(f"session:{session_id}")
+    return redis_client.get(_session_key(session_id))
 
 def delete_session(session_id: str) -> None:
     """Delete session"""
-    redis_client.delete(f"session:{session_id}")
+    _delete_session(keys=[_session_key(session_id)], args=[session_id])
 
 def extend_session(session_id: str, expires_in: int = 7200) -> None:
     """Extend session expiration"""
-    user_id = get_session(session_id)
-    if user_id:
-        set_session(session_id, user_id, expires_in)
+    _extend_session(
+        keys=[_session_key(session_id)], args=[session_id, expires_in]
+    )
 
-def get_active_sessions(user_id: str) -> list[str]:
+def get_active_sessions(user_id: str) -> List[str]:
     """Get all active sessions for a user"""
-    sessions = []
-    for key in redis_client.scan_iter(f"session:*"):
-        if redis_client.get(key) == user_id:
-            sessions.append(key.split(":")[-1])
-    return sessions
-
-def clear_user_sessions(user_id: str) -> None:
-    """Clear all sessions for a user"""
-    for session_id in get_active_sessions(user_id):
-        delete_session(session_id)
-
-# Rate limiting
-def increment_request_count(key: str, window: int = 60) -> int:
-    """Increment request count for rate limiting"""
-    current = redis_client.incr(key)
-    if current == 1:
-        redis_client.expire(key, window)
-    return current
-
-def get_request_count(key: str) -> int:
-    """Get current request count"""
-    count = redis_client.get(key)
-    return int(count) if count else 0
+    return _active_sessions(keys=[_user_sessions_key(user_id)])
+
+def clear_user_sessions(user_id: str) -> int:
+    """Clear all sessions for a user, returning how many there were"""
+    return _clear_sessions(keys=[_user_sessions_key(user_id)])
+
+# Refresh tokens. Each login starts a token family, stored as one hash
+# holding the user, their access-token claims and the hash of the only
+# secret currently valid. Without Redis, CRUDRefreshToken keeps families
+# in the database instead.
+
+# Swap the family's current secret for a new one, in one round trip.
+# KEYS: family. ARGV: presented secret hash, new secret hash, ttl.
+# Returns {0} if the family is unknown or expired, {-1} if the presented
+# secret was already rotated out (the family is deleted), otherwise
+# {1, user id, claims}.
+_ROTATE_REFRESH_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'current')
+if not current then
+    return {0}
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return {-1}
+end
+redis.call('HSET', KEYS[1], 'current', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+local values = redis.call('HMGET', KEYS[1], 'user', 'claims')
+return {1, values[1], values[2]}
+"""
+_rotate_refresh = redis_client.register_script(_ROTATE_REFRESH_SCRIPT)
+
+
+def _refresh_key(family: str) -> str:
+    return f"refresh:{family}"
+
+
+def create_refresh_family(
+    family: str,
+    secret_hash: str,
+    user_id: str,
+    claims: Dict[str, Any],
+    expires_in: int
+) -> None:
+    """Start a refresh token family whose current secret is `secret_hash`"""
+    key = _refresh_key(family)
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping={
+        "current": secret_hash,
+        "user": user_id,
+        "claims": json.dumps(claims),
+    })
+    pipe.expire(key, expires_in)
+    pipe.execute()
+
+
+def rotate_refresh_token(
+    family: str, secret_hash: str, new_secret_hash: str, expires_in: int
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Replace the family's current secret with `new_secret_hash` and return
+    the user id and claims it was issued for. None if the family is
+    unknown or expired; raises RefreshTokenReused, after revoking the
+    family, if `secret_hash` is not the current secret.
+    """
+    result = _rotate_refresh(
+        keys=[_refresh_key(family)],
+        args=[secret_hash, new_secret_hash, expires_in],
+    )
+    if result[0] == 0:
+        return None
+    if result[0] == -1:
+        raise RefreshTokenReused(family)
+    return result[1], json.loads(result[2])
+
+
+def revoke_refresh_family(family: str) -> None:
+    """Invalidate every refresh token of a family"""
+    redis_client.delete(_refresh_key(family))
+
+
+# Cross-worker change notifications
+_subscribers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+
+
+def publish(channel: str, message: Dict[str, Any]) -> None:
+    """Broadcast a change message to the other worker processes"""
+    if not settings.REDIS_ENABLED:
+        return
+    try:
+        redis_client.publish(
+            channel, json.dumps({**message, "origin": PROCESS_ID})
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish to {channel}: {str(e)}")
+
+
+def subscribe(
+    channel: str, handler: Callable[[Dict[str, Any]], None]
+) -> None:
+    """Register a handler for messages published by other workers"""
+    _subscribers.setdefault(channel, []).append(handler)
+
+
+def _dispatch(message: Dict[str, Any]) -> None:
+    payload = json.loads(message["data"])
+    if payload.pop("origin", None) == PROCESS_ID:
+        return
+    for handler in _subscribers.get(message["channel"], []):
+        try:
+            handler(payload)
+        except Exception as e:
+            logger.exception(e)
+
+
+def start_listener() -> Optional[Any]:
+    """Start the background pub/sub thread for registered handlers"""
+    if not settings.REDIS_ENABLED or not _subscribers:
+        return None
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: _dispatch for channel in _subscribers})
+        return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+    except redis.RedisError as e:
+        logger.warning(f"Redis pub/sub unavailable: {str(e)}")
+        return None
@@ -1,22 +1,116 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, UTC
-from typing import Any, Union
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+from app.core.enums import AdminPermission
+
+# The bcrypt cost is part of every hash, so hashes made at any cost keep
+# verifying; see configure_password_hashing for the range left alone
+DEFAULT_BCRYPT_ROUNDS = 12
 
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12,
-    bcrypt__min_rounds=12
+    bcrypt__rounds=DEFAULT_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=DEFAULT_BCRYPT_ROUNDS
 )
+bcrypt_rounds = DEFAULT_BCRYPT_ROUNDS
+
+
+class RefreshTokenReused(Exception):
+    """A rotated-out refresh token was presented; its family is revoked"""
+
+
+def configure_password_hashing(
+    rounds: int,
+    min_rounds: Optional[int] = None,
+    max_rounds: Optional[int] = None
+) -> None:
+    """
+    Hash new passwords at cost `rounds`. verify_and_update rehashes only
+    hashes made outside `[min_rounds, max_rounds]` (default: `rounds`),
+    so nodes that settle on different costs within the range accept
+    each other's hashes instead of rewriting them on every sign-in.
+    """
+    global bcrypt_rounds
+    pwd_context.update(
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=min(rounds, min_rounds or rounds),
+        bcrypt__max_rounds=max(rounds, max_rounds or rounds),
+    )
+    bcrypt_rounds = rounds
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float, min_rounds: int, max_rounds: int, samples: int = 3
+) -> int:
+    """
+    The highest bcrypt cost in `[min_rounds, max_rounds]` whose verify
+    time stays within `target_ms` on this host. Hashing is timed at
+    `min_rounds` only, and each extra round doubles the work.
+    """
+    handler = bcrypt.using(rounds=min_rounds)
+    elapsed = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash("calibration")
+        elapsed = min(elapsed, time.perf_counter() - started)
+    rounds = min_rounds
+    while (
+        rounds < max_rounds
+        and elapsed * 2 ** (rounds + 1 - min_rounds) * 1000 <= target_ms
+    ):
+        rounds += 1
+    return rounds
+
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 8  # 8 days
 
+# Bit positions of permissions in the `perms` claim. Append only: tokens
+# already issued keep their meaning.
+PERMISSION_BITS = {
+    permission: 1 << bit for bit, permission in enumerate(AdminPermission)
+}
+
+
+def encode_permissions(permissions: Iterable[AdminPermission]) -> int:
+    bits = 0
+    for permission in permissions:
+        bits |= PERMISSION_BITS[AdminPermission(permission)]
+    return bits
+
+
+def decode_permissions(bits: int) -> FrozenSet[AdminPermission]:
+    return frozenset(
+        permission for permission, bit in PERMISSION_BITS.items() if bits & bit
+    )
+
+
+def token_claims(user: Any) -> Dict[str, Any]:
+    """
+    What permission checks need to know about `user`, to embed in its
+    access token. `ver` ties the token to the user's token_version.
+    """
+    return {
+        "role": user.role,
+        "lvl": user.admin_level,
+        "perms": encode_permissions(user.permissions or []),
+        "su": bool(user.is_superuser),
+        "ver": user.token_version or 0,
+    }
+
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any],
+    expires_delta: timedelta = None,
+    claims: Optional[Dict[str, Any]] = None
 ) -> str:
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
@@ -24,7 +118,7 @@ def create_access_token(
         expire = datetime.now(UTC) + timedelta(
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     from app.core.config import settings
     encoded_jwt = jwt.encode(
         to_encode,
@@ -34,9 +128,43 @@ def create_access_token(
     return encoded_jwt
 
 
+def hash_refresh_secret(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def create_refresh_token(family: Optional[str] = None) -> Tuple[str, str, str]:
+    """
+    A new opaque refresh token `<family>.<secret>`, in a new family unless
+    one is given. Returns the token, its family and the secret's hash,
+    which is all the server stores.
+    """
+    family = family or secrets.token_urlsafe(16)
+    secret = secrets.token_urlsafe(32)
+    return f"{family}.{secret}", family, hash_refresh_secret(secret)
+
+
+def parse_refresh_token(token: str) -> Optional[Tuple[str, str]]:
+    """The family and secret hash of a refresh token, None if malformed"""
+    family, _, secret = token.partition(".")
+    if not family or not secret:
+        return None
+    return family, hash_refresh_secret(secret)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash was made at a cost outside the
+    configured range, rehash it. Returns whether it matched and the new
+    hash, if any.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
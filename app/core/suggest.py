@@ -0,0 +1,156 @@
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+Entry = Tuple[str, str]  # (kind, display text)
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip diacritics and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+class PrefixIndex:
+    """
+    In-memory weighted prefix index for typeahead.
+
+    Every word-suffix of an entry ("kathak utsav", "utsav") is kept in one
+    sorted array, so a lookup is two bisects plus a top-k over the matching
+    slice. An entry's weight is the number of live documents carrying it;
+    documents drop out when their `expires_at` passes. Top-k results for
+    short prefixes, whose slices are the largest, are memoized until the
+    next write.
+    """
+
+    def __init__(self, memo_prefix_len: int = 2):
+        self.memo_prefix_len = memo_prefix_len
+        self._keys: List[Tuple[str, Entry]] = []
+        self._weights: Dict[Entry, int] = {}
+        self._docs: Dict[Hashable, Tuple[List[Entry], Optional[datetime]]] = {}
+        self._expiry: List[Tuple[datetime, Hashable]] = []
+        self._memo: Dict[Tuple[str, int], List[Tuple[str, str, int]]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(
+        self,
+        doc_id: Hashable,
+        entries: Iterable[Entry],
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        entries = list(dict.fromkeys(e for e in entries if normalize(e[1])))
+        with self._lock:
+            self._remove(doc_id)
+            if not entries:
+                return
+            self._docs[doc_id] = (entries, expires_at)
+            if expires_at is not None:
+                heapq.heappush(self._expiry, (expires_at, doc_id))
+            for entry in entries:
+                self._incr(entry)
+            self._memo.clear()
+
+    def remove(self, doc_id: Hashable) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def replace_all(
+        self,
+        docs: Iterable[
+            Tuple[Hashable, Iterable[Entry], Optional[datetime]]
+        ],
+    ) -> None:
+        """Rebuild from scratch, swapping the new index in atomically."""
+        fresh = PrefixIndex(self.memo_prefix_len)
+        for doc_id, entries, expires_at in docs:
+            entries = list(dict.fromkeys(e for e in entries if normalize(e[1])))
+            if not entries:
+                continue
+            fresh._docs[doc_id] = (entries, expires_at)
+            if expires_at is not None:
+                fresh._expiry.append((expires_at, doc_id))
+            for entry in entries:
+                fresh._weights[entry] = fresh._weights.get(entry, 0) + 1
+        fresh._keys = sorted(
+            (suffix, entry)
+            for entry in fresh._weights
+            for suffix in fresh._suffixes(entry)
+        )
+        heapq.heapify(fresh._expiry)
+        with self._lock:
+            self._keys = fresh._keys
+            self._weights = fresh._weights
+            self._docs = fresh._docs
+            self._expiry = fresh._expiry
+            self._memo = {}
+
+    def search(
+        self, prefix: str, limit: int = 10, now: Optional[datetime] = None
+    ) -> List[Tuple[str, str, int]]:
+        """Top `limit` `(kind, text, weight)` matches, heaviest first."""
+        p = normalize(prefix)
+        if not p:
+            return []
+        with self._lock:
+            self._evict_expired(now or datetime.now())
+            memo_key = (p, limit)
+            if len(p) <= self.memo_prefix_len and memo_key in self._memo:
+                return self._memo[memo_key]
+            lo = bisect_left(self._keys, (p,))
+            hi = bisect_left(self._keys, (p + "\uffff",), lo)
+            matches = {entry for _, entry in self._keys[lo:hi]}
+            top = heapq.nsmallest(
+                limit,
+                matches,
+                key=lambda e: (-self._weights[e], len(e[1]), e),
+            )
+            result = [(kind, text, self._weights[(kind, text)])
+                      for kind, text in top]
+            if len(p) <= self.memo_prefix_len:
+                self._memo[memo_key] = result
+            return result
+
+    def _suffixes(self, entry: Entry) -> List[str]:
+        words = normalize(entry[1]).split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def _incr(self, entry: Entry) -> None:
+        if entry in self._weights:
+            self._weights[entry] += 1
+            return
+        self._weights[entry] = 1
+        for suffix in self._suffixes(entry):
+            insort(self._keys, (suffix, entry))
+
+    def _decr(self, entry: Entry) -> None:
+        self._weights[entry] -= 1
+        if self._weights[entry] > 0:
+            return
+        del self._weights[entry]
+        for suffix in self._suffixes(entry):
+            i = bisect_left(self._keys, (suffix, entry))
+            if i < len(self._keys) and self._keys[i] == (suffix, entry):
+                del self._keys[i]
+
+    def _remove(self, doc_id: Hashable) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for entry in doc[0]:
+            self._decr(entry)
+        self._memo.clear()
+
+    def _evict_expired(self, now: datetime) -> None:
+        while self._expiry and self._expiry[0][0] < now:
+            expires_at, doc_id = heapq.heappop(self._expiry)
+            doc = self._docs.get(doc_id)
+            # Skip heap entries left behind by a later upsert
+            if doc is not None and doc[1] == expires_at:
+                self._remove(doc_id)
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Mapping, Optional
+from redis import RedisError
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Thread-safe per-process buffer of view counts.
+
+    Recording a view is a dict increment under a lock; the counts are
+    handed off in bulk with `drain()`, so no storage is touched per view.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, key: str, count: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += count
+
+    def drain(self) -> Counter:
+        """Return the buffered counts and start a fresh buffer"""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        return counts
+
+
+class BucketedCounts:
+    """
+    Counts per fixed-width time bucket over a sliding window.
+
+    With Redis enabled each bucket is a hash shared by every worker and
+    expires once it leaves the window; otherwise (or while Redis is
+    unreachable) buckets are kept in process.
+    """
+
+    def __init__(self, namespace: str, bucket_seconds: int, window_seconds: int):
+        self.namespace = namespace
+        self.bucket_seconds = bucket_seconds
+        self.window_seconds = window_seconds
+        self._local: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds) * self.bucket_seconds
+
+    def _key(self, bucket: int) -> str:
+        return f"{self.namespace}:{bucket}"
+
+    def add(self, counts: Mapping[str, int], now: Optional[float] = None) -> None:
+        """Add `counts` to the bucket containing `now`"""
+        if not counts:
+            return
+        bucket = self._bucket(time.time() if now is None else now)
+        if settings.REDIS_ENABLED:
+            try:
+                key = self._key(bucket)
+                pipe = redis_client.pipeline(transaction=False)
+                for member, count in counts.items():
+                    pipe.hincrby(key, member, count)
+                pipe.expire(key, self.window_seconds + self.bucket_seconds)
+                pipe.execute()
+                return
+            except RedisError as e:
+                logger.warning(f"Redis {self.namespace} write failed: {str(e)}")
+        with self._lock:
+            self._local.setdefault(bucket, Counter()).update(counts)
+
+    def buckets(self, now: Optional[float] = None) -> Dict[int, Counter]:
+        """Counts for every bucket in the window ending at `now`"""
+        now = time.time() if now is None else now
+        first = self._bucket(now - self.window_seconds)
+        starts = list(range(first, self._bucket(now) + 1, self.bucket_seconds))
+        result: Dict[int, Counter] = {start: Counter() for start in starts}
+        if settings.REDIS_ENABLED:
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                for start in starts:
+                    pipe.hgetall(self._key(start))
+                for start, values in zip(starts, pipe.execute()):
+                    result[start].update(
+                        {member: int(count) for member, count in values.items()}
+                    )
+            except RedisError as e:
+                logger.warning(f"Redis {self.namespace} read failed: {str(e)}")
+        with self._lock:
+            for start in list(self._local):
+                if start < first:
+                    del self._local[start]
+                elif start in result:
+                    result[start].update(self._local[start])
+        return result
+
+
+def decayed_scores(
+    buckets: Mapping[int, Mapping[str, int]],
+    *,
+    now: float,
+    bucket_seconds: int,
+    half_life: float
+) -> Counter:
+    """
+    Sum bucketed counts per member, each bucket weighted by
+    `0.5 ** (age / half_life)` measured from the bucket's midpoint.
+    """
+    scores: Counter = Counter()
+    for start, counts in buckets.items():
+        age = max(now - (start + bucket_seconds / 2), 0.0)
+        weight = 0.5 ** (age / half_life)
+        for member, count in counts.items():
+            scores[member] += count * weight
+    return scores
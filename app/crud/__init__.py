@@ -1,6 +1,12 @@
 from .admin import admin
 from .banner import banner
 from .event import event
+from .event_promoted import event_promoted
+from .event_recommendation import event_recommendation
+from .event_rollup import event_rollup
+from .event_series import event_series
+from .event_trending import event_trending
+from .refresh_token import refresh_token
 from .sponsor import sponsor
 from .user import user
 from .marketing import marketing_campaign
@@ -9,6 +15,12 @@ __all__ = [
     "admin",
     "banner",
     "event",
+    "event_promoted",
+    "event_recommendation",
+    "event_rollup",
+    "event_series",
+    "event_trending",
+    "refresh_token",
     "sponsor",
     "user",
     "marketing_campaign",
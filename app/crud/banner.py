@@ -1,12 +1,17 @@
 import uuid
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Union
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func, desc
 
+from app.core.cache import ResourceVersion
 from app.crud.base import CRUDBase
 from app.models.banner import Banner
 from app.schemas.banner import BannerCreate, BannerUpdate
 
+# Bumped on banner writes; drives ETags on banner listings. View and click
+# counters do not bump it, which is why those ETags are weak.
+banner_version = ResourceVersion("banners")
+
 
 class CRUDBanner(CRUDBase[Banner, BannerCreate, BannerUpdate]):
     def create(self, db: Session, *, obj_in: BannerCreate) -> Banner:
@@ -24,9 +29,26 @@ class CRUDBanner(CRUDBase[Banner, BannerCreate, BannerUpdate]):
         )
         db.add(db_obj)
         db.commit()
+        banner_version.bump()
         db.refresh(db_obj)
         return db_obj
 
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Banner,
+        obj_in: Union[BannerUpdate, Dict[str, Any]]
+    ) -> Banner:
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        banner_version.bump()
+        return db_obj
+
+    def remove(self, db: Session, *, id: Union[str, int]) -> Banner:
+        obj = super().remove(db, id=id)
+        banner_version.bump()
+        return obj
+
     def get_active_banners(
         self, db: Session, *, position: Optional[str] = None
     ) -> List[Banner]:
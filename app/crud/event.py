@@ -1,10 +1,353 @@
-from typing import Dict, Optional, List
-from datetime import datetime, date
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import re
+import uuid
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Optional, List, Tuple, Type, Union
+from datetime import datetime, date, timedelta
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import (
+    and_, bindparam, delete, extract, func, insert, literal, or_, select,
+    text, tuple_, update
+)
+from sqlalchemy.types import DateTime
+from app.core.cache import LRUCache, ReadThroughCache, ResourceVersion
+from app.core.config import settings
+from app.core.dedup import MinHashLSH, normalize_text
+from app.core.geo import (
+    geohash_encode,
+    geohash_neighborhood,
+    geohash_precision_for_radius,
+    haversine_km,
+)
+from app.core.recommend import EventFeatureMatrix
+from app.core.redis import publish, subscribe
+from app.core.suggest import Entry, PrefixIndex
 from app.crud.base import CRUDBase
-from app.models.event import Event
-from app.schemas.event import EventCreate, EventUpdate
+from app.crud.event_rollup import event_rollup, rollup_key
+from app.crud.event_series import event_series
+from app.crud.utils import (
+    encode_cursor, decode_cursor, format_datetime, parse_datetime,
+    upsert_insert
+)
+from app.models.event import (
+    Event, EventArchive, EventModerationLease, EventStatus
+)
+from app.schemas.event import (
+    Event as EventSchema, EventCreate, EventFilter, EventSort, EventUpdate
+)
+
+EventPage = Tuple[List[Event], Optional[str]]
+EventModel = Union[Type[Event], Type[EventArchive]]
+SearchHit = Tuple[str, float, Optional[str]]
+
+SEARCH_FIELDS = ("title", "description", "location", "city")
+SEARCH_MAX_TERMS = 16
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a user query into index terms, dropping any query syntax."""
+    return _SEARCH_TOKEN.findall(q.lower())[:SEARCH_MAX_TERMS]
+
+
+class EventSearchBackend:
+    """
+    Full-text index over event title, description, location and city.
+
+    `unindex` must run before an event's searchable columns change in the
+    database and `index` after they have been flushed, both inside the
+    caller's transaction. The last search term is matched as a prefix.
+    """
+
+    def index(self, db: Session, event_ids: List[str]) -> None:
+        pass
+
+    def unindex(self, db: Session, event_ids: List[str]) -> None:
+        pass
+
+    def rebuild(self, db: Session) -> None:
+        pass
+
+    def search(
+        self, db: Session, terms: List[str], limit: int
+    ) -> List[SearchHit]:
+        conditions = [
+            or_(*[
+                getattr(Event, field).ilike(f"%{term}%")
+                for field in SEARCH_FIELDS
+            ])
+            for term in terms
+        ]
+        rows = (
+            db.query(Event.id)
+            .filter(*conditions)
+            .order_by(Event.event_date, Event.id)
+            .limit(limit)
+            .all()
+        )
+        return [(row.id, 0.0, None) for row in rows]
+
+
+class SQLiteEventSearch(EventSearchBackend):
+    """
+    FTS5 index whose rowids are event_search_key ids. The event table's
+    own rowid is implicit, so VACUUM may renumber it.
+    """
+
+    _columns = ", ".join(SEARCH_FIELDS)
+    _event_columns = ", ".join(f"event.{field}" for field in SEARCH_FIELDS)
+    # Column weights for bm25(): title, description, location, city
+    _rank = "bm25(event_fts, 10.0, 1.0, 4.0, 4.0)"
+
+    def _execute(self, db: Session, statement: str, event_ids: List[str]) -> None:
+        db.execute(
+            text(statement).bindparams(bindparam("ids", expanding=True)),
+            {"ids": event_ids},
+        )
+
+    def index(self, db: Session, event_ids: List[str]) -> None:
+        self._execute(
+            db,
+            "INSERT OR IGNORE INTO event_search_key (event_id) "
+            "SELECT id FROM event WHERE id IN :ids",
+            event_ids,
+        )
+        self._execute(
+            db,
+            f"INSERT INTO event_fts (rowid, {self._columns}) "
+            f"SELECT event_search_key.id, {self._event_columns} FROM event "
+            "JOIN event_search_key ON event_search_key.event_id = event.id "
+            "WHERE event.id IN :ids",
+            event_ids,
+        )
+
+    def unindex(self, db: Session, event_ids: List[str]) -> None:
+        self._execute(
+            db,
+            "DELETE FROM event_fts WHERE rowid IN ("
+            "SELECT id FROM event_search_key WHERE event_id IN :ids)",
+            event_ids,
+        )
+        self._execute(
+            db, "DELETE FROM event_search_key WHERE event_id IN :ids", event_ids
+        )
+
+    def rebuild(self, db: Session) -> None:
+        db.execute(text("DELETE FROM event_fts"))
+        db.execute(text("DELETE FROM event_search_key"))
+        db.execute(
+            text("INSERT INTO event_search_key (event_id) SELECT id FROM event")
+        )
+        db.execute(
+            text(
+                f"INSERT INTO event_fts (rowid, {self._columns}) "
+                f"SELECT event_search_key.id, {self._event_columns} FROM event "
+                "JOIN event_search_key ON event_search_key.event_id = event.id"
+            )
+        )
+
+    def search(
+        self, db: Session, terms: List[str], limit: int
+    ) -> List[SearchHit]:
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        rows = db.execute(
+            text(
+                f"SELECT event.id, -{self._rank} AS score, "
+                "snippet(event_fts, -1, '<mark>', '</mark>', '…', 12) "
+                "AS snippet "
+                "FROM event_fts "
+                "JOIN event_search_key ON event_search_key.id = event_fts.rowid "
+                "JOIN event ON event.id = event_search_key.event_id "
+                f"WHERE event_fts MATCH :match ORDER BY {self._rank} "
+                "LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        )
+        return [(row.id, row.score, row.snippet) for row in rows]
+
+
+class PostgresEventSearch(EventSearchBackend):
+    """Weighted tsvector per event in `event_search`, behind a GIN index."""
+
+    _document = (
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', "
+        "coalesce(city, '') || ' ' || coalesce(location, '')), 'B') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+    )
+
+    def index(self, db: Session, event_ids: List[str]) -> None:
+        db.execute(
+            text(
+                "INSERT INTO event_search (event_id, document) "
+                f"SELECT id, {self._document} FROM event WHERE id IN :ids "
+                "ON CONFLICT (event_id) "
+                "DO UPDATE SET document = EXCLUDED.document"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": event_ids},
+        )
+
+    def unindex(self, db: Session, event_ids: List[str]) -> None:
+        db.execute(
+            text(
+                "DELETE FROM event_search WHERE event_id IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": event_ids},
+        )
+
+    def rebuild(self, db: Session) -> None:
+        db.execute(text("DELETE FROM event_search"))
+        db.execute(
+            text(
+                "INSERT INTO event_search (event_id, document) "
+                f"SELECT id, {self._document} FROM event"
+            )
+        )
+
+    def search(
+        self, db: Session, terms: List[str], limit: int
+    ) -> List[SearchHit]:
+        query = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        rows = db.execute(
+            text(
+                "SELECT event.id, "
+                "ts_rank_cd(event_search.document, q.query, 32) AS score, "
+                "ts_headline('simple', coalesce(event.description, ''), "
+                "q.query, 'StartSel=<mark>, StopSel=</mark>, "
+                "MaxWords=24, MinWords=8') AS snippet "
+                "FROM (SELECT to_tsquery('simple', :query) AS query) AS q "
+                "JOIN event_search ON event_search.document @@ q.query "
+                "JOIN event ON event.id = event_search.event_id "
+                "ORDER BY score DESC LIMIT :limit"
+            ),
+            {"query": query, "limit": limit},
+        )
+        return [(row.id, row.score, row.snippet) for row in rows]
+
+
+_search_backends: Dict[str, EventSearchBackend] = {
+    "sqlite": SQLiteEventSearch(),
+    "postgresql": PostgresEventSearch(),
+}
+
+FACET_FIELDS = ("city", "event_type", "status", "month", "is_sponsored")
+
+# Facet counts per event version and filter combination. A write on any
+# worker bumps the shared event_version, so entries cached before it stop
+# matching everywhere; the local clear just frees them early.
+facets_cache = LRUCache(maxsize=256, ttl=settings.EVENT_FACETS_CACHE_TTL)
+
+# Bumped on every event write; drives ETags on event listings
+event_version = ResourceVersion("events")
+
+
+def archive_horizon() -> datetime:
+    """Events dated before this are moved to `event_archive`"""
+    return datetime.now() - timedelta(days=settings.EVENT_ARCHIVE_AFTER_DAYS)
+
+# Serialized `schemas.Event` payloads by id for the detail endpoint
+event_detail_cache = ReadThroughCache(
+    "event",
+    maxsize=settings.EVENT_DETAIL_CACHE_SIZE,
+    ttl=settings.EVENT_DETAIL_CACHE_TTL,
+)
+
+# In-memory indexes over upcoming events: typeahead over titles, cities and
+# venues, the feature matrix behind recommendations and near-duplicate
+# detection. Built at startup (see app/main.py) and kept current from event
+# writes in every worker. Typeahead is public, so it only ever holds
+# approved events.
+UPCOMING_CHANNEL = "events:upcoming"
+UPCOMING_FIELDS = (
+    "title", "description", "city", "location", "event_date", "status",
+    "event_type", "organizer_id",
+)
+suggest_index = PrefixIndex()
+event_features = EventFeatureMatrix()
+duplicate_index = MinHashLSH(
+    num_perm=settings.EVENT_DEDUP_NUM_PERM,
+    bands=settings.EVENT_DEDUP_BANDS,
+    threshold=settings.EVENT_DEDUP_THRESHOLD,
+)
+
+
+def _suggest_entries(
+    title: Optional[str], city: Optional[str], location: Optional[str]
+) -> List[Entry]:
+    return [
+        (kind, value)
+        for kind, value in (
+            ("title", title), ("city", city), ("venue", location)
+        )
+        if value
+    ]
+
+
+def _duplicate_text(
+    title: Optional[str], description: Optional[str], city: Optional[str]
+) -> str:
+    return normalize_text(title, description, city)
+
+
+def _upcoming_message(event: Any, deleted: bool = False) -> Dict[str, Any]:
+    if (
+        deleted
+        or event.status == EventStatus.REJECTED
+        or event.event_date is None
+        or event.event_date < datetime.now()
+    ):
+        return {"op": "delete", "id": event.id}
+    return {
+        "op": "upsert",
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "city": event.city,
+        "location": event.location,
+        "event_type": event.event_type,
+        "organizer_id": event.organizer_id,
+        "event_date": format_datetime(event.event_date),
+        "approved": event.status == EventStatus.APPROVED,
+    }
+
+
+def _apply_upcoming_message(message: Dict[str, Any]) -> None:
+    if message["op"] == "batch":
+        for item in message["messages"]:
+            _apply_upcoming_message(item)
+        return
+    if message["op"] == "delete":
+        suggest_index.remove(message["id"])
+        event_features.remove(message["id"])
+        duplicate_index.remove(message["id"])
+        return
+    event_date = parse_datetime(message["event_date"])
+    if message.get("approved"):
+        suggest_index.upsert(
+            message["id"],
+            _suggest_entries(
+                message["title"], message["city"], message["location"]
+            ),
+            event_date,
+        )
+    else:
+        suggest_index.remove(message["id"])
+    event_features.upsert(
+        message["id"],
+        event_type=message["event_type"],
+        city=message["city"],
+        organizer_id=message["organizer_id"],
+        event_date=event_date,
+    )
+    duplicate_index.upsert(
+        message["id"],
+        _duplicate_text(
+            message["title"], message.get("description"), message["city"]
+        ),
+    )
+
+
+subscribe(UPCOMING_CHANNEL, _apply_upcoming_message)
 
 
 class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
@@ -19,13 +362,401 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
             event_date=obj_in.event_date,
             event_type=obj_in.event_type,
             image_url=obj_in.image_url,
+            latitude=obj_in.latitude,
+            longitude=obj_in.longitude,
+            geohash=self._geohash(obj_in.latitude, obj_in.longitude),
             organizer_id=organizer_id,
+            duplicate_of=self._duplicate_of(obj_in),
         )
         db.add(db_obj)
+        db.flush()
+        self.search_backend(db).index(db, [db_obj.id])
+        event_rollup.apply(db, [(rollup_key(db_obj), 1)])
+        db.commit()
+        self._invalidate_caches(db_obj.id)
+        db.refresh(db_obj)
+        self._sync_upcoming([db_obj])
+        return db_obj
+
+    def create_many_with_organizer(
+        self, db: Session, *, objs_in: List[EventCreate], organizer_id: str
+    ) -> List[str]:
+        """
+        Insert a batch of events in one executemany and commit.
+
+        Search index, daily rollup, caches and typeahead are updated for
+        the whole batch at once. Returns the new event ids.
+        """
+        if not objs_in:
+            return []
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                **obj_in.model_dump(),
+                # Naive DateTime columns drop the offset; match that here
+                "event_date": obj_in.event_date.replace(tzinfo=None),
+                "geohash": self._geohash(obj_in.latitude, obj_in.longitude),
+                "status": EventStatus.PENDING,
+                "is_sponsored": False,
+                "organizer_id": organizer_id,
+                "duplicate_of": self._duplicate_of(obj_in),
+            }
+            for obj_in in objs_in
+        ]
+        ids = [row["id"] for row in rows]
+        db.execute(insert(Event), rows)
+        self.search_backend(db).index(db, ids)
+        written = [SimpleNamespace(**row) for row in rows]
+        event_rollup.apply(db, [(rollup_key(e), 1) for e in written])
+        db.commit()
+        self._invalidate_caches()
+        self._sync_upcoming(written)
+        return ids
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Event,
+        obj_in: Union[EventUpdate, Dict[str, Any]]
+    ) -> Event:
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        if "latitude" in update_data or "longitude" in update_data:
+            update_data["geohash"] = self._geohash(
+                update_data.get("latitude", db_obj.latitude),
+                update_data.get("longitude", db_obj.longitude),
+            )
+        reindex = any(field in update_data for field in SEARCH_FIELDS)
+        search = self.search_backend(db)
+        if reindex:
+            search.unindex(db, [db_obj.id])
+        old_key = rollup_key(db_obj)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        db.flush()
+        if reindex:
+            search.index(db, [db_obj.id])
+        new_key = rollup_key(db_obj)
+        if new_key != old_key:
+            event_rollup.apply(db, [(old_key, -1), (new_key, 1)])
         db.commit()
+        self._invalidate_caches(db_obj.id)
         db.refresh(db_obj)
+        if any(field in update_data for field in UPCOMING_FIELDS):
+            self._sync_upcoming([db_obj])
         return db_obj
 
+    def remove(self, db: Session, *, id: Union[str, int]) -> Event:
+        obj = db.get(Event, id)
+        self.search_backend(db).unindex(db, [obj.id])
+        event_rollup.apply(db, [(rollup_key(obj), -1)])
+        db.delete(obj)
+        db.commit()
+        self._invalidate_caches(obj.id)
+        self._sync_upcoming([obj], deleted=True)
+        return obj
+
+    def _invalidate_caches(self, *event_ids: str) -> None:
+        """Drop derived data that depends on the event table"""
+        event_version.bump()
+        facets_cache.clear()
+        for event_id in event_ids:
+            event_detail_cache.invalidate(event_id)
+
+    def get_detail_json(self, db: Session, *, id: str) -> Optional[str]:
+        """
+        Serialized `schemas.Event` for one event, read through the
+        two-tier detail cache. None if the event does not exist.
+        """
+        def load() -> Optional[str]:
+            obj = self.get(db, id=id) or db.get(EventArchive, id)
+            if obj is None:
+                return None
+            return EventSchema.model_validate(obj).model_dump_json()
+
+        return event_detail_cache.get_or_load(id, load)
+
+    def _sync_upcoming(
+        self, events: List[Any], deleted: bool = False
+    ) -> None:
+        """Apply event writes to the upcoming-event indexes in every worker"""
+        messages = [_upcoming_message(e, deleted=deleted) for e in events]
+        if not messages:
+            return
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = {"op": "batch", "messages": messages}
+        _apply_upcoming_message(message)
+        publish(UPCOMING_CHANNEL, message)
+
+    def load_upcoming(self, db: Session) -> None:
+        """Build the in-memory indexes over upcoming events"""
+        rows = (
+            db.query(
+                Event.id,
+                Event.title,
+                Event.description,
+                Event.city,
+                Event.location,
+                Event.event_type,
+                Event.organizer_id,
+                Event.event_date,
+                Event.status,
+            )
+            .filter(Event.event_date >= datetime.now())
+            .filter(Event.status != EventStatus.REJECTED)
+            .all()
+        )
+        suggest_index.replace_all(
+            (
+                row.id,
+                _suggest_entries(row.title, row.city, row.location),
+                row.event_date,
+            )
+            for row in rows
+            if row.status == EventStatus.APPROVED
+        )
+        event_features.replace_all(
+            (
+                row.id,
+                row.event_type,
+                row.city,
+                row.organizer_id,
+                row.event_date,
+            )
+            for row in rows
+        )
+        duplicate_index.replace_all(
+            (row.id, _duplicate_text(row.title, row.description, row.city))
+            for row in rows
+        )
+
+    def find_duplicates(
+        self,
+        *,
+        title: Optional[str],
+        description: Optional[str],
+        city: Optional[str],
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Upcoming events whose normalized title, description and city look
+        like these, as `(id, similarity)`, most similar first. An LSH
+        lookup in memory: the cost does not grow with the catalog.
+        """
+        return duplicate_index.query(
+            _duplicate_text(title, description, city), exclude=exclude
+        )
+
+    def _duplicate_of(self, obj_in: EventCreate) -> Optional[str]:
+        matches = self.find_duplicates(
+            title=obj_in.title, description=obj_in.description, city=obj_in.city
+        )
+        return matches[0][0] if matches else None
+
+    def get_duplicate_clusters(
+        self, db: Session, *, limit: int = 100
+    ) -> List[List[Event]]:
+        """Groups of upcoming events that look like copies of each other"""
+        clusters = duplicate_index.clusters()[:limit]
+        ids = [event_id for cluster in clusters for event_id in cluster]
+        events = {
+            obj.id: obj
+            for obj in db.query(Event).filter(Event.id.in_(ids))
+        } if ids else {}
+        loaded = (
+            [events[event_id] for event_id in cluster if event_id in events]
+            for cluster in clusters
+        )
+        return [cluster for cluster in loaded if len(cluster) > 1]
+
+    def suggest(
+        self, *, prefix: str, limit: int = 10
+    ) -> List[Tuple[str, str, int]]:
+        """
+        Typeahead suggestions for titles, cities and venues, weighted by
+        the number of upcoming events behind each. Never touches the
+        database.
+        """
+        return suggest_index.search(prefix, limit)
+
+    @staticmethod
+    def _geohash(
+        latitude: Optional[float], longitude: Optional[float]
+    ) -> Optional[str]:
+        if latitude is None or longitude is None:
+            return None
+        return geohash_encode(latitude, longitude)
+
+    def get_nearby(
+        self,
+        db: Session,
+        *,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        event_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[Tuple[Event, float]]:
+        """
+        Events within `radius_km` of a point, nearest first, as
+        `(event, distance_km)` tuples.
+
+        Candidates come from index range scans over the geohash cell
+        containing the point and its neighbours, sized so the 3x3 block
+        covers the radius; exact great-circle distances are computed only
+        for those.
+        """
+        precision = geohash_precision_for_radius(latitude, radius_km)
+        cells = geohash_neighborhood(
+            geohash_encode(latitude, longitude, precision)
+        )
+        query = db.query(Event).filter(or_(*[
+            # "{" sorts right after "z", the last geohash character
+            and_(Event.geohash >= cell, Event.geohash < cell + "{")
+            for cell in cells
+        ]))
+        if event_type is not None:
+            query = query.filter(Event.event_type == event_type)
+        if start_date is not None:
+            query = query.filter(Event.event_date >= start_date)
+        if end_date is not None:
+            query = query.filter(Event.event_date <= end_date)
+
+        nearby = []
+        for event in query:
+            distance = haversine_km(
+                latitude, longitude, event.latitude, event.longitude
+            )
+            if distance <= radius_km:
+                nearby.append((event, distance))
+        nearby.sort(key=lambda hit: hit[1])
+        return nearby[:limit]
+
+    def search_backend(self, db: Session) -> EventSearchBackend:
+        """Pick the full-text backend for the session's database dialect"""
+        dialect = db.get_bind().dialect.name
+        return _search_backends.get(dialect, EventSearchBackend())
+
+    def search(
+        self, db: Session, *, q: str, limit: int = 20
+    ) -> List[Tuple[Event, float, Optional[str]]]:
+        """
+        Ranked full-text search. Returns `(event, score, snippet)` tuples,
+        best match first; snippets mark matched terms with `<mark>`.
+        """
+        terms = search_terms(q)
+        if not terms:
+            return []
+        hits = self.search_backend(db).search(db, terms, limit)
+        events = {
+            e.id: e
+            for e in db.query(Event).filter(
+                Event.id.in_([event_id for event_id, _, _ in hits])
+            )
+        }
+        return [
+            (events[event_id], score, snippet)
+            for event_id, score, snippet in hits
+            if event_id in events
+        ]
+
+    def get_facets(
+        self,
+        db: Session,
+        *,
+        city: Optional[str] = None,
+        event_type: Optional[str] = None,
+        status: Optional[EventStatus] = None,
+        is_sponsored: Optional[bool] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Count events per city, type, status, month and sponsorship for
+        the filtered set.
+
+        All facets come from a single GROUP BY over the five dimensions
+        (one per table when the archive is read), folded into per-facet
+        counts here. Results are cached per event version and filter.
+        """
+        key = (
+            event_version.current(),
+            city, event_type, status, is_sponsored, start_date, end_date,
+        )
+        cached = facets_cache.get(key)
+        if cached is not None:
+            return cached
+
+        filters = EventFilter(
+            city=city,
+            event_type=event_type,
+            status=status,
+            is_sponsored=is_sponsored,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        rows = []
+        for model in self._models_for(start_date, end_date):
+            year = extract("year", model.event_date)
+            month = extract("month", model.event_date)
+            query = db.query(
+                model.city,
+                model.event_type,
+                model.status,
+                year.label("year"),
+                month.label("month"),
+                model.is_sponsored,
+                func.count().label("count"),
+            )
+            query = self.apply_filters(query, filters, model=model)
+            rows.extend(query.group_by(
+                model.city,
+                model.event_type,
+                model.status,
+                year,
+                month,
+                model.is_sponsored,
+            ).all())
+
+        facets: Dict[str, Any] = {field: {} for field in FACET_FIELDS}
+        total = 0
+        for row in rows:
+            total += row.count
+            values = {
+                "city": row.city,
+                "event_type": row.event_type,
+                "status": row.status.value if row.status else None,
+                "month": (
+                    f"{int(row.year):04d}-{int(row.month):02d}"
+                    if row.year is not None else None
+                ),
+                "is_sponsored": (
+                    str(bool(row.is_sponsored)).lower()
+                    if row.is_sponsored is not None else None
+                ),
+            }
+            for field, value in values.items():
+                if value is not None:
+                    counts = facets[field]
+                    counts[value] = counts.get(value, 0) + row.count
+        facets["total"] = total
+        facets_cache.set(key, facets)
+        return facets
+
+    def rebuild_search_index(self, db: Session) -> None:
+        """Re-index every event from scratch"""
+        self.search_backend(db).rebuild(db)
+        db.commit()
+
     def count(self, db: Session) -> int:
         """Get total count of events"""
         return db.query(Event).count()
@@ -36,49 +767,432 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
         start_date: datetime,
         end_date: datetime
     ) -> int:
-        """Get count of events within a date range"""
-        return (
-            db.query(Event)
-            .filter(Event.event_date >= start_date)
-            .filter(Event.event_date <= end_date)
+        """Get count of events, and series occurrences, within a date range"""
+        return sum(
+            db.query(model)
+            .filter(model.event_date >= start_date)
+            .filter(model.event_date <= end_date)
             .count()
+            for model in self._models_for(start_date, end_date)
+        ) + event_series.count_in_range(
+            db, start_date=start_date, end_date=end_date
         )
 
     def get_daily_counts(
         self,
         db: Session,
-        start_date: datetime,
-        end_date: datetime
+        start_date: date,
+        end_date: date,
+        *,
+        city: Optional[str] = None,
+        event_type: Optional[str] = None,
+        status: Optional[EventStatus] = None
     ) -> Dict[date, int]:
-        """Get daily event counts within a date range"""
-        results = (
-            db.query(
-                func.date(Event.event_date).label('date'),
-                func.count().label('count')
+        """
+        Get daily event counts for the days in a date range: the daily
+        rollup plus occurrences of recurring series, expanded for just
+        those days.
+        """
+        if isinstance(start_date, datetime):
+            start_date = start_date.date()
+        if isinstance(end_date, datetime):
+            end_date = end_date.date()
+        counts = Counter(event_rollup.get_daily_counts(
+            db,
+            start_date=start_date,
+            end_date=end_date,
+            city=city,
+            event_type=event_type,
+            status=status,
+        ))
+        counts.update(event_series.get_daily_counts(
+            db,
+            start_date=start_date,
+            end_date=end_date,
+            city=city,
+            event_type=event_type,
+            status=status,
+        ))
+        return dict(counts)
+
+    def _models_for(
+        self, start_date: Optional[datetime], end_date: Optional[datetime]
+    ) -> List[EventModel]:
+        """
+        Tables to read for a date range: the archive only joins in when
+        the range explicitly reaches back past the archive horizon.
+        """
+        horizon = archive_horizon()
+        if any(d is not None and d < horizon for d in (start_date, end_date)):
+            return [Event, EventArchive]
+        return [Event]
+
+    def archive_past(
+        self,
+        db: Session,
+        *,
+        before: Optional[datetime] = None,
+        batch_size: Optional[int] = None
+    ) -> int:
+        """
+        Move events dated before `before` (default: the archive horizon)
+        into `event_archive`, oldest first. Returns how many were moved.
+
+        Each batch is copied and deleted in its own short transaction, so
+        no lock is held for longer than one batch. Daily rollup rows are
+        left alone: archived events still count on the calendar.
+
+        Safe to run concurrently: on Postgres each run skips rows another
+        has locked, and a row archived twice is copied only once.
+        """
+        before = before or archive_horizon()
+        batch_size = batch_size or settings.EVENT_ARCHIVE_BATCH_SIZE
+        columns = [column.name for column in Event.__table__.columns]
+        dialect = db.get_bind().dialect.name
+        moved = 0
+        while True:
+            query = (
+                db.query(Event.id)
+                .filter(Event.event_date < before)
+                .order_by(Event.event_date, Event.id)
+                .limit(batch_size)
             )
-            .filter(Event.event_date >= start_date)
-            .filter(Event.event_date <= end_date)
-            .group_by(func.date(Event.event_date))
-            .all()
+            if dialect == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+            ids = [row.id for row in query]
+            if not ids:
+                break
+            db.execute(
+                upsert_insert(db)(EventArchive).from_select(
+                    columns + ["archived_at"],
+                    select(
+                        *[Event.__table__.c[name] for name in columns],
+                        literal(datetime.now(), DateTime),
+                    ).where(Event.id.in_(ids)),
+                ).on_conflict_do_nothing(index_elements=["id"])
+            )
+            self.search_backend(db).unindex(db, ids)
+            db.execute(
+                delete(Event)
+                .where(Event.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            self._invalidate_caches(*ids)
+            self._sync_upcoming(
+                [SimpleNamespace(id=event_id) for event_id in ids],
+                deleted=True,
+            )
+            moved += len(ids)
+            if len(ids) < batch_size:
+                break
+        return moved
+
+    def moderate(
+        self, db: Session, *, ids: List[str], status: EventStatus
+    ) -> List[Event]:
+        """
+        Move the pending events among `ids` to `status` in one
+        `UPDATE ... WHERE id IN (...) AND status = 'PENDING' RETURNING`,
+        and release any claims on them. Returns the events that changed;
+        ids that are missing or no longer pending are left alone, so
+        concurrent moderators can't overwrite each other's decisions.
+        """
+        if not ids:
+            return []
+        events = db.scalars(
+            update(Event)
+            .where(Event.id.in_(ids))
+            .where(Event.status == EventStatus.PENDING)
+            .values(status=status)
+            .returning(Event)
+        ).all()
+        if not events:
+            return []
+        moderated = [event.id for event in events]
+        db.execute(
+            delete(EventModerationLease)
+            .where(EventModerationLease.event_id.in_(moderated))
         )
-        
-        return {row.date: row.count for row in results}
+        deltas = []
+        for event in events:
+            key = rollup_key(event)
+            if key is not None:
+                deltas.append(((*key[:3], EventStatus.PENDING), -1))
+                deltas.append((key, 1))
+        event_rollup.apply(db, deltas)
+        db.commit()
+        self._invalidate_caches(*moderated)
+        self._sync_upcoming(events)
+        return events
 
-    def get_upcoming_events(
+    def claim_pending(
         self,
         db: Session,
-        skip: int = 0,
-        limit: int = 100
+        *,
+        moderator_id: str,
+        limit: int = 10,
+        lease_seconds: Optional[int] = None
     ) -> List[Event]:
-        """Get upcoming events"""
+        """
+        Reserve up to `limit` pending events, oldest first, for one
+        moderator for `lease_seconds`, and return them.
+
+        Claims are rows in `event_moderation_lease`, written by a single
+        `INSERT ... SELECT ... ON CONFLICT` so two moderators can never
+        claim the same event. On Postgres the SELECT also takes
+        `FOR UPDATE SKIP LOCKED`, so concurrent claims skip each other's
+        candidates instead of queueing behind them; SQLite serializes
+        writers, which makes the statement atomic there. Calling again
+        renews the moderator's own unexpired claims and tops them up.
+        """
+        now = datetime.now()
+        expires_at = now + timedelta(
+            seconds=lease_seconds or settings.EVENT_MODERATION_LEASE_SECONDS
+        )
+        lease = EventModerationLease
+        held_by_others = (
+            select(lease.event_id)
+            .where(lease.expires_at > now)
+            .where(lease.moderator_id != moderator_id)
+        )
+        candidates = (
+            select(Event.id, literal(moderator_id), literal(expires_at, DateTime))
+            .where(Event.status == EventStatus.PENDING)
+            .where(Event.id.not_in(held_by_others))
+            .order_by(Event.event_date, Event.id)
+            .limit(limit)
+        )
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            candidates = candidates.with_for_update(
+                of=Event, skip_locked=True
+            )
+        stmt = upsert_insert(db)(lease).from_select(
+            ["event_id", "moderator_id", "expires_at"], candidates
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["event_id"],
+            set_={
+                "moderator_id": stmt.excluded.moderator_id,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            # Only take over expired claims, or renew our own
+            where=or_(
+                lease.expires_at <= now, lease.moderator_id == moderator_id
+            ),
+        )
+        claimed = db.scalars(stmt.returning(lease.event_id)).all()
+        db.commit()
+        if not claimed:
+            return []
         return (
             db.query(Event)
-            .filter(Event.event_date >= datetime.now())
-            .order_by(Event.event_date)
-            .offset(skip)
-            .limit(limit)
+            .filter(Event.id.in_(claimed))
+            .order_by(Event.event_date, Event.id)
             .all()
         )
 
+    def apply_filters(
+        self,
+        query: Query,
+        filters: EventFilter,
+        model: EventModel = Event
+    ) -> Query:
+        """
+        Narrow an event query by the set fields of `filters`.
+
+        Every filter is a plain equality or an `event_date` range, so the
+        planner can match the equality columns against the leading columns
+        of one of the composite `(..., event_date, id)` indexes on Event
+        and walk it in pagination order without a sort. `model` is Event
+        or EventArchive.
+        """
+        if filters.city is not None:
+            query = query.filter(model.city == filters.city)
+        if filters.event_type is not None:
+            query = query.filter(model.event_type == filters.event_type)
+        if filters.status is not None:
+            query = query.filter(model.status == filters.status)
+        if filters.is_sponsored is not None:
+            # `= true` rather than `IS true`, which indexes can't serve
+            query = query.filter(model.is_sponsored == filters.is_sponsored)
+        if filters.organizer_id is not None:
+            query = query.filter(model.organizer_id == filters.organizer_id)
+        if filters.start_date is not None:
+            query = query.filter(model.event_date >= filters.start_date)
+        if filters.end_date is not None:
+            query = query.filter(model.event_date <= filters.end_date)
+        return query
+
+    def _seek(
+        self,
+        query: Query,
+        *,
+        cursor: Optional[str],
+        limit: int,
+        descending: bool,
+        model: EventModel = Event
+    ) -> List[Any]:
+        """Up to `limit + 1` rows of `query` past the cursor, in key order"""
+        key = tuple_(model.event_date, model.id)
+        if cursor:
+            event_date, event_id = decode_cursor(cursor)
+            position = tuple_(event_date, event_id)
+            query = query.filter(
+                key < position if descending else key > position
+            )
+        if descending:
+            query = query.order_by(model.event_date.desc(), model.id.desc())
+        else:
+            query = query.order_by(model.event_date, model.id)
+        return query.limit(limit + 1).all()
+
+    @staticmethod
+    def _page(rows: List[Any], limit: int) -> EventPage:
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_cursor(last.event_date, last.id)
+
+    def paginate(
+        self,
+        query: Query,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        descending: bool = False
+    ) -> EventPage:
+        """
+        Keyset-paginate an event query on `(event_date, id)`.
+
+        Seeks past the cursor position instead of using OFFSET, so every
+        page is a bounded range scan on `ix_event_event_date_id` (or a
+        composite index ending in the same columns) and rows inserted
+        between requests never shift later pages. Raises `ValueError` for
+        a malformed cursor.
+        """
+        rows = self._seek(
+            query, cursor=cursor, limit=limit, descending=descending
+        )
+        return self._page(rows, limit)
+
+    def get_multi(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> EventPage:
+        """Get a page of events and the cursor for the next page"""
+        return self.paginate(db.query(Event), cursor=cursor, limit=limit)
+
+    def iter_batches(
+        self,
+        db: Session,
+        *,
+        batch_size: int = 1000
+    ) -> Iterator[List[Event]]:
+        """
+        Stream every event in `(event_date, id)` order, `batch_size` rows
+        at a time.
+
+        Uses `yield_per`, which fetches through a server-side cursor where
+        the driver supports one, so only one batch is held in memory
+        however many rows the table has.
+        """
+        result = db.execute(
+            select(Event)
+            .order_by(Event.event_date, Event.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in result.scalars().partitions():
+            yield partition
+            # Drop the batch from the identity map before the next fetch
+            for obj in partition:
+                db.expunge(obj)
+
+    def get_multi_filtered(
+        self,
+        db: Session,
+        *,
+        filters: EventFilter,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> EventPage:
+        """
+        Get a page of events matching `filters`, in `filters.sort` order.
+
+        Archived events are included only when the date range reaches
+        back past the archive horizon. Their page, and the occurrences of
+        matching recurring series, are merged with the hot table's on the
+        same `(event_date, id)` key.
+        """
+        descending = filters.sort == EventSort.DATE_DESC
+        models = self._models_for(filters.start_date, filters.end_date)
+        rows: List[Any] = []
+        for model in models:
+            rows.extend(self._seek(
+                self.apply_filters(db.query(model), filters, model=model),
+                cursor=cursor,
+                limit=limit,
+                descending=descending,
+                model=model,
+            ))
+        occurrences = event_series.get_page_rows(
+            db, filters=filters, cursor=cursor, limit=limit
+        )
+        if len(models) > 1 or occurrences:
+            rows.extend(occurrences)
+            rows.sort(
+                key=lambda obj: (obj.event_date or datetime.min, obj.id),
+                reverse=descending,
+            )
+        return self._page(rows, limit)
+
+    def get_multi_by_status(
+        self,
+        db: Session,
+        *,
+        status: EventStatus,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> EventPage:
+        """Get a page of events with the given moderation status"""
+        return self.get_multi_filtered(
+            db, filters=EventFilter(status=status), cursor=cursor, limit=limit
+        )
+
+    def get_multi_by_type(
+        self,
+        db: Session,
+        *,
+        event_type: str,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> EventPage:
+        """Get a page of events of the given type"""
+        return self.get_multi_filtered(
+            db,
+            filters=EventFilter(event_type=event_type),
+            cursor=cursor,
+            limit=limit,
+        )
+
+    def get_upcoming_events(
+        self,
+        db: Session,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> EventPage:
+        """Get upcoming events"""
+        return self.get_multi_filtered(
+            db,
+            filters=EventFilter(start_date=datetime.now()),
+            cursor=cursor,
+            limit=limit,
+        )
+
 
 event = CRUDEvent(Event)
@@ -0,0 +1,132 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.banner import banner as crud_banner, banner_version
+from app.crud.event import event_version
+from app.models.banner import Banner
+from app.models.event import Event, EventStatus
+from app.schemas.banner import Banner as BannerSchema
+from app.schemas.event import Event as EventSchema
+from app.schemas.event import EventPromoted, PromotedKind
+
+# Serialized `schemas.EventPromoted` items per city ("" for all cities),
+# and the banner-only feed served to cities without sponsored events
+Snapshot = Tuple[Dict[str, Tuple[str, ...]], Tuple[str, ...]]
+
+
+def _interleave(events: List[str], banners: List[str]) -> List[str]:
+    """Alternate events and banners so neither crowds out the other"""
+    feed: List[str] = []
+    for i in range(max(len(events), len(banners))):
+        feed.extend(events[i:i + 1])
+        feed.extend(banners[i:i + 1])
+    return feed
+
+
+class CRUDEventPromoted:
+    """
+    Per-city feed of sponsored upcoming events interleaved with active
+    banner placements.
+
+    `refresh` (run in the background, see app/main.py) rebuilds the feed
+    when the event or banner versions have moved, or when it is older
+    than `PROMOTED_MAX_AGE_SECONDS`, and swaps in a snapshot of
+    pre-serialized items. `get_feed_json` only slices and joins those, so
+    serving the feed never touches the database.
+    """
+
+    def __init__(self):
+        self._snapshot: Snapshot = ({}, ())
+        self._versions: Optional[Tuple[str, str]] = None
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _sponsored_events(self, db: Session, size: int) -> List[Event]:
+        """The `size` soonest approved sponsored events of each city"""
+        ranked = (
+            select(
+                Event.id,
+                func.row_number().over(
+                    partition_by=Event.city,
+                    order_by=(Event.event_date, Event.id),
+                ).label("rank"),
+            )
+            .where(Event.is_sponsored.is_(True))
+            .where(Event.status == EventStatus.APPROVED)
+            .where(Event.event_date >= datetime.now())
+            .subquery()
+        )
+        return (
+            db.query(Event)
+            .join(ranked, Event.id == ranked.c.id)
+            .filter(ranked.c.rank <= size)
+            .order_by(Event.event_date, Event.id)
+            .all()
+        )
+
+    def _active_banners(self, db: Session) -> List[Banner]:
+        """Active banners, best smoothed click-through rate first"""
+        return sorted(
+            crud_banner.get_active_banners(db),
+            key=lambda b: (
+                -((b.clicks_count or 0) + 1) / ((b.views_count or 0) + 2),
+                b.id,
+            ),
+        )
+
+    def _build(self, db: Session) -> Snapshot:
+        size = settings.PROMOTED_FEED_SIZE
+        banners = [
+            EventPromoted(
+                kind=PromotedKind.BANNER,
+                banner=BannerSchema.model_validate(obj),
+            ).model_dump_json()
+            for obj in self._active_banners(db)
+        ]
+        by_city: Dict[str, List[str]] = {"": []}
+        for obj in self._sponsored_events(db, size):
+            item = EventPromoted(
+                kind=PromotedKind.EVENT,
+                event=EventSchema.model_validate(obj),
+            ).model_dump_json()
+            by_city[""].append(item)
+            by_city.setdefault(obj.city or "", []).append(item)
+        # Banners are not tied to a city, so every feed shares the same
+        # serialized banner strings
+        feeds = {
+            city: tuple(_interleave(events[:size], banners)[:size])
+            for city, events in by_city.items()
+        }
+        return feeds, tuple(banners[:size])
+
+    def refresh(self, db: Session, *, force: bool = False) -> bool:
+        """Rebuild the feed if anything it depends on changed"""
+        # Sampled before reading, so writes made during the rebuild leave
+        # the versions stale and are picked up by the next refresh
+        versions = (event_version.current(), banner_version.current())
+        with self._lock:
+            fresh = (
+                self._built_at is not None
+                and time.monotonic() - self._built_at
+                < settings.PROMOTED_MAX_AGE_SECONDS
+            )
+            if not force and fresh and versions == self._versions:
+                return False
+            self._snapshot = self._build(db)
+            self._versions = versions
+            self._built_at = time.monotonic()
+        return True
+
+    def get_feed_json(self, *, city: Optional[str] = None, limit: int = 20) -> str:
+        """Serialized list of promoted items, for a city or overall"""
+        feeds, banners = self._snapshot
+        items = feeds.get(city or "", banners)
+        return "[" + ",".join(items[:limit]) + "]"
+
+
+event_promoted = CRUDEventPromoted()
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Tuple
+from redis import RedisError
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.crud.event import event_features
+from app.models.event import Event
+from app.schemas.event import Event as EventSchema
+
+logger = logging.getLogger(__name__)
+
+# How strongly each kind of interaction counts towards a user's profile
+INTERACTION_WEIGHTS = {
+    "created": 3.0,
+    "clicked": 2.0,
+    "viewed": 1.0,
+}
+
+
+class CRUDEventRecommendation:
+    """
+    Personalized upcoming-event recommendations.
+
+    A user's profile is built from the events they organized plus their
+    recent interaction history (kept in Redis when enabled, otherwise per
+    process), and every upcoming event in `event_features` is scored
+    against it in one vectorized pass.
+    """
+
+    def __init__(self):
+        self._local = LRUCache(maxsize=settings.RECOMMEND_HISTORY_USERS)
+        self._lock = threading.Lock()
+
+    def _history_key(self, user_id: str) -> str:
+        return f"recommend:history:{user_id}"
+
+    def record_interaction(self, user_id: str, event_id: str, kind: str) -> None:
+        """Remember that the user viewed/clicked an event, newest first"""
+        entry = f"{kind}:{event_id}"
+        size = settings.RECOMMEND_HISTORY_SIZE
+        if settings.REDIS_ENABLED:
+            try:
+                key = self._history_key(user_id)
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.lpush(key, entry)
+                pipe.ltrim(key, 0, size - 1)
+                pipe.expire(key, settings.RECOMMEND_HISTORY_TTL)
+                pipe.execute()
+                return
+            except RedisError as e:
+                logger.warning(f"Redis history write failed: {str(e)}")
+        with self._lock:
+            history = self._local.get(user_id)
+            if history is None:
+                history = deque(maxlen=size)
+                self._local.set(user_id, history)
+            history.appendleft(entry)
+
+    def get_history(self, user_id: str) -> List[Tuple[str, str]]:
+        """`(kind, event_id)` interactions, newest first"""
+        entries: List[str] = []
+        if settings.REDIS_ENABLED:
+            try:
+                entries = redis_client.lrange(self._history_key(user_id), 0, -1)
+            except RedisError as e:
+                logger.warning(f"Redis history read failed: {str(e)}")
+        with self._lock:
+            entries = entries + list(self._local.get(user_id) or ())
+        return [tuple(entry.split(":", 1)) for entry in entries]
+
+    def get_recommended(
+        self,
+        db: Session,
+        *,
+        user_id: str,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Top upcoming events for the user with their scores, excluding the
+        ones they organized or already interacted with. Empty when the
+        user has no history yet.
+        """
+        columns = (
+            Event.id, Event.event_type, Event.city, Event.organizer_id,
+            Event.event_date,
+        )
+        interactions = [
+            (row, "created")
+            for row in db.query(*columns)
+            .filter(Event.organizer_id == user_id)
+            .order_by(Event.event_date.desc(), Event.id.desc())
+            .limit(settings.RECOMMEND_HISTORY_SIZE)
+        ]
+        history = self.get_history(user_id)
+        if history:
+            rows = {
+                row.id: row
+                for row in db.query(*columns).filter(
+                    Event.id.in_({event_id for _, event_id in history})
+                )
+            }
+            interactions.extend(
+                (rows[event_id], kind)
+                for kind, event_id in history
+                if event_id in rows
+            )
+
+        weighted = [
+            (
+                event_features.features(
+                    event_type=row.event_type,
+                    city=row.city,
+                    organizer_id=row.organizer_id,
+                    event_date=row.event_date,
+                ),
+                INTERACTION_WEIGHTS.get(kind, 1.0),
+            )
+            for row, kind in interactions
+            if row.event_date is not None
+        ]
+        if not weighted:
+            return []
+        seen = {row.id for row, _ in interactions}
+        [top] = event_features.top_k(
+            event_features.profile(weighted),
+            limit,
+            now=time.time(),
+            exclude=[seen],
+        )
+
+        payloads = {
+            obj.id: EventSchema.model_validate(obj).model_dump()
+            for obj in db.query(Event).filter(
+                Event.id.in_([event_id for event_id, _ in top])
+            )
+        }
+        return [
+            {**payloads[event_id], "score": score}
+            for event_id, score in top
+            if event_id in payloads
+        ]
+
+
+event_recommendation = CRUDEventRecommendation()
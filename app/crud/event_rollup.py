@@ -0,0 +1,118 @@
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func, select, union_all
+from sqlalchemy.orm import Session
+
+from app.crud.utils import upsert_insert
+from app.models.event import (
+    Event, EventArchive, EventDailyRollup, EventStatus
+)
+
+RollupKey = Tuple[date, str, str, EventStatus]
+
+
+def rollup_key(event: Event) -> Optional[RollupKey]:
+    """The rollup row an event is counted in, or None if it has no date"""
+    if event.event_date is None:
+        return None
+    return (
+        event.event_date.date(),
+        event.city or "",
+        event.event_type or "",
+        EventStatus(event.status or EventStatus.PENDING),
+    )
+
+
+class CRUDEventDailyRollup:
+    """
+    Per-day event counts keyed by (day, city, event_type, status).
+
+    Callers apply deltas inside the transaction that writes the events,
+    so the rollup commits or rolls back together with them.
+    """
+
+    def apply(self, db: Session, deltas: Iterable[Tuple[RollupKey, int]]) -> None:
+        """Add each delta to its rollup row, creating rows as needed"""
+        totals: Counter = Counter()
+        for key, delta in deltas:
+            if key is not None:
+                totals[key] += delta
+        insert = upsert_insert(db)
+        table = EventDailyRollup.__table__
+        for (day, city, event_type, status), delta in totals.items():
+            if delta == 0:
+                continue
+            stmt = insert(table).values(
+                day=day,
+                city=city,
+                event_type=event_type,
+                status=status,
+                count=delta,
+            )
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["day", "city", "event_type", "status"],
+                set_={"count": table.c.count + stmt.excluded.count},
+            ))
+            if delta < 0:
+                db.execute(
+                    table.delete()
+                    .where(table.c.day == day)
+                    .where(table.c.city == city)
+                    .where(table.c.event_type == event_type)
+                    .where(table.c.status == status)
+                    .where(table.c.count <= 0)
+                )
+
+    def rebuild(self, db: Session) -> None:
+        """Recompute every rollup row from the event and archive tables"""
+        table = EventDailyRollup.__table__
+        events = union_all(*(
+            select(
+                model.event_date, model.city, model.event_type, model.status
+            )
+            for model in (Event, EventArchive)
+        )).subquery()
+        day = func.date(events.c.event_date)
+        city = func.coalesce(events.c.city, "")
+        event_type = func.coalesce(events.c.event_type, "")
+        status = func.coalesce(events.c.status, EventStatus.PENDING.name)
+        db.execute(table.delete())
+        db.execute(table.insert().from_select(
+            ["day", "city", "event_type", "status", "count"],
+            select(day, city, event_type, status, func.count())
+            .where(events.c.event_date.is_not(None))
+            .group_by(day, city, event_type, status),
+        ))
+        db.commit()
+
+    def get_daily_counts(
+        self,
+        db: Session,
+        *,
+        start_date: date,
+        end_date: date,
+        city: Optional[str] = None,
+        event_type: Optional[str] = None,
+        status: Optional[EventStatus] = None,
+    ) -> Dict[date, int]:
+        """Event counts per day in `[start_date, end_date]`"""
+        query = (
+            db.query(
+                EventDailyRollup.day,
+                func.sum(EventDailyRollup.count).label("count"),
+            )
+            .filter(EventDailyRollup.day >= start_date)
+            .filter(EventDailyRollup.day <= end_date)
+        )
+        if city is not None:
+            query = query.filter(EventDailyRollup.city == city)
+        if event_type is not None:
+            query = query.filter(EventDailyRollup.event_type == event_type)
+        if status is not None:
+            query = query.filter(EventDailyRollup.status == status)
+        rows = query.group_by(EventDailyRollup.day).all()
+        return {row.day: int(row.count) for row in rows if row.count}
+
+
+event_rollup = CRUDEventDailyRollup()
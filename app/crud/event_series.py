@@ -0,0 +1,484 @@
+import heapq
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import dropwhile, islice, takewhile
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import ResourceVersion
+from app.core.config import settings
+from app.core.recurrence import (
+    UNTIL_FORMAT, is_occurrence, iter_occurrences, iter_occurrences_before,
+    normalize_rrule
+)
+from app.crud.base import CRUDBase
+from app.crud.utils import decode_cursor
+from app.models.event import EventSeries, EventSeriesOverride, EventStatus
+from app.schemas.event import (
+    EventFilter, EventOccurrenceUpdate, EventSeriesCreate, EventSeriesUpdate,
+    EventSort
+)
+
+# Bumped on every series or override write; combined with the event
+# version in the ETags of listings that include occurrences
+series_version = ResourceVersion("event_series")
+
+# Copied from the series onto each occurrence
+SERIES_FIELDS = (
+    "title", "description", "location", "city", "latitude", "longitude",
+    "event_type", "image_url", "status", "is_sponsored", "organizer_id",
+)
+# Fields a single occurrence can override (besides its date)
+OVERRIDE_FIELDS = ("title", "description", "location", "image_url")
+
+Occurrence = SimpleNamespace
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    # Naive DateTime columns drop the offset; match that here
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+def _key(occurrence: Occurrence) -> Tuple[datetime, str]:
+    return occurrence.event_date, occurrence.id
+
+
+def occurrence_id(series_id: str, occurrence_date: datetime) -> str:
+    """Stable id of an occurrence, from the date it was originally due"""
+    return f"{series_id}:{occurrence_date.strftime(UNTIL_FORMAT)}"
+
+
+def parse_occurrence_id(value: str) -> Optional[Tuple[str, datetime]]:
+    series_id, sep, stamp = value.rpartition(":")
+    if not sep:
+        return None
+    try:
+        return series_id, datetime.strptime(stamp, UNTIL_FORMAT)
+    except ValueError:
+        return None
+
+
+class CRUDEventSeries(
+    CRUDBase[EventSeries, EventSeriesCreate, EventSeriesUpdate]
+):
+    """
+    Recurring events, stored as one EventSeries row plus a row per
+    overridden occurrence.
+
+    Occurrences are never materialized. Reads expand each matching
+    series' rule lazily from the period containing the requested window
+    (see app/core/recurrence.py), so both storage and query time depend
+    on the window asked for, not on how long a series runs.
+    """
+
+    def create_with_organizer(
+        self, db: Session, *, obj_in: EventSeriesCreate, organizer_id: str
+    ) -> EventSeries:
+        """Create a series. Raises `ValueError` for an invalid rule."""
+        data = obj_in.model_dump()
+        dtstart = _naive(data.pop("dtstart"))
+        rule, ends_at = normalize_rrule(data.pop("rrule"), dtstart)
+        db_obj = EventSeries(
+            **data,
+            dtstart=dtstart,
+            rrule=rule,
+            ends_at=ends_at,
+            status=EventStatus.PENDING,
+            is_sponsored=False,
+            organizer_id=organizer_id,
+        )
+        db.add(db_obj)
+        db.commit()
+        series_version.bump()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: EventSeries,
+        obj_in: Union[EventSeriesUpdate, Dict[str, Any]]
+    ) -> EventSeries:
+        """
+        Update a series. Changing its schedule drops every override, as
+        they are keyed by the old occurrence dates. Raises `ValueError`
+        for an invalid rule.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        if "dtstart" in update_data or "rrule" in update_data:
+            dtstart = _naive(update_data.get("dtstart")) or db_obj.dtstart
+            rule, ends_at = normalize_rrule(
+                update_data.get("rrule") or db_obj.rrule, dtstart
+            )
+            update_data.update(dtstart=dtstart, rrule=rule, ends_at=ends_at)
+            db_obj.overrides.clear()
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        db.commit()
+        series_version.bump()
+        db.refresh(db_obj)
+        return db_obj
+
+    def moderate(
+        self, db: Session, *, db_obj: EventSeries, status: EventStatus
+    ) -> Optional[EventSeries]:
+        """
+        Move a pending series, and so all its occurrences, to `status`.
+        Returns None if it is no longer pending.
+        """
+        if db_obj.status != EventStatus.PENDING:
+            return None
+        db_obj.status = status
+        db.add(db_obj)
+        db.commit()
+        series_version.bump()
+        db.refresh(db_obj)
+        return db_obj
+
+    def remove(self, db: Session, *, id: Union[str, int]) -> EventSeries:
+        obj = db.get(EventSeries, id)
+        db.delete(obj)
+        db.commit()
+        series_version.bump()
+        return obj
+
+    def get_override(
+        self, db: Session, *, series_id: str, occurrence_date: datetime
+    ) -> Optional[EventSeriesOverride]:
+        return (
+            db.query(EventSeriesOverride)
+            .filter(EventSeriesOverride.series_id == series_id)
+            .filter(EventSeriesOverride.occurrence_date == occurrence_date)
+            .first()
+        )
+
+    def set_override(
+        self,
+        db: Session,
+        *,
+        series: EventSeries,
+        occurrence_date: datetime,
+        obj_in: EventOccurrenceUpdate
+    ) -> EventSeriesOverride:
+        """
+        Cancel, move or edit the occurrence originally due at
+        `occurrence_date`, replacing any earlier override of it. Raises
+        `ValueError` if the series has no occurrence then.
+        """
+        occurrence_date = _naive(occurrence_date)
+        if not is_occurrence(series.rrule, series.dtstart, occurrence_date):
+            raise ValueError("Series has no occurrence at that date")
+        override = self.get_override(
+            db, series_id=series.id, occurrence_date=occurrence_date
+        )
+        if override is None:
+            override = EventSeriesOverride(
+                series_id=series.id, occurrence_date=occurrence_date
+            )
+        override.cancelled = obj_in.cancelled
+        for field in OVERRIDE_FIELDS:
+            setattr(override, field, getattr(obj_in, field))
+        override.event_date = _naive(obj_in.event_date)
+        db.add(override)
+        db.commit()
+        series_version.bump()
+        db.refresh(override)
+        return override
+
+    def remove_override(
+        self, db: Session, *, series: EventSeries, occurrence_date: datetime
+    ) -> Optional[EventSeriesOverride]:
+        """Restore an occurrence to what the series says"""
+        override = self.get_override(
+            db, series_id=series.id, occurrence_date=_naive(occurrence_date)
+        )
+        if override is not None:
+            db.delete(override)
+            db.commit()
+            series_version.bump()
+        return override
+
+    def apply_filters(
+        self,
+        query: Query,
+        filters: EventFilter,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Query:
+        """
+        Narrow a series query to those matching the equality filters of
+        `filters` that can have occurrences in `[start, end]`.
+        """
+        if filters.city is not None:
+            query = query.filter(EventSeries.city == filters.city)
+        if filters.event_type is not None:
+            query = query.filter(EventSeries.event_type == filters.event_type)
+        if filters.status is not None:
+            query = query.filter(EventSeries.status == filters.status)
+        if filters.is_sponsored is not None:
+            query = query.filter(
+                EventSeries.is_sponsored == filters.is_sponsored
+            )
+        if filters.organizer_id is not None:
+            query = query.filter(
+                EventSeries.organizer_id == filters.organizer_id
+            )
+        if end is not None:
+            query = query.filter(EventSeries.dtstart <= end)
+        if start is not None:
+            query = query.filter(
+                or_(EventSeries.ends_at.is_(None), EventSeries.ends_at >= start)
+            )
+        return query
+
+    def _overrides(
+        self,
+        db: Session,
+        series_ids: List[str],
+        start: Optional[datetime],
+        end: Optional[datetime]
+    ) -> Dict[str, List[EventSeriesOverride]]:
+        """Overrides of occurrences originally due, or moved to, the window"""
+        def within(column):
+            bounds = []
+            if start is not None:
+                bounds.append(column >= start)
+            if end is not None:
+                bounds.append(column <= end)
+            return and_(*bounds) if bounds else column.is_not(None)
+
+        rows = (
+            db.query(EventSeriesOverride)
+            .filter(EventSeriesOverride.series_id.in_(series_ids))
+            .filter(or_(
+                within(EventSeriesOverride.occurrence_date),
+                within(EventSeriesOverride.event_date),
+            ))
+        )
+        by_series: Dict[str, List[EventSeriesOverride]] = defaultdict(list)
+        for row in rows:
+            by_series[row.series_id].append(row)
+        return by_series
+
+    @staticmethod
+    def _occurrence(
+        series: EventSeries,
+        occurrence_date: datetime,
+        override: Optional[EventSeriesOverride] = None
+    ) -> Occurrence:
+        values = {field: getattr(series, field) for field in SERIES_FIELDS}
+        event_date = occurrence_date
+        if override is not None:
+            for field in OVERRIDE_FIELDS:
+                if getattr(override, field) is not None:
+                    values[field] = getattr(override, field)
+            event_date = override.event_date or occurrence_date
+        return Occurrence(
+            id=occurrence_id(series.id, occurrence_date),
+            series_id=series.id,
+            event_date=event_date,
+            **values,
+        )
+
+    def _stream(
+        self,
+        series: EventSeries,
+        overrides: List[EventSeriesOverride],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        descending: bool
+    ) -> Iterator[Occurrence]:
+        """One series' occurrences in `[start, end]`, in key order"""
+        by_date = {o.occurrence_date: o for o in overrides}
+
+        def in_window(value: datetime) -> bool:
+            return (start is None or value >= start) and (
+                end is None or value <= end
+            )
+
+        if descending:
+            dates = iter_occurrences_before(
+                series.rrule, series.dtstart, end, start
+            )
+        else:
+            dates = iter_occurrences(
+                series.rrule, series.dtstart, start or series.dtstart
+            )
+            if end is not None:
+                dates = takewhile(lambda d: d <= end, dates)
+        in_place = (
+            self._occurrence(series, d) for d in dates if d not in by_date
+        )
+        # Overridden occurrences, at whatever date they now fall on
+        overridden = sorted(
+            (
+                self._occurrence(series, o.occurrence_date, o)
+                for o in overrides
+                if not o.cancelled
+                and in_window(o.event_date or o.occurrence_date)
+            ),
+            key=_key,
+            reverse=descending,
+        )
+        return heapq.merge(in_place, overridden, key=_key, reverse=descending)
+
+    def _streams(
+        self,
+        db: Session,
+        series: List[EventSeries],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        descending: bool = False
+    ) -> List[Iterator[Occurrence]]:
+        if not series:
+            return []
+        overrides = self._overrides(db, [s.id for s in series], start, end)
+        return [
+            self._stream(s, overrides.get(s.id, []), start, end, descending)
+            for s in series
+        ]
+
+    def iter_occurrences(
+        self,
+        db: Session,
+        *,
+        filters: EventFilter,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        descending: bool = False
+    ) -> Iterator[Occurrence]:
+        """
+        Occurrences of every series matching `filters` in `[start, end]`,
+        merged in `(event_date, id)` order. `end` is required when
+        `descending`.
+        """
+        series = self.apply_filters(
+            db.query(EventSeries), filters, start=start, end=end
+        ).all()
+        return heapq.merge(
+            *self._streams(db, series, start, end, descending),
+            key=_key,
+            reverse=descending,
+        )
+
+    def get_page_rows(
+        self,
+        db: Session,
+        *,
+        filters: EventFilter,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Occurrence]:
+        """
+        Up to `limit + 1` occurrences matching `filters` past the cursor,
+        in `filters.sort` order, for merging into an event listing page.
+
+        Newest-first listings with no `end_date` start from
+        `EVENT_SERIES_HORIZON_DAYS` ahead, as endless series have no
+        last occurrence. Raises `ValueError` for a malformed cursor.
+        """
+        descending = filters.sort == EventSort.DATE_DESC
+        start, end = _naive(filters.start_date), _naive(filters.end_date)
+        position = decode_cursor(cursor) if cursor else None
+        if position is not None:
+            position = (_naive(position[0]), position[1])
+            if descending:
+                end = min(end, position[0]) if end else position[0]
+            else:
+                start = max(start, position[0]) if start else position[0]
+        if descending and end is None:
+            end = datetime.now() + timedelta(
+                days=settings.EVENT_SERIES_HORIZON_DAYS
+            )
+        occurrences = self.iter_occurrences(
+            db, filters=filters, start=start, end=end, descending=descending
+        )
+        if position is not None:
+            occurrences = dropwhile(
+                lambda o: _key(o) >= position if descending
+                else _key(o) <= position,
+                occurrences,
+            )
+        return list(islice(occurrences, limit + 1))
+
+    def get_occurrences(
+        self,
+        db: Session,
+        *,
+        series: EventSeries,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Occurrence]:
+        """One series' occurrences in `[start_date, end_date]`"""
+        start, end = _naive(start_date), _naive(end_date)
+        return list(heapq.merge(
+            *self._streams(db, [series], start, end), key=_key
+        ))
+
+    def get_occurrence(self, db: Session, *, id: str) -> Optional[Occurrence]:
+        """An occurrence by the id `occurrence_id` gave it"""
+        parsed = parse_occurrence_id(id)
+        if parsed is None:
+            return None
+        series_id, occurrence_date = parsed
+        series = self.get(db, series_id)
+        if series is None:
+            return None
+        override = self.get_override(
+            db, series_id=series_id, occurrence_date=occurrence_date
+        )
+        if override is not None and override.cancelled:
+            return None
+        if override is None and not is_occurrence(
+            series.rrule, series.dtstart, occurrence_date
+        ):
+            return None
+        return self._occurrence(series, occurrence_date, override)
+
+    def count_in_range(
+        self, db: Session, *, start_date: datetime, end_date: datetime
+    ) -> int:
+        """Number of occurrences in `[start_date, end_date]`"""
+        start, end = _naive(start_date), _naive(end_date)
+        series = self.apply_filters(
+            db.query(EventSeries), EventFilter(), start=start, end=end
+        ).all()
+        return sum(
+            sum(1 for _ in stream)
+            for stream in self._streams(db, series, start, end)
+        )
+
+    def get_daily_counts(
+        self,
+        db: Session,
+        *,
+        start_date: date,
+        end_date: date,
+        city: Optional[str] = None,
+        event_type: Optional[str] = None,
+        status: Optional[EventStatus] = None,
+    ) -> Dict[date, int]:
+        """Occurrence counts per day in `[start_date, end_date]`"""
+        start = datetime.combine(start_date, time.min)
+        end = datetime.combine(end_date, time.max)
+        filters = EventFilter(city=city, event_type=event_type, status=status)
+        series = self.apply_filters(
+            db.query(EventSeries), filters, start=start, end=end
+        ).all()
+        counts: Counter = Counter()
+        for stream in self._streams(db, series, start, end):
+            for occurrence in stream:
+                counts[occurrence.event_date.date()] += 1
+        return dict(counts)
+
+
+event_series = CRUDEventSeries(EventSeries)
@@ -0,0 +1,134 @@
+import heapq
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.trending import BucketedCounts, ViewCounter, decayed_scores
+from app.crud.event import event_version
+from app.models.event import Event, EventStatus
+from app.schemas.event import Event as EventSchema
+
+# city, event_date, status
+EventMeta = Tuple[str, Optional[datetime], Optional[EventStatus]]
+
+
+class CRUDEventTrending:
+    """
+    Time-decayed "trending" ranking of events, overall and per city, and
+    of cities themselves, computed from event views.
+
+    `record_view` only bumps an in-process counter. `refresh` (run in the
+    background, see app/main.py) flushes those counts into shared time
+    buckets, rescores everything viewed within the window and swaps in a
+    new snapshot, which the read methods serve without touching the
+    database. The `event` table is only ever read.
+    """
+
+    def __init__(self):
+        self.views = ViewCounter()
+        self.counts = BucketedCounts(
+            "trending:views",
+            bucket_seconds=settings.TRENDING_BUCKET_SECONDS,
+            window_seconds=settings.TRENDING_WINDOW_HOURS * 3600,
+        )
+        self._meta: Dict[str, EventMeta] = {}
+        self._meta_version: Optional[str] = None
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._cities: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def record_view(self, event_id: str) -> None:
+        self.views.record(event_id)
+
+    def flush(self, now: Optional[float] = None) -> None:
+        """Move buffered views into the current time bucket"""
+        self.counts.add(self.views.drain(), now=now)
+
+    def _event_meta(self, db: Session, event_ids: List[str]) -> Dict[str, EventMeta]:
+        """City, date and status per event, cached until events change"""
+        version = event_version.current()
+        if version != self._meta_version:
+            self._meta = {}
+            self._meta_version = version
+        missing = [event_id for event_id in event_ids if event_id not in self._meta]
+        for i in range(0, len(missing), 500):
+            rows = (
+                db.query(Event.id, Event.city, Event.event_date, Event.status)
+                .filter(Event.id.in_(missing[i:i + 500]))
+                .all()
+            )
+            for event_id, city, event_date, status in rows:
+                self._meta[event_id] = (city or "", event_date, status)
+        return self._meta
+
+    def refresh(self, db: Session, now: Optional[float] = None) -> None:
+        """Flush buffered views and recompute the trending snapshot"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.flush(now=now)
+            scores = decayed_scores(
+                self.counts.buckets(now=now),
+                now=now,
+                bucket_seconds=settings.TRENDING_BUCKET_SECONDS,
+                half_life=settings.TRENDING_HALF_LIFE_HOURS * 3600,
+            )
+            meta = self._event_meta(db, list(scores))
+            cutoff = datetime.fromtimestamp(now)
+
+            ranked: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+            city_scores: Counter = Counter()
+            for event_id, score in scores.items():
+                if event_id not in meta:
+                    continue  # deleted
+                city, event_date, status = meta[event_id]
+                if status == EventStatus.REJECTED:
+                    continue
+                if event_date is not None and event_date < cutoff:
+                    continue
+                ranked[""].append((score, event_id))
+                ranked[city].append((score, event_id))
+                city_scores[city] += score
+
+            size = settings.TRENDING_SIZE
+            top = {
+                city: heapq.nlargest(size, entries)
+                for city, entries in ranked.items()
+            }
+            top_ids = list({event_id for entries in top.values()
+                            for _, event_id in entries})
+            payloads = {}
+            for i in range(0, len(top_ids), 500):
+                for obj in db.query(Event).filter(
+                    Event.id.in_(top_ids[i:i + 500])
+                ):
+                    payloads[obj.id] = EventSchema.model_validate(obj).model_dump()
+
+            self._events = {
+                city: [
+                    {**payloads[event_id], "score": score}
+                    for score, event_id in entries
+                    if event_id in payloads
+                ]
+                for city, entries in top.items()
+            }
+            self._cities = city_scores.most_common(size)
+
+    def get_trending(
+        self,
+        *,
+        city: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Top events by trending score, overall or within a city"""
+        return self._events.get(city or "", [])[:limit]
+
+    def get_trending_cities(self, *, limit: int = 20) -> List[Tuple[str, float]]:
+        """Cities by the summed trending score of their events"""
+        return self._cities[:limit]
+
+
+event_trending = CRUDEventTrending()
@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+from redis import RedisError
+from sqlalchemy import delete, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core import redis
+from app.core.config import settings
+from app.core.security import RefreshTokenReused
+from app.models.user import RefreshTokenFamily
+
+
+class RefreshTokenStoreError(Exception):
+    """The refresh token store, Redis or the database, failed"""
+
+
+@contextmanager
+def _store_errors(db: Session) -> Iterator[None]:
+    try:
+        yield
+    except RedisError as e:
+        raise RefreshTokenStoreError(str(e)) from e
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise RefreshTokenStoreError(str(e)) from e
+
+
+class CRUDRefreshToken:
+    """
+    Refresh token families, in Redis when `REDIS_ENABLED` and otherwise
+    in the `refresh_token_family` table, so every worker sees the same
+    families either way. Expired rows are pruned whenever a family is
+    started. Either store's failures are raised as RefreshTokenStoreError.
+    """
+
+    def create_family(
+        self,
+        db: Session,
+        *,
+        family: str,
+        secret_hash: str,
+        user_id: str,
+        claims: Dict[str, Any],
+        expires_in: int
+    ) -> None:
+        """Start a family whose current secret is `secret_hash`"""
+        with _store_errors(db):
+            if settings.REDIS_ENABLED:
+                redis.create_refresh_family(
+                    family, secret_hash, user_id, claims, expires_in
+                )
+                return
+            now = datetime.now()
+            db.execute(
+                delete(RefreshTokenFamily)
+                .where(RefreshTokenFamily.expires_at <= now)
+                .execution_options(synchronize_session=False)
+            )
+            db.add(RefreshTokenFamily(
+                id=family,
+                user_id=user_id,
+                secret_hash=secret_hash,
+                claims=claims,
+                expires_at=now + timedelta(seconds=expires_in),
+            ))
+            db.commit()
+
+    def rotate(
+        self,
+        db: Session,
+        *,
+        family: str,
+        secret_hash: str,
+        new_secret_hash: str,
+        expires_in: int
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Replace the family's current secret with `new_secret_hash` and
+        return the user id and claims it was issued for. None if the
+        family is unknown or expired; raises RefreshTokenReused, after
+        revoking the family, if `secret_hash` is not the current secret.
+        """
+        with _store_errors(db):
+            if settings.REDIS_ENABLED:
+                return redis.rotate_refresh_token(
+                    family, secret_hash, new_secret_hash, expires_in
+                )
+            now = datetime.now()
+            # A compare-and-swap on the secret, so of two concurrent uses of
+            # one token only the first succeeds
+            rotated = db.execute(
+                update(RefreshTokenFamily)
+                .where(RefreshTokenFamily.id == family)
+                .where(RefreshTokenFamily.secret_hash == secret_hash)
+                .where(RefreshTokenFamily.expires_at > now)
+                .values(
+                    secret_hash=new_secret_hash,
+                    expires_at=now + timedelta(seconds=expires_in),
+                )
+                .returning(RefreshTokenFamily.user_id, RefreshTokenFamily.claims)
+                .execution_options(synchronize_session=False)
+            ).first()
+            if rotated is not None:
+                db.commit()
+                return rotated.user_id, rotated.claims
+            live = db.execute(
+                delete(RefreshTokenFamily)
+                .where(RefreshTokenFamily.id == family)
+                .returning(RefreshTokenFamily.expires_at)
+                .execution_options(synchronize_session=False)
+            ).first()
+            db.commit()
+            if live is not None and live.expires_at > now:
+                raise RefreshTokenReused(family)
+            return None
+
+    def revoke(self, db: Session, *, family: str) -> None:
+        """Invalidate every refresh token of a family"""
+        with _store_errors(db):
+            if settings.REDIS_ENABLED:
+                redis.revoke_refresh_family(family)
+                return
+            db.execute(
+                delete(RefreshTokenFamily)
+                .where(RefreshTokenFamily.id == family)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+
+refresh_token = CRUDRefreshToken()
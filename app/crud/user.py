@@ -1,19 +1,55 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Union
 from datetime import datetime, timedelta
 import uuid
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
+from app.core.cache import ReadThroughCache
+from app.core.config import settings
 from app.crud.base import CRUDBase
-from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.models.user import AdminPermission, User
+from app.schemas.user import Principal, UserCreate, UserUpdate
+from app.core.hashing import password_hasher
+from app.core.security import get_password_hash
+
+# Serialized `schemas.Principal` by user id, for access tokens without
+# claims. Invalidated on user writes in every worker.
+principal_cache = ReadThroughCache(
+    "principal",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
+# Current token_version by user id, checked against the `ver` claim of
+# every claims-bearing access token
+token_version_cache = ReadThroughCache(
+    "token_version",
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+)
+
+# Changes to these revoke the user's outstanding access tokens
+TOKEN_CLAIM_FIELDS = (
+    "role", "admin_level", "permissions", "is_active", "is_superuser",
+    "hashed_password",
+)
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    def create(
+        self,
+        db: Session,
+        *,
+        obj_in: UserCreate,
+        hashed_password: Optional[str] = None
+    ) -> User:
+        """
+        Create a user, hashing `obj_in.password` unless the caller already
+        hashed it (see app/core/hashing.py) and passes `hashed_password`.
+        """
         obj_in_data = jsonable_encoder(obj_in)
         if "password" in obj_in_data:
-            hashed_password = get_password_hash(obj_in_data["password"])
+            if hashed_password is None:
+                hashed_password = get_password_hash(obj_in_data["password"])
             del obj_in_data["password"]
             obj_in_data["hashed_password"] = hashed_password
         if "model_config" in obj_in_data:
@@ -25,28 +61,137 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         db.refresh(db_obj)
         return db_obj
 
-    def authenticate(
-        self, db: Session, *, username: str, password: str
-    ) -> Optional[User]:
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: User,
+        obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        """
+        Update a user. Changing anything access tokens carry bumps the
+        user's token_version, which revokes the tokens issued before.
+        """
+        if isinstance(obj_in, dict):
+            update_data = dict(obj_in)
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        password = update_data.pop("password", None)
+        if password:
+            update_data["hashed_password"] = get_password_hash(password)
+        if self._claims_changed(db_obj, update_data):
+            update_data["token_version"] = (db_obj.token_version or 0) + 1
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        self._invalidate_caches(str(db_obj.id))
+        return db_obj
+
+    def remove(self, db: Session, *, id: Union[str, int]) -> User:
+        obj = super().remove(db, id=id)
+        self._invalidate_caches(str(id))
+        return obj
+
+    @staticmethod
+    def _claims_changed(db_obj: User, update_data: Dict[str, Any]) -> bool:
+        for field in TOKEN_CLAIM_FIELDS:
+            if field not in update_data:
+                continue
+            old, new = getattr(db_obj, field), update_data[field]
+            if field == "permissions":
+                old = set(map(AdminPermission, old or []))
+                new = set(map(AdminPermission, new or []))
+            if old != new:
+                return True
+        return False
+
+    def _invalidate_caches(self, user_id: str) -> None:
+        principal_cache.invalidate(user_id)
+        token_version_cache.invalidate(user_id)
+
+    def get_token_version(self, db: Session, *, id: str) -> Optional[int]:
+        """
+        The user's current token_version, read through the token version
+        cache. None if the user does not exist.
+        """
+        def load() -> Optional[str]:
+            version = (
+                db.query(User.token_version).filter(User.id == id).scalar()
+            )
+            return None if version is None else str(version)
+
+        payload = token_version_cache.get_or_load(id, load)
+        return None if payload is None else int(payload)
+
+    def get_principal(self, db: Session, *, id: str) -> Optional[Principal]:
+        """
+        The authorization-relevant part of a user, read through the
+        principal cache. None if the user does not exist.
+        """
+        def load() -> Optional[str]:
+            user = self.get(db, id=id)
+            if user is None:
+                return None
+            return Principal(
+                id=str(user.id),
+                role=user.role,
+                admin_level=user.admin_level,
+                permissions=frozenset(user.permissions or []),
+                is_active=bool(user.is_active),
+                is_superuser=bool(user.is_superuser),
+            ).model_dump_json()
+
+        payload = principal_cache.get_or_load(id, load)
+        if payload is None:
+            return None
+        return Principal.model_validate_json(payload)
+
+    def get_by_login(self, db: Session, *, username: str) -> Optional[User]:
+        """The user a login form's username refers to"""
         # Try username (admin) login first
         if username == "admin":
-            user = (
+            return (
                 db.query(User)
                 .filter(User.email == "admin@example.com")
                 .first()
             )
-            if user and verify_password(password, user.hashed_password):
-                return user
-            return None
-
         # Fallback to email login
-        user = self.get_by_email(db, email=username)
+        return self.get_by_email(db, email=username)
+
+    async def authenticate(
+        self, db: Session, *, username: str, password: str
+    ) -> Optional[User]:
+        """
+        The user signing in as `username` if `password` is theirs, with
+        their hash replaced if it was made at a cost outside the accepted
+        range. Database calls run on the threadpool and bcrypt on the
+        password hasher's executor, which raises HasherBusy when full.
+        """
+        user = await run_in_threadpool(self.get_by_login, db, username=username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, user.hashed_password
+        )
+        if not valid:
             return None
+        if new_hash:
+            await run_in_threadpool(
+                self.set_password_hash, db, db_obj=user, hashed_password=new_hash
+            )
         return user
 
+    def set_password_hash(
+        self, db: Session, *, db_obj: User, hashed_password: str
+    ) -> User:
+        """
+        Store a rehash of the user's unchanged password, made at the
+        current cost. Unlike a password change this keeps their tokens.
+        """
+        db_obj.hashed_password = hashed_password
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
     def is_active(self, user: User) -> bool:
         """Check if user is active."""
         return user.is_active
@@ -1,6 +1,15 @@
+import base64
+import json
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Optional, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_upserts = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
 
 
 def generate_uuid() -> str:
@@ -8,6 +17,20 @@ def generate_uuid() -> str:
     return str(uuid.uuid4())
 
 
+def upsert_insert(db: Session) -> Callable:
+    """
+    The dialect's INSERT construct, which supports ON CONFLICT. Raises
+    ValueError if the session is bound to any other dialect.
+    """
+    dialect = db.get_bind().dialect.name
+    try:
+        return _upserts[dialect]
+    except KeyError:
+        raise ValueError(
+            f"Upserts are not supported on the {dialect!r} dialect"
+        ) from None
+
+
 def get_current_time() -> datetime:
     """Get current time with timezone."""
     return datetime.now()
@@ -25,3 +48,22 @@ def parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
     if dt_str is None:
         return None
     return datetime.fromisoformat(dt_str)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    payload = json.dumps(
+        [format_datetime(v) if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode an `(event_date, id)` cursor produced by `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        event_date, obj_id = json.loads(base64.urlsafe_b64decode(padded))
+        return parse_datetime(event_date), str(obj_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -2,8 +2,11 @@
 # imported by Alembic
 from app.db.base_class import Base  # noqa
 from app.core.enums import UserRole, AdminLevel, AdminPermission  # noqa
-from app.models.user import User, AdminAuditLog  # noqa
-from app.models.event import Event  # noqa
+from app.models.user import User, AdminAuditLog, RefreshTokenFamily  # noqa
+from app.models.event import (  # noqa
+    Event, EventArchive, EventSeries, EventSeriesOverride,
+    EventModerationLease, EventDailyRollup
+)
 from app.models.sponsor import Sponsor  # noqa
 from app.models.marketing import MarketingCampaign  # noqa
 from app.models.banner import Banner  # noqa
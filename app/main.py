@@ -1,13 +1,96 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app import crud
 from app.api.v1.api import api_router
+from app.core import redis
 from app.core.config import settings
+from app.core.hashing import calibrate_password_hashing, password_hasher
+from app.core.ratelimit import RateLimitMiddleware, rate_limiter
+from app.core.jobs import PeriodicJob
+from app.db.session import SessionLocal
+
+
+def warm_in_memory_indexes() -> None:
+    """Build in-memory indexes and subscribe to other workers' changes."""
+    db = SessionLocal()
+    try:
+        crud.event.load_upcoming(db)
+    finally:
+        db.close()
+    redis.start_listener()
+
+
+def refresh_trending() -> None:
+    db = SessionLocal()
+    try:
+        crud.event_trending.refresh(db)
+    finally:
+        db.close()
+
+
+trending_job = PeriodicJob(
+    "event-trending", settings.TRENDING_REFRESH_SECONDS, refresh_trending
+)
+
+
+def refresh_promoted() -> None:
+    db = SessionLocal()
+    try:
+        crud.event_promoted.refresh(db)
+    finally:
+        db.close()
+
+
+promoted_job = PeriodicJob(
+    "event-promoted", settings.PROMOTED_REFRESH_SECONDS, refresh_promoted
+)
+
+
+def archive_past_events() -> None:
+    db = SessionLocal()
+    try:
+        crud.event.archive_past(db)
+    finally:
+        db.close()
+
+
+archive_job = PeriodicJob(
+    "event-archive",
+    settings.EVENT_ARCHIVE_INTERVAL_SECONDS,
+    archive_past_events,
+    exclusive=True,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    calibrate_password_hashing()
+    warm_in_memory_indexes()
+    trending_job.run_once()
+    trending_job.start()
+    promoted_job.run_once()
+    promoted_job.start()
+    archive_job.start()
+    yield
+    archive_job.stop()
+    promoted_job.stop()
+    trending_job.stop()
+    # Don't lose the views buffered since the last run
+    crud.event_trending.flush()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
+# Added before CORS so rejections still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Set up CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -1,6 +1,9 @@
 from app.core.enums import UserRole, AdminLevel, AdminPermission
-from app.models.user import User, AdminAuditLog
-from app.models.event import Event
+from app.models.user import User, AdminAuditLog, RefreshTokenFamily
+from app.models.event import (
+    Event, EventStatus, EventArchive, EventSeries, EventSeriesOverride,
+    EventModerationLease, EventDailyRollup
+)
 from app.models.sponsor import Sponsor
 from app.models.marketing import MarketingCampaign
 from app.models.banner import Banner
@@ -8,7 +11,14 @@ from app.models.banner import Banner
 __all__ = [
     "User",
     "AdminAuditLog",
+    "RefreshTokenFamily",
     "Event",
+    "EventStatus",
+    "EventArchive",
+    "EventSeries",
+    "EventSeriesOverride",
+    "EventModerationLease",
+    "EventDailyRollup",
     "Sponsor",
     "MarketingCampaign",
     "Banner",
@@ -2,7 +2,9 @@ from enum import Enum
 import uuid
 from typing import TYPE_CHECKING
 from sqlalchemy import (
-    Column, String, DateTime, ForeignKey, Enum as SQLEnum, Boolean
+    Column, String, DateTime, ForeignKey, Enum as SQLEnum, Boolean, Index,
+    Float, Date, Integer, UniqueConstraint,
+    DDL, event as sa_event
 )
 from sqlalchemy.orm import relationship
 
@@ -19,6 +21,26 @@ class EventStatus(str, Enum):
 
 
 class Event(Base):
+    __table_args__ = (
+        # Keyset pagination order, see CRUDEvent.paginate
+        Index("ix_event_event_date_id", "event_date", "id"),
+        # Listing filters, see CRUDEvent.apply_filters. Each index leads
+        # with the equality-filtered columns and ends in the pagination
+        # key, so a filtered page is a single range scan with no sort.
+        Index("ix_event_city_date", "city", "event_date", "id"),
+        Index("ix_event_type_date", "event_type", "event_date", "id"),
+        Index("ix_event_status_date", "status", "event_date", "id"),
+        Index("ix_event_sponsored_date", "is_sponsored", "event_date", "id"),
+        Index("ix_event_organizer_date", "organizer_id", "event_date", "id"),
+        Index(
+            "ix_event_city_type_date", "city", "event_type", "event_date", "id"
+        ),
+        Index("ix_event_status_city_date", "status", "city", "event_date", "id"),
+        Index(
+            "ix_event_status_type_date", "status", "event_type", "event_date", "id"
+        ),
+    )
+
     id = Column(
         String,
         primary_key=True,
@@ -28,11 +50,200 @@ class Event(Base):
     title = Column(String, index=True)
     description = Column(String)
     location = Column(String)
-    city = Column(String, index=True)
+    city = Column(String)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Derived from latitude/longitude by CRUDEvent, see app/core/geo.py
+    geohash = Column(String, nullable=True, index=True)
     event_date = Column(DateTime)
-    event_type = Column(String, index=True)
+    event_type = Column(String)
     image_url = Column(String, nullable=True)
     status = Column(SQLEnum(EventStatus), default=EventStatus.PENDING)
     is_sponsored = Column(Boolean, default=False)
     organizer_id = Column(String, ForeignKey("user.id"))
     organizer = relationship("User", back_populates="events")
+    # Most similar upcoming event at submission, see CRUDEvent.find_duplicates
+    duplicate_of = Column(String, nullable=True)
+
+
+class EventArchive(Base):
+    """
+    Events dated before the archive horizon, moved out of `event` in
+    batches by CRUDEvent.archive_past so the hot table stays small. Same
+    columns as Event; read only when a query asks for historical dates.
+    """
+    __tablename__ = "event_archive"
+    __table_args__ = (
+        Index("ix_event_archive_event_date_id", "event_date", "id"),
+        Index("ix_event_archive_city_date", "city", "event_date", "id"),
+        Index("ix_event_archive_type_date", "event_type", "event_date", "id"),
+        Index(
+            "ix_event_archive_organizer_date", "organizer_id", "event_date", "id"
+        ),
+    )
+
+    id = Column(String, primary_key=True)
+    title = Column(String)
+    description = Column(String)
+    location = Column(String)
+    city = Column(String)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String, nullable=True)
+    event_date = Column(DateTime)
+    event_type = Column(String)
+    image_url = Column(String, nullable=True)
+    status = Column(SQLEnum(EventStatus))
+    is_sponsored = Column(Boolean)
+    organizer_id = Column(String, ForeignKey("user.id"))
+    duplicate_of = Column(String, nullable=True)
+    archived_at = Column(DateTime, nullable=False)
+
+
+class EventSeries(Base):
+    """
+    A recurring event: one row however many times it repeats. Occurrences
+    are expanded from `rrule` only for the dates a query asks for, see
+    CRUDEventSeries and app/core/recurrence.py.
+    """
+    __tablename__ = "event_series"
+    __table_args__ = (
+        Index("ix_event_series_dtstart", "dtstart"),
+        Index("ix_event_series_city_dtstart", "city", "dtstart"),
+        Index("ix_event_series_organizer", "organizer_id"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    title = Column(String)
+    description = Column(String)
+    location = Column(String)
+    city = Column(String)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    event_type = Column(String)
+    image_url = Column(String, nullable=True)
+    status = Column(SQLEnum(EventStatus), default=EventStatus.PENDING)
+    is_sponsored = Column(Boolean, default=False)
+    organizer_id = Column(String, ForeignKey("user.id"))
+    dtstart = Column(DateTime, nullable=False)
+    # Normalized by app.core.recurrence.normalize_rrule
+    rrule = Column(String, nullable=False)
+    # Latest possible occurrence, NULL if the series never ends
+    ends_at = Column(DateTime, nullable=True)
+    overrides = relationship("EventSeriesOverride", cascade="all, delete-orphan")
+
+
+class EventSeriesOverride(Base):
+    """
+    Changes to a single occurrence of an EventSeries, keyed by the date it
+    was originally due. An occurrence can be cancelled, moved to another
+    `event_date`, or given its own title, description, location or image.
+    """
+    __tablename__ = "event_series_override"
+    __table_args__ = (
+        UniqueConstraint(
+            "series_id", "occurrence_date",
+            name="uq_event_series_override_occurrence"
+        ),
+        Index("ix_event_series_override_event_date", "series_id", "event_date"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    series_id = Column(
+        String, ForeignKey("event_series.id", ondelete="CASCADE"), nullable=False
+    )
+    occurrence_date = Column(DateTime, nullable=False)
+    cancelled = Column(Boolean, nullable=False, default=False)
+    title = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    image_url = Column(String, nullable=True)
+    event_date = Column(DateTime, nullable=True)
+
+
+class EventModerationLease(Base):
+    """
+    A moderator's claim on a pending event, so concurrent moderators
+    working the queue are handed different events. See
+    CRUDEvent.claim_pending.
+    """
+    __tablename__ = "event_moderation_lease"
+    __table_args__ = (
+        UniqueConstraint("event_id", name="uq_event_moderation_lease_event"),
+        Index("ix_event_moderation_lease_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_id = Column(
+        String, ForeignKey("event.id", ondelete="CASCADE"), nullable=False
+    )
+    moderator_id = Column(String, ForeignKey("user.id"), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class EventDailyRollup(Base):
+    """
+    Event counts per day, city, type and status. Maintained by CRUDEvent
+    in the same transaction as each event write.
+    """
+    __tablename__ = "event_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "day", "city", "event_type", "status",
+            name="uq_event_daily_rollup_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False)
+    city = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)
+    status = Column(SQLEnum(EventStatus), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# Full-text search index, maintained by CRUDEvent (see app/crud/event.py).
+# SQLite uses an FTS5 table keyed by event_search_key, which gives each
+# indexed event an INTEGER PRIMARY KEY; the event table's own rowid is
+# implicit (its key is a string) and VACUUM may renumber it. Postgres
+# keeps a weighted tsvector per event behind a GIN index.
+EVENT_SEARCH_DDL = {
+    "sqlite": [
+        "CREATE TABLE IF NOT EXISTS event_search_key ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "event_id VARCHAR NOT NULL UNIQUE)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5("
+        "title, description, location, city, "
+        "tokenize='unicode61 remove_diacritics 2')",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS event_search ("
+        "event_id VARCHAR PRIMARY KEY "
+        "REFERENCES event (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_event_search_document "
+        "ON event_search USING GIN (document)",
+    ],
+}
+EVENT_SEARCH_DROP_DDL = {
+    "sqlite": [
+        "DROP TABLE IF EXISTS event_fts",
+        "DROP TABLE IF EXISTS event_search_key",
+    ],
+    "postgresql": ["DROP TABLE IF EXISTS event_search"],
+}
+
+for _dialect, _statements in EVENT_SEARCH_DDL.items():
+    for _statement in _statements:
+        sa_event.listen(
+            Event.__table__,
+            "after_create",
+            DDL(_statement).execute_if(dialect=_dialect),
+        )
+for _dialect, _statements in EVENT_SEARCH_DROP_DDL.items():
+    for _statement in _statements:
+        sa_event.listen(
+            Event.__table__,
+            "before_drop",
+            DDL(_statement).execute_if(dialect=_dialect),
+        )
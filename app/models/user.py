@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
 from sqlalchemy import (
     Boolean, String, DateTime, Enum, Integer,
@@ -36,6 +37,25 @@ class AdminAuditLog(Base):
     admin: Mapped["User"] = relationship("User", back_populates="audit_logs")
 
 
+class RefreshTokenFamily(Base):
+    """
+    A refresh token family, keyed by its family id, when Redis is not
+    enabled. See CRUDRefreshToken.
+    """
+    __tablename__ = "refresh_token_family"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[str] = mapped_column(
+        String, ForeignKey("user.id", ondelete="CASCADE"), nullable=False
+    )
+    # Hash of the only secret currently valid in the family
+    secret_hash: Mapped[str] = mapped_column(String, nullable=False)
+    claims: Mapped[dict] = mapped_column(JSON, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )
+
+
 class User(Base):
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
@@ -67,6 +87,11 @@ class User(Base):
     last_login: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
     last_active: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
     login_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default='0')
+    # Embedded in access tokens; bumping it revokes every token issued
+    # before, see CRUDUser.update
+    token_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default='0'
+    )
 
     # Relationships
     events: Mapped[List["Event"]] = relationship("Event", back_populates="organizer")
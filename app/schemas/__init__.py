@@ -17,6 +17,31 @@ from .event import (
     EventCreate,
     EventUpdate,
     Event,
+    EventList,
+    EventSort,
+    EventFilter,
+    EventSearchResult,
+    EventFacets,
+    EventSuggestion,
+    EventNearby,
+    EventTrending,
+    EventRecommendation,
+    TrendingCity,
+    PromotedKind,
+    EventPromoted,
+    EventModerationAction,
+    EventModeration,
+    EventModerationResult,
+    EventDuplicateCluster,
+    EventDayCount,
+    EventSeriesBase,
+    EventSeriesCreate,
+    EventSeriesUpdate,
+    EventSeries,
+    EventOccurrenceUpdate,
+    EventOccurrenceOverride,
+    EventImportError,
+    EventImportResult,
 )
 from .sponsor import (
     SponsorBase,
@@ -24,12 +49,13 @@ from .sponsor import (
     SponsorUpdate,
     Sponsor,
 )
-from .token import Token, TokenPayload, TokenWithUser
+from .token import Token, TokenPayload, TokenWithUser, RefreshTokenRequest
 from .user import (
     UserBase,
     UserCreate,
     UserUpdate,
     User,
+    Principal,
 )
 from .marketing import (
     MarketingCampaignBase,
@@ -58,6 +84,31 @@ __all__ = [
     "EventCreate",
     "EventUpdate",
     "Event",
+    "EventList",
+    "EventSort",
+    "EventFilter",
+    "EventSearchResult",
+    "EventFacets",
+    "EventSuggestion",
+    "EventNearby",
+    "EventTrending",
+    "EventRecommendation",
+    "TrendingCity",
+    "PromotedKind",
+    "EventPromoted",
+    "EventModerationAction",
+    "EventModeration",
+    "EventModerationResult",
+    "EventDuplicateCluster",
+    "EventDayCount",
+    "EventSeriesBase",
+    "EventSeriesCreate",
+    "EventSeriesUpdate",
+    "EventSeries",
+    "EventOccurrenceUpdate",
+    "EventOccurrenceOverride",
+    "EventImportError",
+    "EventImportResult",
     # Sponsor
     "SponsorBase",
     "SponsorCreate",
@@ -67,11 +118,13 @@ __all__ = [
     "Token",
     "TokenPayload",
     "TokenWithUser",
+    "RefreshTokenRequest",
     # User
     "UserBase",
     "UserCreate",
     "UserUpdate",
     "User",
+    "Principal",
     # Marketing
     "MarketingCampaignBase",
     "MarketingCampaignCreate",
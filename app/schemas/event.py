@@ -1,6 +1,10 @@
-from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+from enum import Enum
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from app.core.config import settings
+from app.models.event import EventStatus
+from app.schemas.banner import Banner
 
 
 class EventBase(BaseModel):
@@ -11,6 +15,8 @@ class EventBase(BaseModel):
     event_date: datetime
     event_type: str
     image_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class EventCreate(EventBase):
@@ -25,13 +31,19 @@ class EventUpdate(BaseModel):
     event_date: Optional[datetime] = None
     event_type: Optional[str] = None
     image_url: Optional[str] = None
-    status: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    status: Optional[EventStatus] = None
 
 
 class EventInDBBase(EventBase):
     id: str
-    status: str
+    status: EventStatus
     organizer_id: str
+    # Set on occurrences of a recurring EventSeries
+    series_id: Optional[str] = None
+    # Set when the event looked like a resubmission of another
+    duplicate_of: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -42,3 +54,168 @@ class Event(EventInDBBase):
 
 class EventInDB(EventInDBBase):
     pass
+
+
+class EventSearchResult(Event):
+    score: float
+    snippet: Optional[str] = None
+
+
+class EventNearby(Event):
+    distance_km: float
+
+
+class EventTrending(Event):
+    score: float
+
+
+class EventRecommendation(Event):
+    score: float
+
+
+class TrendingCity(BaseModel):
+    city: str
+    score: float
+
+
+class PromotedKind(str, Enum):
+    EVENT = "event"
+    BANNER = "banner"
+
+
+class EventPromoted(BaseModel):
+    kind: PromotedKind
+    # Set for sponsored events
+    event: Optional[Event] = None
+    # Set for banner placements
+    banner: Optional[Banner] = None
+
+
+class EventList(BaseModel):
+    items: List[Event]
+    next_cursor: Optional[str] = None
+
+
+class EventSort(str, Enum):
+    DATE_ASC = "event_date"
+    DATE_DESC = "-event_date"
+
+
+class EventFilter(BaseModel):
+    city: Optional[str] = None
+    event_type: Optional[str] = None
+    status: Optional[EventStatus] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    is_sponsored: Optional[bool] = None
+    organizer_id: Optional[str] = None
+    sort: EventSort = EventSort.DATE_ASC
+
+
+class EventFacets(BaseModel):
+    total: int
+    city: Dict[str, int]
+    event_type: Dict[str, int]
+    status: Dict[str, int]
+    month: Dict[str, int]
+    is_sponsored: Dict[str, int]
+
+
+class EventSuggestion(BaseModel):
+    text: str
+    kind: str  # title, city, venue
+    weight: int
+
+
+class EventModerationAction(str, Enum):
+    APPROVE = "approve"
+    REJECT = "reject"
+
+
+class EventModeration(BaseModel):
+    ids: List[str] = Field(
+        ..., min_length=1, max_length=settings.EVENT_MODERATION_MAX_BATCH
+    )
+    action: EventModerationAction
+
+
+class EventModerationResult(BaseModel):
+    updated: List[Event]
+    # Requested ids that were missing or no longer pending
+    skipped: List[str]
+
+
+class EventDuplicateCluster(BaseModel):
+    events: List[Event]
+
+
+class EventDayCount(BaseModel):
+    day: date
+    count: int
+
+
+class EventSeriesBase(BaseModel):
+    title: str
+    description: str
+    location: str
+    city: str
+    event_type: str
+    image_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    dtstart: datetime
+    # RFC 5545 recurrence rule, e.g. "FREQ=WEEKLY;BYDAY=TU,TH;COUNT=10"
+    rrule: str
+
+
+class EventSeriesCreate(EventSeriesBase):
+    pass
+
+
+class EventSeriesUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    city: Optional[str] = None
+    event_type: Optional[str] = None
+    image_url: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    dtstart: Optional[datetime] = None
+    rrule: Optional[str] = None
+
+
+class EventSeries(EventSeriesBase):
+    id: str
+    status: str
+    organizer_id: str
+    ends_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class EventOccurrenceUpdate(BaseModel):
+    cancelled: bool = False
+    title: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    image_url: Optional[str] = None
+    event_date: Optional[datetime] = None
+
+
+class EventOccurrenceOverride(EventOccurrenceUpdate):
+    series_id: str
+    occurrence_date: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class EventImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class EventImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[EventImportError]
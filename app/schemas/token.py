@@ -1,11 +1,18 @@
 from typing import Optional
 from pydantic import BaseModel
+from app.core.enums import AdminLevel, UserRole
 from .user import User
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    # Exchanged at /auth/refresh for a new access token
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenWithUser(Token):
@@ -14,3 +21,10 @@ class TokenWithUser(Token):
 
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
+    # Authorization claims, see security.token_claims. Tokens issued
+    # before these existed carry only `sub`.
+    role: Optional[UserRole] = None
+    lvl: Optional[AdminLevel] = None
+    perms: int = 0
+    su: bool = False
+    ver: Optional[int] = None
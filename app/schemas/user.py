@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import FrozenSet, Optional, List
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from app.core.enums import UserRole, AdminLevel, AdminPermission
 
@@ -43,3 +43,38 @@ class User(UserInDBBase):
 # Additional properties stored in DB
 class UserInDB(UserInDBBase):
     hashed_password: str
+
+
+class Principal(BaseModel):
+    """
+    The caller behind a token: just what authorization checks need.
+    Cached per user id by CRUDUser.get_principal, so identity-only
+    endpoints don't load the user row.
+    """
+    id: str
+    role: UserRole
+    admin_level: Optional[AdminLevel] = None
+    permissions: FrozenSet[AdminPermission] = frozenset()
+    is_active: bool = True
+    is_superuser: bool = False
+
+    model_config = ConfigDict(frozen=True)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN
+
+    @property
+    def is_super_admin(self) -> bool:
+        return self.is_admin and self.admin_level == AdminLevel.SUPER_ADMIN
+
+    @property
+    def is_sponsor(self) -> bool:
+        return self.role == UserRole.SPONSOR
+
+    def has_permission(self, permission: AdminPermission) -> bool:
+        if not self.is_admin:
+            return False
+        if self.is_super_admin:
+            return True
+        return permission in self.permissions
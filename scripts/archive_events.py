@@ -0,0 +1,27 @@
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent.absolute())
+sys.path.insert(0, project_root)
+
+from app import crud
+from app.db.session import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logger.info("Archiving past events")
+    db = SessionLocal()
+    try:
+        moved = crud.event.archive_past(db)
+    finally:
+        db.close()
+    logger.info(f"Archived {moved} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent.absolute())
+sys.path.insert(0, project_root)
+
+from dateutil.rrule import rrulestr
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import crud
+from app.db.base import Base
+from app.models.event import EventSeries, EventSeriesOverride
+from app.schemas.event import EventFilter, EventSeriesCreate
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How long the benchmarked daily series has been running, in days
+SERIES_AGES = (10, 1_000, 10_000, 100_000)
+REPEAT = 20
+
+
+def _time(func: Callable[[], object]) -> float:
+    """Median wall time of `func` in milliseconds"""
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main() -> None:
+    """
+    Show that recurring series cost the same to store and to query however
+    many occurrences they have had: a daily series is created with ever
+    older start dates, and a month of it is listed, counted per day and
+    read by id. Naive expansion from the start date is timed alongside for
+    comparison. Runs against a throwaway in-memory SQLite database.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now().replace(hour=19, minute=0, second=0, microsecond=0)
+    start, end = now + timedelta(days=30), now + timedelta(days=60)
+
+    logger.info(
+        "%10s %12s %8s %10s %10s %10s %10s",
+        "age_days", "occurrences", "rows", "page_ms", "calendar_ms",
+        "read_ms", "naive_ms",
+    )
+    for age in SERIES_AGES:
+        db = Session(bind=engine)
+        db.query(EventSeriesOverride).delete()
+        db.query(EventSeries).delete()
+        db.commit()
+        series = crud.event_series.create_with_organizer(
+            db,
+            obj_in=EventSeriesCreate(
+                title="Evening Run",
+                description="Benchmark",
+                location="Park",
+                city="Benchmark",
+                event_type="Sport",
+                dtstart=now - timedelta(days=age),
+                rrule="FREQ=DAILY",
+            ),
+            organizer_id="benchmark",
+        )
+        filters = EventFilter(city="Benchmark", start_date=start, end_date=end)
+        occurrence_id = crud.event_series.get_page_rows(
+            db, filters=filters, limit=1
+        )[0].id
+        rows = db.query(EventSeries).count() + db.query(EventSeriesOverride).count()
+
+        page_ms = _time(lambda: crud.event.get_multi_filtered(
+            db, filters=filters, limit=50
+        ))
+        calendar_ms = _time(lambda: crud.event.get_daily_counts(
+            db, start.date(), end.date(), city="Benchmark"
+        ))
+        read_ms = _time(lambda: crud.event_series.get_occurrence(
+            db, id=occurrence_id
+        ))
+        naive_ms = _time(lambda: rrulestr(
+            series.rrule, dtstart=series.dtstart
+        ).between(start, end, inc=True))
+        logger.info(
+            "%10d %12d %8d %10.2f %10.2f %10.2f %10.2f",
+            age, age + 60, rows, page_ms, calendar_ms, read_ms, naive_ms,
+        )
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = str(Path(__file__).parent.parent.absolute())
+sys.path.insert(0, project_root)
+
+from app import crud
+from app.db.session import SessionLocal
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logger.info("Rebuilding event search index")
+    db = SessionLocal()
+    try:
+        crud.event.rebuild_search_index(db)
+    finally:
+        db.close()
+    logger.info("Event search index rebuilt")
+
+
+if __name__ == "__main__":
+    main()
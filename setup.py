@@ -18,6 +18,9 @@ setup(
         "python-multipart==0.0.6",
         "email-validator==2.1.0.post1",
         "python-dotenv==1.0.0",
+        "redis==5.0.1",
+        "numpy>=1.26.3",
+        "python-dateutil>=2.8.2",
     ],
     extras_require={
         'test': [
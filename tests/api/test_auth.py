@@ -1,6 +1,27 @@
+import asyncio
+import importlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
+import pytest
+from jose import jwt
+from pytest import MonkeyPatch
+from sqlalchemy import event as sa_event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 from app import crud
+from app.api.v1.endpoints import auth
+from app.core.hashing import PasswordHasher
+from app.core import ratelimit
+from app.core import redis as sessions
+from app.core.ratelimit import RateLimiter, _client_ip, parse_rate
+from app.core.config import settings
+from app.core import security
+from app.core.security import ALGORITHM, create_access_token
+from app.models.user import RefreshTokenFamily, User
 from app.schemas.user import UserCreate
 from app.core.enums import UserRole
 
@@ -54,3 +75,382 @@ def test_login_user(client: TestClient, db: Session) -> None:
     tokens = response.json()
     assert "access_token" in tokens
     assert tokens["access_token"]
+
+
+def test_login_backpressure(
+    client: TestClient,
+    db: Session,
+    superuser_token_headers: dict,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    monkeypatch.setattr(auth, "password_hasher", hasher)
+    monkeypatch.setattr(
+        importlib.import_module("app.crud.user"), "password_hasher", hasher
+    )
+    data = {"username": "test@example.com", "password": "test123"}
+
+    # Occupy the only worker
+    release = threading.Event()
+    blocker = threading.Thread(
+        target=asyncio.run, args=(hasher._run(release.wait),)
+    )
+    blocker.start()
+    try:
+        while hasher.stats()["running"] < 1:
+            time.sleep(0.01)
+        response = client.post("/api/v1/auth/login", data=data)
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        response = client.post(
+            "/api/v1/auth/register",
+            json={"email": "busy@example.com", "password": "busy123"},
+        )
+        assert response.status_code == 503
+    finally:
+        release.set()
+        blocker.join()
+    assert crud.user.get_by_email(db, email="busy@example.com") is None
+
+    response = client.post("/api/v1/auth/login", data=data)
+    assert response.status_code == 200
+    stats = hasher.stats()
+    assert stats["rejected"] == 2
+    assert stats["completed"] == 2
+    assert stats["queued"] == 0
+    assert stats["hash_ms"]["max"] > 0
+    hasher.shutdown()
+
+    response = client.get(
+        "/api/v1/admin/hashing-stats", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["executor"] == "thread"
+
+
+def test_principal_cache(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    crud.user.create(db, obj_in=UserCreate(
+        email="principal@example.com",
+        password="principal123",
+        full_name="Principal User",
+        role=UserRole.USER,
+    ))
+    user_id = str(crud.user.get_by_email(db, email="principal@example.com").id)
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "principal@example.com", "password": "principal123"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/v1/events/trending", headers=headers).status_code == 200
+
+    statements = []
+
+    def capture(conn, cursor_, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/api/v1/events/trending", headers=headers)
+        assert response.status_code == 200
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", capture)
+    # Identity-only endpoints are answered from the cached principal
+    assert statements == []
+
+    # Role and status changes revoke outstanding tokens at once
+    assert client.get(
+        "/api/v1/admin/cache-stats", headers=headers
+    ).status_code == 403
+    response = client.patch(
+        f"/api/v1/users/{user_id}/role",
+        headers=superuser_token_headers,
+        json={"role": "admin"},
+    )
+    assert response.status_code == 200
+    response = client.get("/api/v1/events/trending", headers=headers)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Token has been revoked"
+    # Tokens without claims fall back to the cached principal
+    legacy = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    assert client.get(
+        "/api/v1/admin/cache-stats", headers=legacy
+    ).status_code == 200
+
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "principal@example.com", "password": "principal123"},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get(
+        "/api/v1/admin/cache-stats", headers=headers
+    ).status_code == 200
+    # Profile edits keep tokens valid
+    response = client.put(
+        "/api/v1/users/me", headers=headers, json={"full_name": "Renamed"}
+    )
+    assert response.status_code == 200
+    assert client.get("/api/v1/events/trending", headers=headers).status_code == 200
+
+    response = client.patch(
+        f"/api/v1/users/{user_id}/status",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert response.status_code == 200
+    assert client.get(
+        "/api/v1/events/trending", headers=headers
+    ).status_code == 403
+    response = client.get("/api/v1/events/trending", headers=legacy)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+def test_refresh_tokens(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    crud.user.create(db, obj_in=UserCreate(
+        email="refresh@example.com",
+        password="refresh123",
+        full_name="Refresh User",
+        role=UserRole.USER,
+    ))
+    user_id = str(crud.user.get_by_email(db, email="refresh@example.com").id)
+    login = {"username": "refresh@example.com", "password": "refresh123"}
+
+    def refresh(token: str):
+        return client.post(
+            "/api/v1/auth/refresh", json={"refresh_token": token}
+        )
+
+    tokens = client.post("/api/v1/auth/login", data=login).json()
+    claims = jwt.decode(
+        tokens["access_token"], settings.SECRET_KEY, algorithms=[ALGORITHM]
+    )
+    assert claims["exp"] - time.time() <= settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    # Each refresh hands out a working pair and retires the old token
+    response = refresh(tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {rotated['access_token']}"}
+    assert client.get("/api/v1/events/trending", headers=headers).status_code == 200
+    response = refresh(rotated["refresh_token"])
+    assert response.status_code == 200
+    latest = response.json()["refresh_token"]
+
+    # Replaying a retired token revokes the whole family
+    response = refresh(tokens["refresh_token"])
+    assert response.status_code == 401
+    assert "reuse" in response.json()["detail"]
+    assert refresh(latest).status_code == 401
+    assert refresh("garbage").status_code == 401
+
+    # Changes that revoke access tokens end refresh families too
+    tokens = client.post("/api/v1/auth/login", data=login).json()
+    response = client.patch(
+        f"/api/v1/users/{user_id}/role",
+        headers=superuser_token_headers,
+        json={"role": "sponsor"},
+    )
+    assert response.status_code == 200
+    response = refresh(tokens["refresh_token"])
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token has been revoked"
+
+    tokens = client.post("/api/v1/auth/login", data=login).json()
+    response = client.post(
+        "/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 204
+    assert refresh(tokens["refresh_token"]).status_code == 401
+
+    # Without Redis, families are rows shared by every worker. Expired
+    # ones stop working and are pruned when the next family starts.
+    tokens = client.post("/api/v1/auth/login", data=login).json()
+    family = tokens["refresh_token"].partition(".")[0]
+    db.query(RefreshTokenFamily).filter(RefreshTokenFamily.id == family).update(
+        {RefreshTokenFamily.expires_at: datetime.now() - timedelta(seconds=1)}
+    )
+    db.commit()
+    client.post("/api/v1/auth/login", data=login)
+    assert db.query(RefreshTokenFamily).filter(
+        RefreshTokenFamily.id == family
+    ).count() == 0
+    assert refresh(tokens["refresh_token"]).status_code == 401
+
+    # Store failures degrade the endpoints instead of failing with a 500
+    tokens = client.post("/api/v1/auth/login", data=login).json()
+
+    def store_down(conn, cursor, statement, *args):
+        if "refresh_token_family" in statement:
+            raise OperationalError(statement, None, Exception("store down"))
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", store_down)
+    try:
+        response = client.post("/api/v1/auth/login", data=login)
+        assert response.status_code == 200
+        assert response.json()["refresh_token"] is None
+        response = refresh(tokens["refresh_token"])
+        assert response.status_code == 503
+        response = client.post(
+            "/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}
+        )
+        assert response.status_code == 204
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", store_down)
+    assert refresh(tokens["refresh_token"]).status_code == 200
+
+
+def test_password_rehash(client: TestClient, db: Session) -> None:
+    assert security.calibrate_bcrypt_rounds(0, 4, 6) == 4
+    assert security.calibrate_bcrypt_rounds(10 ** 9, 4, 6) == 6
+
+    def login() -> str:
+        response = client.post(
+            "/api/v1/auth/login",
+            data={"username": "test@example.com", "password": "test123"},
+        )
+        assert response.status_code == 200
+        db.expire_all()
+        return response.json()["access_token"]
+
+    def stored_hash() -> str:
+        return crud.user.get_by_email(db, email="test@example.com").hashed_password
+
+    def authenticate(password: str) -> Optional[User]:
+        return asyncio.run(crud.user.authenticate(
+            db, username="test@example.com", password=password
+        ))
+
+    try:
+        # Hashes outside the accepted range are replaced on sign-in
+        security.configure_password_hashing(4, 4, 6)
+        login()
+        assert stored_hash().startswith("$2b$04$")
+        # A rehash is not a password change, so tokens stay valid
+        token = login()
+        response = client.get(
+            "/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        assert authenticate("wrong") is None
+        # A node at another cost within the range leaves them alone
+        security.configure_password_hashing(5, 4, 6)
+        login()
+        assert stored_hash().startswith("$2b$04$")
+    finally:
+        security.configure_password_hashing(security.DEFAULT_BCRYPT_ROUNDS)
+    assert authenticate("test123") is not None
+    assert stored_hash().startswith("$2b$12$")
+
+
+def test_rate_limits(client: TestClient, monkeypatch: MonkeyPatch) -> None:
+    limiter = RateLimiter()
+    assert [limiter.hit("key", 2, 60).allowed for _ in range(3)] == [
+        True, True, False
+    ]
+    # One request's worth of time must pass before the next is allowed
+    assert limiter.hit("key", 2, 60).retry_after == pytest.approx(30, abs=1)
+    assert limiter.hit("other", 2, 60).remaining == 1
+
+    # Checks against Redis block, so they run off the event loop
+    threads = []
+
+    def gcra(keys, args):
+        threads.append(threading.get_ident())
+        return [1, "4"]
+
+    with monkeypatch.context() as m:
+        m.setattr(settings, "REDIS_ENABLED", True)
+        m.setattr(ratelimit, "_gcra", gcra)
+        result = asyncio.run(limiter.hit_async("key", 5, 60))
+    assert result == (True, 4, 0.0)
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+    # A stopped clock, so no request's worth of time passes mid-test
+    now = time.monotonic()
+    monkeypatch.setattr(ratelimit, "time", SimpleNamespace(monotonic=lambda: now))
+
+    limit, _ = parse_rate(settings.RATE_LIMIT_AUTH)
+    data = {"username": "nobody@example.com", "password": "wrong"}
+    for _ in range(limit):
+        response = client.post("/api/v1/auth/login", data=data)
+        assert response.status_code == 401
+    # Rejected before the endpoint, so before any password hashing
+    response = client.post("/api/v1/auth/login", data=data)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    response = client.get("/api/v1/events/promoted")
+    assert response.status_code == 200
+    limit, _ = parse_rate(settings.RATE_LIMIT_API)
+    assert response.headers["RateLimit-Limit"] == str(limit)
+    assert int(response.headers["RateLimit-Remaining"]) < limit
+
+    # Behind proxies, only the entries they appended are trusted
+    scope = {
+        "client": ("10.0.0.1", 443),
+        "headers": [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")],
+    }
+    assert _client_ip(scope) == "10.0.0.1"
+    assert _client_ip(scope, 1) == "203.0.113.7"
+    assert _client_ip(scope, 3) == "6.6.6.6"
+
+    limit, _ = parse_rate(settings.RATE_LIMIT_TRACKING)
+    for _ in range(limit):
+        assert client.post("/api/v1/banners/missing/view").status_code == 404
+    assert client.post("/api/v1/banners/missing/click").status_code == 429
+
+
+def test_user_sessions(monkeypatch: MonkeyPatch) -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(sessions, "redis_client", fake)
+    for name, script in [
+        ("_set_session", sessions._SET_SESSION_SCRIPT),
+        ("_delete_session", sessions._DELETE_SESSION_SCRIPT),
+        ("_extend_session", sessions._EXTEND_SESSION_SCRIPT),
+        ("_active_sessions", sessions._ACTIVE_SESSIONS_SCRIPT),
+        ("_clear_sessions", sessions._CLEAR_SESSIONS_SCRIPT),
+    ]:
+        monkeypatch.setattr(sessions, name, fake.register_script(script))
+
+    sessions.set_session("s1", "u1", expires_in=60)
+    sessions.set_session("s2", "u1", expires_in=60)
+    sessions.set_session("s3", "u2", expires_in=60)
+    assert sessions.get_session("s1") == "u1"
+    assert sorted(sessions.get_active_sessions("u1")) == ["s1", "s2"]
+    assert fake.ttl("session:s1") == 60
+
+    # Reusing an id moves it to the new owner's index
+    sessions.set_session("s3", "u1", expires_in=60)
+    assert sessions.get_active_sessions("u2") == []
+    sessions.delete_session("s3")
+    assert sessions.get_session("s3") is None
+
+    # Members of expired sessions are pruned when the index is read
+    fake.zadd("user_sessions:u1", {"stale": 1})
+    assert sorted(sessions.get_active_sessions("u1")) == ["s1", "s2"]
+    assert fake.zscore("user_sessions:u1", "stale") is None
+
+    sessions.extend_session("s1", expires_in=600)
+    assert fake.ttl("session:s1") == 600
+    assert fake.ttl("user_sessions:u1") == 600
+    assert fake.zscore("user_sessions:u1", "s1") > fake.zscore(
+        "user_sessions:u1", "s2"
+    )
+    sessions.extend_session("missing", expires_in=600)
+    assert not fake.exists("session:missing")
+
+    sessions.delete_session("s2")
+    assert sessions.get_session("s2") is None
+    assert sessions.get_active_sessions("u1") == ["s1"]
+
+    sessions.set_session("s4", "u1", expires_in=60)
+    assert sessions.clear_user_sessions("u1") == 2
+    assert not fake.exists("session:s1", "session:s4", "user_sessions:u1")
+    assert sessions.clear_user_sessions("u1") == 0
@@ -1,12 +1,29 @@
+import csv
+import io
+import json
+import time
 from datetime import datetime, timedelta
-from typing import cast
+from types import SimpleNamespace
+from typing import Any, List, Tuple, cast
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Session
 from app import crud
-from app.schemas.event import EventCreate
+from app.core.config import settings
+from app.crud.utils import encode_cursor, upsert_insert
+from app.models.event import (
+    EventArchive, EventModerationLease, EventSeries, EventSeriesOverride,
+    EventStatus
+)
+from app.models.sponsor import Sponsor
+from app.schemas.banner import BannerCreate
+from app.schemas.event import EventCreate, EventFilter, EventSort
 from app.schemas.user import UserCreate
 from app.models.user import User
 from app.models.event import Event
+from app.crud.event import event_detail_cache, event_version
 
 
 def test_create_event(
@@ -108,3 +125,1342 @@ def test_read_event(
     assert content["location"] == event.location
     assert content["city"] == event.city
     assert content["event_type"] == event.event_type
+
+
+def test_list_events_by_type_cursor_pagination(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    event_date = datetime.now() + timedelta(days=3)
+    created = [
+        crud.event.create_with_organizer(
+            db=db,
+            obj_in=EventCreate(
+                title=f"Keyset Event {i}",
+                description="Keyset Description",
+                location="Keyset Location",
+                city="Pune",
+                # Two events share each timestamp to exercise the id tiebreak
+                event_date=event_date + timedelta(hours=i // 2),
+                event_type="Keyset"
+            ),
+            organizer_id=str(admin.id)
+        )
+        for i in range(5)
+    ]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            "/api/v1/events/type/Keyset",
+            headers=superuser_token_headers,
+            params=params
+        )
+        assert response.status_code == 200
+        content = response.json()
+        seen.extend(item["id"] for item in content["items"])
+        cursor = content["next_cursor"]
+        if not seen or cursor is None:
+            break
+        # Rows inserted before the cursor position must not shift later pages
+        crud.event.create_with_organizer(
+            db=db,
+            obj_in=EventCreate(
+                title="Keyset Late Arrival",
+                description="Keyset Description",
+                location="Keyset Location",
+                city="Pune",
+                event_date=event_date - timedelta(days=1),
+                event_type="Keyset"
+            ),
+            organizer_id=str(admin.id)
+        )
+
+    assert seen == [
+        e.id for e in sorted(created, key=lambda e: (e.event_date, e.id))
+    ]
+
+    response = client.get(
+        "/api/v1/events/type/Keyset",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+def test_search_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    kathak = crud.event.create_with_organizer(
+        db=db,
+        obj_in=EventCreate(
+            title="Kathak Utsav",
+            description="An evening of classical Kathak dance",
+            location="Bal Gandharva Rang Mandir",
+            city="Pune",
+            event_date=datetime.now() + timedelta(days=4),
+            event_type="Dance"
+        ),
+        organizer_id=str(admin.id)
+    )
+    crud.event.create_with_organizer(
+        db=db,
+        obj_in=EventCreate(
+            title="Natak Night",
+            description="Marathi drama with a short kathak interlude",
+            location="Shanmukhananda Hall",
+            city="Mumbai",
+            event_date=datetime.now() + timedelta(days=5),
+            event_type="Drama"
+        ),
+        organizer_id=str(admin.id)
+    )
+
+    response = client.get(
+        "/api/v1/events/search",
+        headers=superuser_token_headers,
+        params={"q": "kath"}
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["title"] for r in results] == ["Kathak Utsav", "Natak Night"]
+    assert results[0]["score"] > results[1]["score"]
+    assert "<mark>" in results[1]["snippet"]
+
+    # Edits and deletes are reflected without a rebuild
+    crud.event.update(db=db, db_obj=kathak, obj_in={"title": "Odissi Utsav"})
+    response = client.get(
+        "/api/v1/events/search",
+        headers=superuser_token_headers,
+        params={"q": "odissi pune"}
+    )
+    assert [r["id"] for r in response.json()] == [kathak.id]
+    crud.event.remove(db=db, id=kathak.id)
+    crud.event.rebuild_search_index(db)
+    response = client.get(
+        "/api/v1/events/search",
+        headers=superuser_token_headers,
+        params={"q": "odissi"}
+    )
+    assert response.json() == []
+
+
+def test_event_facets(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    params = {"event_type": "Facet"}
+    response = client.get(
+        "/api/v1/events/facets", headers=superuser_token_headers, params=params
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+    for city, day in [("Nashik", 1), ("Nashik", 2), ("Nagpur", 40)]:
+        crud.event.create_with_organizer(
+            db=db,
+            obj_in=EventCreate(
+                title="Facet Event",
+                description="Facet Description",
+                location="Facet Location",
+                city=city,
+                event_date=datetime(2030, 1, 1) + timedelta(days=day),
+                event_type="Facet"
+            ),
+            organizer_id=str(admin.id)
+        )
+
+    # The write invalidated the cached empty result
+    response = client.get(
+        "/api/v1/events/facets", headers=superuser_token_headers, params=params
+    )
+    content = response.json()
+    assert content["total"] == 3
+    assert content["city"] == {"Nashik": 2, "Nagpur": 1}
+    assert content["event_type"] == {"Facet": 3}
+    assert content["status"] == {"pending": 3}
+    assert content["month"] == {"2030-01": 2, "2030-02": 1}
+    assert content["is_sponsored"] == {"false": 3}
+
+    # A write on another worker leaves this process's cache alone but
+    # bumps the shared event version, which is part of the cache key
+    db.query(Event).filter(Event.event_type == "Facet").update(
+        {Event.city: "Nagpur"}
+    )
+    db.commit()
+    event_version.bump()
+    response = client.get(
+        "/api/v1/events/facets", headers=superuser_token_headers, params=params
+    )
+    assert response.json()["city"] == {"Nagpur": 3}
+
+
+def test_suggest_events(client: TestClient, db: Session) -> None:
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    events = [
+        crud.event.create_with_organizer(
+            db=db,
+            obj_in=EventCreate(
+                title=title,
+                description="Suggest Description",
+                location="Keshavrao Bhosale Natyagruha",
+                city=city,
+                event_date=datetime.now() + timedelta(days=days),
+                event_type="Folk"
+            ),
+            organizer_id=str(admin.id)
+        )
+        for title, city, days in [
+            ("Lavani Mahotsav", "Kolhapur", 3),
+            ("Lavani Nights", "Kolhapur", 6),
+            ("Lavani Retrospective", "Kolhapur", -30),
+        ]
+    ]
+
+    # Typeahead is public, so unmoderated events stay out of it
+    response = client.get("/api/v1/events/suggest", params={"prefix": "lavani"})
+    assert response.json() == []
+    crud.event.moderate(
+        db, ids=[event.id for event in events], status=EventStatus.APPROVED
+    )
+
+    response = client.get("/api/v1/events/suggest", params={"prefix": "kolh"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"text": "Kolhapur", "kind": "city", "weight": 2}
+    ]
+
+    # Past events are not suggested; word prefixes inside titles match
+    response = client.get("/api/v1/events/suggest", params={"prefix": "lavani"})
+    assert {s["text"] for s in response.json()} == {
+        "Lavani Mahotsav", "Lavani Nights"
+    }
+    response = client.get("/api/v1/events/suggest", params={"prefix": "natya"})
+    assert response.json()[0]["text"] == "Keshavrao Bhosale Natyagruha"
+
+    # Leaving APPROVED takes an event out again, also after a reload
+    crud.event.update(
+        db=db, db_obj=events[1], obj_in={"status": EventStatus.PENDING}
+    )
+    for reload in (False, True):
+        if reload:
+            crud.event.load_upcoming(db)
+        response = client.get(
+            "/api/v1/events/suggest", params={"prefix": "lavani"}
+        )
+        assert [s["text"] for s in response.json()] == ["Lavani Mahotsav"]
+
+
+def test_nearby_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    venues = [
+        ("Shaniwar Wada", 18.5195, 73.8553, "Heritage"),
+        ("Aga Khan Palace", 18.5524, 73.9015, "Heritage"),
+        ("Sinhagad Fort", 18.3664, 73.7559, "Heritage"),
+        ("Dagdusheth Temple", 18.5164, 73.8561, "Religious"),
+    ]
+    for name, lat, lon, event_type in venues:
+        crud.event.create_with_organizer(
+            db=db,
+            obj_in=EventCreate(
+                title=f"Nearby {name}",
+                description="Nearby Description",
+                location=name,
+                city="Pune",
+                event_date=datetime.now() + timedelta(days=7),
+                event_type=event_type,
+                latitude=lat,
+                longitude=lon
+            ),
+            organizer_id=str(admin.id)
+        )
+
+    response = client.get(
+        "/api/v1/events/nearby",
+        headers=superuser_token_headers,
+        params={
+            "lat": 18.5204, "lon": 73.8567, "radius_km": 8,
+            "event_type": "Heritage"
+        }
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [e["location"] for e in content] == [
+        "Shaniwar Wada", "Aga Khan Palace"
+    ]
+    assert content[0]["distance_km"] < content[1]["distance_km"] < 8
+
+
+def test_event_calendar_rollup(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    day = datetime(2031, 3, 10, 19, 30)
+    events = [
+        crud.event.create_with_organizer(
+            db=db,
+            obj_in=EventCreate(
+                title="Rollup Event",
+                description="Rollup Description",
+                location="Rollup Location",
+                city="Thane",
+                event_date=day + timedelta(days=offset),
+                event_type="Rollup"
+            ),
+            organizer_id=str(admin.id)
+        )
+        for offset in (0, 0, 1)
+    ]
+    params = {
+        "start_date": "2031-03-10", "end_date": "2031-03-12",
+        "city": "Thane", "event_type": "Rollup"
+    }
+
+    response = client.get("/api/v1/events/calendar", params=params)
+    assert response.status_code == 200
+    assert response.json() == [
+        {"day": "2031-03-10", "count": 2},
+        {"day": "2031-03-11", "count": 1},
+    ]
+
+    response = client.post(
+        f"/api/v1/events/{events[0].id}/approve",
+        headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    crud.event.update(
+        db=db, db_obj=events[1], obj_in={"event_date": day + timedelta(days=2)}
+    )
+    crud.event.remove(db=db, id=events[2].id)
+
+    expected = [
+        {"day": "2031-03-10", "count": 1},
+        {"day": "2031-03-12", "count": 1},
+    ]
+    response = client.get("/api/v1/events/calendar", params=params)
+    assert response.json() == expected
+    response = client.get(
+        "/api/v1/events/calendar", params={**params, "status": "approved"}
+    )
+    assert response.json() == [{"day": "2031-03-10", "count": 1}]
+
+    # Statuses are validated at the boundary, not when the rollup is kept
+    response = client.put(
+        f"/api/v1/events/{events[1].id}",
+        headers=superuser_token_headers,
+        json={"status": "APPROVED"},
+    )
+    assert response.status_code == 422
+    response = client.put(
+        f"/api/v1/events/{events[1].id}",
+        headers=superuser_token_headers,
+        json={"status": "approved"},
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "approved"
+    response = client.get(
+        "/api/v1/events/calendar", params={**params, "status": "approved"}
+    )
+    assert response.json() == expected
+
+    crud.event_rollup.rebuild(db)
+    response = client.get("/api/v1/events/calendar", params=params)
+    assert response.json() == expected
+
+
+def test_read_event_cache_is_never_stale(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    event = crud.event.create_with_organizer(
+        db=db,
+        obj_in=EventCreate(
+            title="Cached Event",
+            description="Cached Description",
+            location="Cached Location",
+            city="Nagpur",
+            event_date=datetime.now() + timedelta(days=8),
+            event_type="Cache"
+        ),
+        organizer_id=str(admin.id)
+    )
+    url = f"/api/v1/events/{event.id}"
+
+    before = event_detail_cache.stats()
+    for _ in range(3):
+        response = client.get(url, headers=superuser_token_headers)
+        assert response.json()["title"] == "Cached Event"
+    after = event_detail_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["local_hits"] - before["local_hits"] == 2
+
+    response = client.put(
+        url, headers=superuser_token_headers, json={"title": "Renamed Event"}
+    )
+    assert response.status_code == 200
+    assert client.get(url, headers=superuser_token_headers).json()["title"] == \
+        "Renamed Event"
+
+    # A read that loaded the row before a write committed must not
+    # populate the cache once that write has invalidated the key
+    def slow_load():
+        payload = client.get(url, headers=superuser_token_headers).text
+        crud.event.update(db=db, db_obj=event, obj_in={"title": "Final Event"})
+        return payload
+
+    event_detail_cache.invalidate(event.id)
+    stale = event_detail_cache.get_or_load(event.id, slow_load)
+    assert "Renamed Event" in stale
+    assert client.get(url, headers=superuser_token_headers).json()["title"] == \
+        "Final Event"
+
+    response = client.get("/api/v1/admin/cache-stats", headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert "event_detail" in response.json()
+
+
+def test_list_events_etag(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    url = "/api/v1/events/"
+    params = {"limit": 5}
+    response = client.get(url, headers=superuser_token_headers, params=params)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        url,
+        headers={**superuser_token_headers, "If-None-Match": etag},
+        params=params
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # Different query parameters get a different validator
+    response = client.get(url, headers=superuser_token_headers, params={"limit": 6})
+    assert response.headers["ETag"] != etag
+
+    admin = crud.user.get_by_email(db, email="admin@example.com")
+    crud.event.create_with_organizer(
+        db=db,
+        obj_in=EventCreate(
+            title="ETag Event",
+            description="ETag Description",
+            location="ETag Location",
+            city="Pune",
+            event_date=datetime.now() + timedelta(days=9),
+            event_type="ETag"
+        ),
+        organizer_id=str(admin.id)
+    )
+    response = client.get(
+        url,
+        headers={**superuser_token_headers, "If-None-Match": etag},
+        params=params
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_import_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    csv_body = (
+        "title,description,location,city,event_date,event_type,latitude,longitude\n"
+        "Import One,Imported,Venue One,Solapur,2032-01-05T18:00:00,Import,,\n"
+        "Import Two,Imported,Venue Two,Solapur,not-a-date,Import,,\n"
+        "Import Three,Imported,Venue Three,Solapur,2032-01-06T18:00:00,Import,17.66,75.9\n"
+    )
+    response = client.post(
+        "/api/v1/events/import",
+        headers=superuser_token_headers,
+        files={"file": ("events.csv", csv_body, "text/csv")}
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["imported"] == 2
+    assert content["failed"] == 1
+    assert content["errors"][0]["row"] == 3
+    assert content["errors"][0]["errors"][0].startswith("event_date")
+
+    ndjson_body = "\n".join([
+        '{"title": "Import Four", "description": "Imported", "location": "Venue Four", '
+        '"city": "Solapur", "event_date": "2032-01-07T18:00:00", "event_type": "Import"}',
+        "{broken",
+    ])
+    response = client.post(
+        "/api/v1/events/import",
+        headers=superuser_token_headers,
+        params={"format": "ndjson"},
+        files={"file": ("events.txt", ndjson_body, "application/x-ndjson")}
+    )
+    assert response.json()["imported"] == 1
+    assert response.json()["errors"][0]["row"] == 2
+
+    # Imported rows are searchable and counted in the rollup like any other
+    response = client.get(
+        "/api/v1/events/search",
+        headers=superuser_token_headers,
+        params={"q": "import three"}
+    )
+    assert [r["title"] for r in response.json()] == ["Import Three"]
+    response = client.get(
+        "/api/v1/events/calendar",
+        params={"start_date": "2032-01-05", "end_date": "2032-01-07", "city": "Solapur"}
+    )
+    assert [d["count"] for d in response.json()] == [1, 1, 1]
+
+
+def test_export_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    total = db.query(Event).count()
+
+    response = client.get(
+        "/api/v1/events/export", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == total
+    assert len({row["id"] for row in rows}) == total
+    assert [r["event_date"] for r in rows] == sorted(r["event_date"] for r in rows)
+
+    response = client.get(
+        "/api/v1/events/export",
+        headers=superuser_token_headers,
+        params={"format": "csv"}
+    )
+    assert response.status_code == 200
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert "title" in reader.fieldnames
+    assert len(list(reader)) == total
+
+
+def test_export_events_requires_admin(client: TestClient) -> None:
+    response = client.get("/api/v1/events/export")
+    assert response.status_code == 401
+
+
+def _query_plan(db: Session, filters: EventFilter, cursor=None) -> List[str]:
+    """EXPLAIN the SELECT that get_multi_filtered actually issues."""
+    statements = []
+
+    def capture(conn, cursor_, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", capture)
+    try:
+        crud.event.get_multi_filtered(
+            db, filters=filters, cursor=cursor, limit=10
+        )
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", capture)
+    # The event table query; recurring series are read after it
+    statement, parameters = statements[0]
+    rows = db.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    )
+    return [row[3] for row in rows]
+
+
+FILTER_VALUES = {
+    "city": "Pune",
+    "event_type": "Music",
+    "status": EventStatus.APPROVED,
+    "is_sponsored": True,
+    "organizer_id": "organizer",
+    "start_date": datetime(2030, 1, 1),
+    "end_date": datetime(2030, 6, 1),
+}
+FILTER_COMBINATIONS = [
+    ("city",),
+    ("event_type",),
+    ("status",),
+    ("is_sponsored",),
+    ("organizer_id",),
+    ("start_date",),
+    ("start_date", "end_date"),
+    ("city", "event_type"),
+    ("city", "status"),
+    ("event_type", "status"),
+    ("city", "start_date", "end_date"),
+    ("event_type", "start_date", "end_date"),
+    ("status", "start_date", "end_date"),
+    ("is_sponsored", "start_date"),
+    ("organizer_id", "start_date"),
+    ("city", "event_type", "start_date"),
+    ("city", "status", "start_date", "end_date"),
+    ("event_type", "status", "start_date"),
+    ("city", "event_type", "status", "is_sponsored"),
+]
+
+
+@pytest.mark.parametrize("sort", list(EventSort))
+@pytest.mark.parametrize("combination", FILTER_COMBINATIONS)
+def test_event_filters_use_index(
+    db: Session, combination: Tuple[str, ...], sort: EventSort
+) -> None:
+    filters = EventFilter(
+        sort=sort, **{name: FILTER_VALUES[name] for name in combination}
+    )
+    cursor = encode_cursor(datetime(2030, 2, 1), "some-id")
+    for page_cursor in (None, cursor):
+        plan = _query_plan(db, filters, cursor=page_cursor)
+        assert len(plan) == 1, plan
+        assert plan[0].startswith("SEARCH event USING INDEX"), plan
+
+
+def test_list_events_filters(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    created = []
+    for day, city in [(1, "Nashik"), (2, "Nashik"), (3, "Nagpur")]:
+        created.append(crud.event.create_with_organizer(
+            db,
+            obj_in=EventCreate(
+                title=f"Filter Event {day}",
+                description="Filtered",
+                location="Venue",
+                city=city,
+                event_date=datetime(2033, 3, day, 18),
+                event_type="Filter",
+            ),
+            organizer_id=str(organizer.id),
+        ))
+    crud.event.update(
+        db, db_obj=created[1], obj_in={"status": EventStatus.APPROVED}
+    )
+
+    def titles(**params: Any) -> List[str]:
+        response = client.get(
+            "/api/v1/events/", headers=superuser_token_headers, params=params
+        )
+        assert response.status_code == 200
+        return [e["title"] for e in response.json()["items"]]
+
+    assert titles(event_type="Filter", city="Nashik") == [
+        "Filter Event 1", "Filter Event 2"
+    ]
+    assert titles(event_type="Filter", sort="-event_date") == [
+        "Filter Event 3", "Filter Event 2", "Filter Event 1"
+    ]
+    assert titles(event_type="Filter", status="approved") == ["Filter Event 2"]
+    assert titles(
+        organizer_id=str(organizer.id),
+        start_date="2033-03-02T00:00:00",
+        end_date="2033-03-02T23:59:59",
+    ) == ["Filter Event 2"]
+    assert titles(event_type="Filter", is_sponsored=True) == []
+
+    # Descending pages continue from the cursor
+    response = client.get(
+        "/api/v1/events/",
+        headers=superuser_token_headers,
+        params={"event_type": "Filter", "sort": "-event_date", "limit": 2},
+    )
+    next_cursor = response.json()["next_cursor"]
+    assert titles(
+        event_type="Filter", sort="-event_date", cursor=next_cursor
+    ) == ["Filter Event 1"]
+
+
+def test_trending_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    events = [
+        crud.event.create_with_organizer(
+            db,
+            obj_in=EventCreate(
+                title=f"Trending {name}",
+                description="Hot",
+                location="Venue",
+                city=city,
+                event_date=datetime.now() + timedelta(days=10),
+                event_type="Trending",
+            ),
+            organizer_id=str(organizer.id),
+        )
+        for name, city in [("Fresh", "Kochi"), ("Stale", "Kochi"),
+                           ("Elsewhere", "Madurai")]
+    ]
+    fresh, stale, elsewhere = events
+
+    for _ in range(5):
+        response = client.get(
+            f"/api/v1/events/{fresh.id}", headers=superuser_token_headers
+        )
+        assert response.status_code == 200
+    client.get(f"/api/v1/events/{elsewhere.id}", headers=superuser_token_headers)
+
+    # Twice as many views as `fresh`, but two half-lives ago
+    now = time.time()
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    crud.event_trending.counts.add({stale.id: 10}, now=now - 2 * half_life)
+
+    # Nothing is ranked until the background refresh runs
+    response = client.get(
+        "/api/v1/events/trending",
+        headers=superuser_token_headers,
+        params={"city": "Kochi"}
+    )
+    assert response.json() == []
+
+    crud.event_trending.refresh(db, now=now)
+    response = client.get(
+        "/api/v1/events/trending",
+        headers=superuser_token_headers,
+        params={"city": "Kochi"}
+    )
+    ranking = response.json()
+    assert [e["title"] for e in ranking] == ["Trending Fresh", "Trending Stale"]
+    assert ranking[0]["score"] == pytest.approx(5, rel=0.1)
+    assert ranking[1]["score"] == pytest.approx(2.5, rel=0.1)
+
+    response = client.get(
+        "/api/v1/events/trending/cities", headers=superuser_token_headers
+    )
+    cities = [c["city"] for c in response.json()]
+    assert cities.index("Kochi") < cities.index("Madurai")
+
+    # Rejected events drop out on the next refresh
+    crud.event.update(
+        db, db_obj=fresh, obj_in={"status": EventStatus.REJECTED}
+    )
+    crud.event_trending.refresh(db, now=now)
+    response = client.get(
+        "/api/v1/events/trending",
+        headers=superuser_token_headers,
+        params={"city": "Kochi"}
+    )
+    assert [e["title"] for e in response.json()] == ["Trending Stale"]
+
+
+def test_recommended_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    crud.user.create(db, obj_in=UserCreate(
+        email="recommend@example.com",
+        password="recommend123",
+        full_name="Recommend User",
+    ))
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "recommend@example.com", "password": "recommend123"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # No history yet: falls back to the trending ranking
+    response = client.get("/api/v1/events/recommended", headers=headers)
+    assert response.status_code == 200
+
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    evening = datetime.now().replace(hour=19, minute=0, second=0, microsecond=0)
+
+    def make(title: str, city: str, event_type: str, days: int, hour: int = 19):
+        return crud.event.create_with_organizer(
+            db,
+            obj_in=EventCreate(
+                title=title,
+                description="Recommended",
+                location="Venue",
+                city=city,
+                event_date=evening.replace(hour=hour) + timedelta(days=days),
+                event_type=event_type,
+            ),
+            organizer_id=str(organizer.id),
+        )
+
+    seen = [make(f"Seen Ghazal {i}", "Panaji", "Ghazal", 20 + i) for i in range(2)]
+    best = make("Ghazal Night", "Panaji", "Ghazal", 30)
+    same_type = make("Ghazal Morning", "Shillong", "Ghazal", 31, hour=8)
+    unrelated = make("Kabaddi Final", "Shillong", "Kabaddi", 32, hour=8)
+
+    for event in seen:
+        client.get(f"/api/v1/events/{event.id}", headers=headers)
+
+    response = client.get(
+        "/api/v1/events/recommended", headers=headers, params={"limit": 100}
+    )
+    assert response.status_code == 200
+    ranked = [e["id"] for e in response.json()]
+    assert ranked[0] == best.id
+    assert ranked.index(same_type.id) < ranked.index(unrelated.id)
+    # Already-viewed events are not recommended again
+    assert not {e.id for e in seen} & set(ranked)
+    assert response.json()[0]["score"] > response.json()[-1]["score"]
+
+    # Deleted events drop out of the matrix immediately
+    crud.event.remove(db, id=best.id)
+    response = client.get("/api/v1/events/recommended", headers=headers)
+    assert best.id not in [e["id"] for e in response.json()]
+
+
+def test_archive_past_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    old_ids = [
+        crud.event.create_with_organizer(
+            db,
+            obj_in=EventCreate(
+                title=f"Vintage Fair {year}",
+                description="Long ago",
+                location="Old Hall",
+                city="Mysuru",
+                event_date=datetime(year, 5, 1, 10),
+                event_type="Fair",
+            ),
+            organizer_id=str(organizer.id),
+        ).id
+        for year in (1990, 1991, 1992)
+    ]
+    crud.event.create_with_organizer(
+        db,
+        obj_in=EventCreate(
+            title="Modern Fair",
+            description="Soon",
+            location="New Hall",
+            city="Mysuru",
+            event_date=datetime.now() + timedelta(days=3),
+            event_type="Fair",
+        ),
+        organizer_id=str(organizer.id),
+    )
+
+    # Another worker's run already copied one of them but has not yet
+    # deleted it; this run must not fail on the copy
+    first = crud.event.get(db, id=old_ids[0])
+    db.add(EventArchive(
+        **{c.name: getattr(first, c.name) for c in Event.__table__.columns},
+        archived_at=datetime.now(),
+    ))
+    db.commit()
+
+    moved = crud.event.archive_past(db, before=datetime(2000, 1, 1), batch_size=2)
+    assert moved == 3
+    assert db.query(Event).filter(Event.city == "Mysuru").count() == 1
+    assert db.query(EventArchive).filter(EventArchive.city == "Mysuru").count() == 3
+
+    def titles(**params: Any) -> List[str]:
+        response = client.get(
+            "/api/v1/events/", headers=superuser_token_headers, params=params
+        )
+        assert response.status_code == 200
+        return [e["title"] for e in response.json()["items"]]
+
+    # The hot path never reads the archive...
+    assert titles(city="Mysuru") == ["Modern Fair"]
+    # ...but an explicitly historical range does, merged in date order
+    assert titles(city="Mysuru", start_date="1980-01-01T00:00:00") == [
+        "Vintage Fair 1990", "Vintage Fair 1991", "Vintage Fair 1992",
+        "Modern Fair",
+    ]
+    response = client.get(
+        "/api/v1/events/",
+        headers=superuser_token_headers,
+        params={
+            "city": "Mysuru", "start_date": "1980-01-01T00:00:00",
+            "sort": "-event_date", "limit": 2,
+        },
+    )
+    page = response.json()
+    assert [e["title"] for e in page["items"]] == [
+        "Modern Fair", "Vintage Fair 1992"
+    ]
+    assert titles(
+        city="Mysuru", start_date="1980-01-01T00:00:00",
+        sort="-event_date", cursor=page["next_cursor"],
+    ) == ["Vintage Fair 1991", "Vintage Fair 1990"]
+
+    response = client.get(
+        "/api/v1/events/facets",
+        headers=superuser_token_headers,
+        params={"city": "Mysuru", "end_date": "1995-01-01T00:00:00"}
+    )
+    assert response.json()["total"] == 3
+
+    # Archived events are still readable by id and still on the calendar
+    response = client.get(
+        f"/api/v1/events/{old_ids[0]}", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Vintage Fair 1990"
+    response = client.get(
+        "/api/v1/events/calendar",
+        params={"start_date": "1990-05-01", "end_date": "1990-05-01", "city": "Mysuru"}
+    )
+    assert [d["count"] for d in response.json()] == [1]
+
+    # Rebuilding the rollup keeps counting archived events
+    crud.event_rollup.rebuild(db)
+    response = client.get(
+        "/api/v1/events/calendar",
+        params={"start_date": "1991-01-01", "end_date": "1991-12-31", "city": "Mysuru"}
+    )
+    assert response.json() == [{"day": "1991-05-01", "count": 1}]
+
+
+
+def test_upsert_insert_dialects(db: Session) -> None:
+    assert upsert_insert(db) is sqlite.insert
+    mysql = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+    )
+    with pytest.raises(ValueError, match="'mysql'"):
+        upsert_insert(cast(Session, mysql))
+
+def test_event_series(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    response = client.post(
+        "/api/v1/events/series",
+        headers=superuser_token_headers,
+        json={
+            "title": "Sunset Walk",
+            "description": "Every Monday",
+            "location": "Hemakuta Hill",
+            "city": "Hampi",
+            "event_type": "Tour",
+            "dtstart": "2020-01-06T18:00:00",
+            "rrule": "FREQ=WEEKLY",
+        },
+    )
+    assert response.status_code == 200
+    series = response.json()
+    assert series["rrule"] == (
+        "FREQ=WEEKLY;BYDAY=MO;BYHOUR=18;BYMINUTE=0;BYSECOND=0"
+    )
+    assert series["ends_at"] is None
+    series_id = series["id"]
+
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    crud.event.create_with_organizer(
+        db,
+        obj_in=EventCreate(
+            title="Temple Festival",
+            description="Once",
+            location="Virupaksha Temple",
+            city="Hampi",
+            event_date=datetime(2031, 1, 15, 9),
+            event_type="Festival",
+        ),
+        organizer_id=str(organizer.id),
+    )
+
+    base = f"/api/v1/events/series/{series_id}/occurrences"
+    response = client.put(
+        f"{base}/2031-01-13T18:00:00",
+        headers=superuser_token_headers,
+        json={"cancelled": True},
+    )
+    assert response.status_code == 200
+    response = client.put(
+        f"{base}/2031-01-20T18:00:00",
+        headers=superuser_token_headers,
+        json={"title": "Sunset Walk (moved)", "event_date": "2031-01-21T18:00:00"},
+    )
+    assert response.status_code == 200
+    # Only actual occurrences can be changed
+    response = client.put(
+        f"{base}/2031-01-14T18:00:00",
+        headers=superuser_token_headers,
+        json={"cancelled": True},
+    )
+    assert response.status_code == 400
+
+    # Occurrences merge with events in date order, across pages
+    params = {
+        "city": "Hampi",
+        "start_date": "2031-01-01T00:00:00",
+        "end_date": "2031-01-31T23:59:59",
+        "limit": 2,
+    }
+    listed = []
+    cursor = None
+    while True:
+        response = client.get(
+            "/api/v1/events/",
+            headers=superuser_token_headers,
+            params={**params, **({"cursor": cursor} if cursor else {})},
+        )
+        assert response.status_code == 200
+        page = response.json()
+        listed.extend((e["title"], e["event_date"]) for e in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert listed == [
+        ("Sunset Walk", "2031-01-06T18:00:00"),
+        ("Temple Festival", "2031-01-15T09:00:00"),
+        ("Sunset Walk (moved)", "2031-01-21T18:00:00"),
+        ("Sunset Walk", "2031-01-27T18:00:00"),
+    ]
+    response = client.get(
+        "/api/v1/events/",
+        headers=superuser_token_headers,
+        params={**params, "sort": "-event_date"},
+    )
+    assert [e["event_date"] for e in response.json()["items"]] == [
+        "2031-01-27T18:00:00", "2031-01-21T18:00:00",
+    ]
+
+    # Occurrences are addressable by id
+    occurrence_id = f"{series_id}:20310120T180000"
+    response = client.get(
+        f"/api/v1/events/{occurrence_id}", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Sunset Walk (moved)"
+    assert response.json()["series_id"] == series_id
+    response = client.get(
+        f"/api/v1/events/{series_id}:20310113T180000",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 404
+
+    response = client.get(
+        "/api/v1/events/calendar",
+        params={"start_date": "2031-01-01", "end_date": "2031-01-31", "city": "Hampi"},
+    )
+    assert response.json() == [
+        {"day": "2031-01-06", "count": 1},
+        {"day": "2031-01-15", "count": 1},
+        {"day": "2031-01-21", "count": 1},
+        {"day": "2031-01-27", "count": 1},
+    ]
+    assert crud.event.count_by_date_range(
+        db, datetime(2031, 1, 1), datetime(2031, 1, 31)
+    ) >= 4
+
+    # Nothing is materialized: one series row plus one row per change
+    assert db.query(EventSeries).filter(EventSeries.id == series_id).count() == 1
+    assert db.query(EventSeriesOverride).filter(
+        EventSeriesOverride.series_id == series_id
+    ).count() == 2
+
+    # COUNT is rewritten to the UNTIL of the last occurrence
+    response = client.post(
+        "/api/v1/events/series",
+        headers=superuser_token_headers,
+        json={
+            "title": "Workshop",
+            "description": "Three sessions",
+            "location": "Hall",
+            "city": "Hampi",
+            "event_type": "Class",
+            "dtstart": "2031-03-03T10:00:00",
+            "rrule": "RRULE:FREQ=DAILY;INTERVAL=2;COUNT=3",
+        },
+    )
+    assert response.json()["ends_at"] == "2031-03-07T10:00:00"
+    assert "UNTIL=20310307T100000" in response.json()["rrule"]
+    response = client.post(
+        "/api/v1/events/series",
+        headers=superuser_token_headers,
+        json={**series, "rrule": "FREQ=HOURLY"},
+    )
+    assert response.status_code == 400
+    response = client.post(
+        "/api/v1/events/series",
+        headers=superuser_token_headers,
+        json={
+            **series,
+            "rrule": f"FREQ=DAILY;COUNT={settings.EVENT_SERIES_MAX_COUNT + 1}",
+        },
+    )
+    assert response.status_code == 400
+
+    # Organizers can't approve their own series; admins moderate it
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "test@example.com", "password": "test123"},
+    )
+    organizer_headers = {
+        "Authorization": f"Bearer {response.json()['access_token']}"
+    }
+    response = client.post(
+        "/api/v1/events/series", headers=organizer_headers, json=series
+    )
+    own_id = response.json()["id"]
+    response = client.put(
+        f"/api/v1/events/series/{own_id}",
+        headers=organizer_headers,
+        json={"status": "APPROVED"},
+    )
+    assert response.json()["status"] == "pending"
+    response = client.post(
+        f"/api/v1/events/series/{own_id}/approve", headers=organizer_headers
+    )
+    assert response.status_code == 403
+    response = client.post(
+        f"/api/v1/events/series/{own_id}/approve",
+        headers=superuser_token_headers,
+    )
+    assert response.json()["status"] == "approved"
+    response = client.post(
+        f"/api/v1/events/series/{own_id}/reject",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 400
+
+    response = client.delete(
+        f"/api/v1/events/series/{series_id}", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    assert db.query(EventSeriesOverride).filter(
+        EventSeriesOverride.series_id == series_id
+    ).count() == 0
+
+
+def test_duplicate_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    event_date = datetime.now() + timedelta(days=20)
+
+    def create(title: str, description: str) -> Event:
+        return crud.event.create_with_organizer(
+            db,
+            obj_in=EventCreate(
+                title=title,
+                description=description,
+                location="Blue Frog",
+                city="Kochi",
+                event_date=event_date,
+                event_type="Music",
+            ),
+            organizer_id=str(organizer.id),
+        )
+
+    original = create(
+        "Backwater Jazz Night", "An evening of live jazz by the backwaters"
+    )
+    original_id = original.id
+    assert original.duplicate_of is None
+    resubmitted = create(
+        "Backwater Jazz Night!!", "An evening of live jazz, by the backwaters."
+    )
+    resubmitted_id = resubmitted.id
+    assert resubmitted.duplicate_of == original_id
+    unrelated = create("Kathakali Workshop", "Learn the basics of the dance form")
+    assert unrelated.duplicate_of is None
+
+    response = client.get(
+        "/api/v1/events/duplicates", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    clusters = [
+        sorted(e["id"] for e in cluster["events"]) for cluster in response.json()
+    ]
+    assert sorted([original_id, resubmitted_id]) in clusters
+    assert client.get("/api/v1/events/duplicates").status_code == 401
+
+    # Rejected events drop out of the index
+    crud.event.update(
+        db,
+        db_obj=crud.event.get(db, id=resubmitted_id),
+        obj_in={"status": EventStatus.REJECTED},
+    )
+    assert crud.event.find_duplicates(
+        title="Backwater Jazz Night",
+        description="An evening of live jazz by the backwaters",
+        city="Kochi",
+    ) == [(original_id, 1.0)]
+
+
+def test_moderate_and_claim_events(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    admin = crud.user.get_by_email(db, email=settings.FIRST_SUPERUSER)
+    organizer_id, admin_id = str(organizer.id), str(admin.id)
+    ids = [
+        crud.event.create_with_organizer(
+            db,
+            obj_in=EventCreate(
+                title=f"Queue Event {i}",
+                description="Awaiting review",
+                location="Hall",
+                city="Moderation",
+                # Older than any other pending event, so first in the queue
+                event_date=datetime(2001, 1, 1 + i),
+                event_type="Queue",
+            ),
+            organizer_id=organizer_id,
+        ).id
+        for i in range(4)
+    ]
+
+    # Two moderators are handed disjoint events, oldest first
+    first = [e.id for e in crud.event.claim_pending(
+        db, moderator_id=admin_id, limit=2
+    )]
+    second = [e.id for e in crud.event.claim_pending(
+        db, moderator_id=organizer_id, limit=2
+    )]
+    assert first == ids[:2]
+    assert second == ids[2:]
+    # Claiming again renews one's own claims rather than stealing others'
+    assert [e.id for e in crud.event.claim_pending(
+        db, moderator_id=admin_id, limit=2
+    )] == ids[:2]
+    # Expired claims go back to the queue
+    crud.event.claim_pending(
+        db, moderator_id=organizer_id, limit=2, lease_seconds=-1
+    )
+    response = client.post(
+        "/api/v1/events/pending/claim",
+        headers=superuser_token_headers,
+        params={"limit": 4},
+    )
+    assert response.status_code == 200
+    assert [e["id"] for e in response.json()] == ids
+
+    statements = []
+
+    def capture(conn, cursor_, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.post(
+            "/api/v1/events/moderate",
+            headers=superuser_token_headers,
+            json={"ids": ids[:3] + ["missing"], "action": "approve"},
+        )
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == 200
+    result = response.json()
+    assert sorted(e["id"] for e in result["updated"]) == sorted(ids[:3])
+    assert {e["status"] for e in result["updated"]} == {"approved"}
+    assert result["skipped"] == ["missing"]
+    updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 1 and "RETURNING" in updates[0].upper()
+
+    # Decisions already made are not overwritten
+    response = client.post(
+        "/api/v1/events/moderate",
+        headers=superuser_token_headers,
+        json={"ids": ids, "action": "reject"},
+    )
+    result = response.json()
+    assert [e["id"] for e in result["updated"]] == [ids[3]]
+    assert result["skipped"] == ids[:3]
+    response = client.post(
+        f"/api/v1/events/{ids[0]}/reject", headers=superuser_token_headers
+    )
+    assert response.status_code == 400
+
+    # Moderated events no longer hold claims or appear in the queue
+    assert db.query(EventModerationLease).filter(
+        EventModerationLease.event_id.in_(ids)
+    ).count() == 0
+    assert not set(ids) & {
+        e.id for e in crud.event.claim_pending(db, moderator_id=admin_id, limit=100)
+    }
+
+
+def test_promoted_feed(
+    client: TestClient, db: Session, superuser_token_headers: dict
+) -> None:
+    organizer = crud.user.get_by_email(db, email="test@example.com")
+    sponsor = Sponsor(
+        id="promoted-sponsor",
+        user_id=str(organizer.id),
+        company_name="Promo Co",
+        contact_email="promo@example.com",
+    )
+    db.add(sponsor)
+    db.commit()
+    now = datetime.utcnow()
+    banners = [
+        crud.banner.create(db, obj_in=BannerCreate(
+            sponsor_id=sponsor.id,
+            image_url=f"https://example.com/{name}.png",
+            link_url="https://example.com",
+            position="top",
+            is_active=active,
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        ))
+        for name, active in [("live", True), ("paused", False)]
+    ]
+    live_banner_id = banners[0].id
+
+    def create(title: str, city: str, days: int, **changes: Any) -> str:
+        obj = crud.event.create_with_organizer(
+            db,
+            obj_in=EventCreate(
+                title=title,
+                description="Sponsored",
+                location="Arena",
+                city=city,
+                event_date=datetime.now() + timedelta(days=days),
+                event_type="Promoted",
+            ),
+            organizer_id=str(organizer.id),
+        )
+        return crud.event.update(db, db_obj=obj, obj_in=changes).id
+
+    approved = {"status": EventStatus.APPROVED, "is_sponsored": True}
+    later = create("Promo Later", "Promo City", 20, **approved)
+    sooner = create("Promo Sooner", "Promo City", 10, **approved)
+    create("Promo Pending", "Promo City", 5, is_sponsored=True)
+    create("Promo Unsponsored", "Promo City", 5, status=EventStatus.APPROVED)
+    elsewhere = create("Promo Elsewhere", "Other City", 15, **approved)
+
+    assert crud.event_promoted.refresh(db)
+    # Nothing changed, so the next refresh keeps the snapshot
+    assert not crud.event_promoted.refresh(db)
+
+    statements = []
+
+    def capture(conn, cursor_, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def feed(**params: Any) -> List[Tuple[str, str]]:
+        response = client.get("/api/v1/events/promoted", params=params)
+        assert response.status_code == 200
+        return [
+            (item["kind"], item[item["kind"]]["id"]) for item in response.json()
+        ]
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", capture)
+    try:
+        city_feed = feed(city="Promo City")
+        banner_feed = feed(city="Nowhere")
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", capture)
+    assert statements == []
+    # Soonest sponsored events first, with banners interleaved
+    assert city_feed == [
+        ("event", sooner), ("banner", live_banner_id), ("event", later)
+    ]
+    assert banner_feed == [("banner", live_banner_id)]
+    overall = [item for item in feed(limit=100) if item[0] == "event"]
+    assert ("event", elsewhere) in overall
+    assert feed(city="Promo City", limit=1) == [("event", sooner)]
+
+    # Dropping the sponsor flag changes the event version and the feed
+    crud.event.update(
+        db, db_obj=crud.event.get(db, id=sooner), obj_in={"is_sponsored": False}
+    )
+    assert crud.event_promoted.refresh(db)
+    assert feed(city="Promo City") == [
+        ("event", later), ("banner", live_banner_id)
+    ]
@@ -11,6 +11,7 @@ from app.api import deps
 from app import crud
 from app.schemas.user import UserCreate
 from app.core.enums import UserRole, AdminLevel, AdminPermission
+from app.core.ratelimit import rate_limiter
 
 # Set test environment
 os.environ["ENV_FILE"] = ".env.test"
@@ -93,6 +94,14 @@ def client(db: Session) -> Generator[TestClient, Any, None]:
         app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits() -> Generator[None, Any, None]:
+    """Give every test, and the fixtures set up after it, fresh buckets."""
+    rate_limiter.reset()
+    yield
+    rate_limiter.reset()
+
+
 def get_superuser_token_headers(client: TestClient) -> Dict[str, str]:
     """Helper function to get superuser token headers for testing."""
     login_data = {